@@ -0,0 +1,230 @@
+"""Background health probes for Postgres and Redis with per-dependency circuit breakers.
+
+Every database shard (``DATABASE_SHARDS`` plus the default) is its own dependency,
+``postgres`` for the default shard and ``postgres:<shard>`` for the others, so one
+shard going down only fails fast the requests routed to it.
+
+:class:`DependencyMonitor` probes each dependency every
+``HEALTH_PROBE_INTERVAL_SECONDS`` with a ``HEALTH_PROBE_TIMEOUT_SECONDS`` budget.
+``BREAKER_FAILURE_THRESHOLD`` consecutive failures open that dependency's breaker;
+the next successful probe closes it again. Hot endpoints declare
+:func:`require_dependencies` so an open breaker answers 503 with ``Retry-After``
+immediately instead of letting callers wait on driver timeouts, and
+``/readiness`` reports the cached probe results.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import text
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+from backend.app.core.metrics import DEPENDENCY_UP
+from backend.app.db import session as db_session
+
+logger = logging.getLogger(__name__)
+
+POSTGRES = "postgres"
+REDIS = "redis"
+DEPENDENCY_LABELS = {POSTGRES: "Postgres", REDIS: "Redis"}
+
+
+def postgres_dependency(shard: str) -> str:
+    """Dependency (and breaker) name of one database shard."""
+    return POSTGRES if shard == db_session.DEFAULT_SHARD else f"{POSTGRES}:{shard}"
+
+
+def _label(name: str) -> str:
+    if name in DEPENDENCY_LABELS:
+        return DEPENDENCY_LABELS[name]
+    return f"Postgres shard {name.split(':', 1)[1]!r}"
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; any success closes it."""
+
+    def __init__(self, name: str, failure_threshold: int) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def record_success(self) -> None:
+        if self.is_open:
+            logger.info("%s recovered; closing circuit breaker", self.name)
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if not self.is_open and self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = monotonic()
+            logger.warning(
+                "%s failed %d consecutive probes; opening circuit breaker",
+                self.name,
+                self.consecutive_failures,
+            )
+
+
+@dataclass
+class ProbeResult:
+    healthy: bool
+    checked_at: datetime
+    latency_ms: float
+    error: str | None = None
+
+
+async def _probe_postgres(shard: str) -> None:
+    async with db_session.shard_engines[shard].connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _probe_redis() -> None:
+    if redis_module.redis_client is None:
+        raise RuntimeError("Redis client not initialised")
+    await redis_module.redis_client.ping()
+
+
+# The Postgres probe takes the shard name; see _dependencies().
+PROBES = {POSTGRES: _probe_postgres, REDIS: _probe_redis}
+
+
+def _dependencies() -> dict[str, Callable[[], Awaitable[None]]]:
+    """Probe per dependency name: one per configured database shard, and Redis."""
+    shards = (db_session.DEFAULT_SHARD, *settings.DATABASE_SHARDS)
+    dependencies = {postgres_dependency(shard): partial(PROBES[POSTGRES], shard) for shard in shards}
+    dependencies[REDIS] = PROBES[REDIS]
+    return dependencies
+
+
+class DependencyMonitor:
+    def __init__(self, *, interval: float, timeout: float, failure_threshold: int) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.results: dict[str, ProbeResult] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def has_state(self) -> bool:
+        return self.results.keys() >= _dependencies().keys()
+
+    def is_available(self, name: str) -> bool:
+        breaker = self.breakers.get(name)
+        return breaker is None or not breaker.is_open
+
+    async def probe(self, name: str) -> ProbeResult:
+        breaker = self.breakers.setdefault(name, CircuitBreaker(name, self.failure_threshold))
+        began = perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(_dependencies()[name](), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout:.1f}s"
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        result = ProbeResult(
+            healthy=error is None,
+            checked_at=datetime.now(timezone.utc),
+            latency_ms=(perf_counter() - began) * 1000,
+            error=error,
+        )
+        self.results[name] = result
+        if result.healthy:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        DEPENDENCY_UP.labels(dependency=name).set(0 if breaker.is_open else 1)
+        return result
+
+    async def probe_all(self) -> dict[str, ProbeResult]:
+        await asyncio.gather(*(self.probe(name) for name in _dependencies()))
+        return self.results
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.probe_all()
+            self._task = asyncio.create_task(self._run(), name="dependency-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe_all()
+
+
+dependency_monitor = DependencyMonitor(
+    interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+)
+
+
+def _unavailable(name: str) -> HTTPException:
+    return HTTPException(
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"{_label(name)} unavailable",
+        headers={"Retry-After": str(settings.BREAKER_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def _routed_postgres(request: Request) -> str:
+    """Postgres dependency of the shard the request routes to.
+
+    The shard map lives on the default shard: an uncached entry is looked up only
+    while that breaker is closed, and within the probe timeout, so a stalled
+    default primary fails fast here too.
+    """
+    restaurant_id = await db_session.request_restaurant_id(request)
+    if restaurant_id is None:
+        return POSTGRES
+    shard = db_session.shard_map.cached(restaurant_id)
+    if shard is None:
+        if not dependency_monitor.is_available(POSTGRES):
+            raise _unavailable(POSTGRES)
+        try:
+            shard = await asyncio.wait_for(
+                db_session.shard_map.shard_for(restaurant_id), timeout=dependency_monitor.timeout
+            )
+        except Exception as exc:
+            logger.warning("Shard lookup for %s failed: %s", restaurant_id, exc)
+            raise _unavailable(POSTGRES) from exc
+    return postgres_dependency(shard)
+
+
+def require_dependencies(*names: str):
+    """FastAPI dependency that fails fast with a retryable 503 while a breaker is open.
+
+    ``POSTGRES`` means the shard the request's ``restaurant_id`` is routed to.
+    """
+
+    async def guard(request: Request) -> None:
+        for name in names:
+            if name == POSTGRES and settings.DATABASE_SHARDS:
+                name = await _routed_postgres(request)
+            if not dependency_monitor.is_available(name):
+                raise _unavailable(name)
+
+    return guard
@@ -0,0 +1,111 @@
+"""Event-loop lag sampling and blocked-loop detection.
+
+A coroutine sleeps for ``LOOP_LAG_SAMPLE_INTERVAL_SECONDS`` and records how late it
+wakes up; that delay is time other callbacks held the loop. A watchdog thread reads
+the heartbeat the coroutine leaves behind: when it goes stale for longer than
+``LOOP_SLOW_CALLBACK_MS`` the loop thread is stuck inside one callback, and the
+watchdog logs that thread's current stack, which names the blocking coroutine and
+the line it is executing (audio transcoding, JSON encoding, TwiML building, ...).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from time import monotonic
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import LOOP_BLOCKED, LOOP_LAG, LOOP_RUNTIME
+
+logger = logging.getLogger(__name__)
+
+
+def loop_runtime(loop: asyncio.AbstractEventLoop | None = None) -> str:
+    """Name of the running event loop implementation ("uvloop" or "asyncio")."""
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+class LoopLagMonitor:
+    def __init__(self, *, interval: float, slow_callback_ms: float) -> None:
+        self.interval = interval
+        self.threshold = slow_callback_ms / 1000
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_events = 0
+        self._heartbeat = monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            expected = monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self) -> None:
+        # A stall is reported once, when the heartbeat first exceeds the threshold.
+        reported_beat = None
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            beat = self._heartbeat
+            stalled = monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self.blocked_events += 1
+            LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+            logger.warning(
+                "Event loop blocked for at least %.0f ms; loop thread stack:\n%s",
+                stalled * 1000,
+                stack,
+            )
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.LOOP_LAG_SAMPLE_INTERVAL_SECONDS,
+    slow_callback_ms=settings.LOOP_SLOW_CALLBACK_MS,
+)
+
+
+def report_runtime() -> str:
+    """Log and export which loop implementation serves this worker."""
+    runtime = loop_runtime()
+    LOOP_RUNTIME.labels(loop=runtime).set(1)
+    logger.info("Event loop runtime: %s (configured %s)", runtime, settings.LOOP_RUNTIME)
+    return runtime
@@ -0,0 +1,234 @@
+"""Prometheus metrics for holds, commits and the database behind them.
+
+Request handlers only touch in-process counters and histograms. Postgres signals
+(advisory-lock waiters, ``pg_stat_statements`` timings) and pool usage are sampled by
+a background task every ``METRICS_SAMPLE_INTERVAL_SECONDS`` and exported as gauges,
+so a scrape of ``/metrics`` never runs a query. The event sink's backpressure
+counters are read from its in-process snapshot at scrape time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+from time import perf_counter
+from typing import Any
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import text
+
+from backend.app.core.config import settings
+from backend.app.db import session as db_session
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "frontdesk_request_latency_seconds",
+    "Handler latency for availability and commit endpoints.",
+    ["endpoint"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HOLDS = Counter(
+    "frontdesk_holds_total",
+    "Availability checks by result (created/conflict) and conflict reason.",
+    ["result", "reason"],
+)
+COMMITS = Counter(
+    "frontdesk_commits_total",
+    "Reservation commits by result (committed/rejected) and rejection reason.",
+    ["result", "reason"],
+)
+ALTERNATES_CHECKED = Histogram(
+    "frontdesk_alternates_checked",
+    "Candidate slots probed per alternates search.",
+    buckets=(0, 1, 2, 4, 8, 16, 32),
+)
+ADVISORY_LOCK_WAITERS = Gauge(
+    "frontdesk_pg_advisory_lock_waiters",
+    "Backends waiting on an advisory lock (sampled from pg_locks).",
+)
+COMMIT_MEAN_MS = Gauge(
+    "frontdesk_pg_commit_reservation_mean_ms",
+    "Mean execution time of commit_reservation statements (pg_stat_statements).",
+)
+COMMIT_CALLS = Gauge(
+    "frontdesk_pg_commit_reservation_calls",
+    "Cumulative commit_reservation calls recorded by pg_stat_statements.",
+)
+POOL_CHECKED_OUT = Gauge(
+    "frontdesk_db_pool_checked_out",
+    "Connections currently checked out of the SQLAlchemy pool.",
+    ["engine"],
+)
+POOL_CAPACITY = Gauge(
+    "frontdesk_db_pool_capacity",
+    "pool_size + max_overflow for the SQLAlchemy pool.",
+    ["engine"],
+)
+LOOP_LAG = Histogram(
+    "frontdesk_event_loop_lag_seconds",
+    "How late the loop-lag sampler woke up (time other callbacks held the loop).",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+LOOP_BLOCKED = Counter(
+    "frontdesk_event_loop_blocked_total",
+    "Stalls longer than LOOP_SLOW_CALLBACK_MS detected by the loop watchdog.",
+)
+LOOP_RUNTIME = Gauge(
+    "frontdesk_event_loop_info",
+    "Active event loop implementation (value is always 1).",
+    ["loop"],
+)
+RATE_LIMITED = Counter(
+    "frontdesk_rate_limited_total",
+    "Requests rejected with 429 by endpoint scope and the bucket that ran out.",
+    ["scope", "bucket"],
+)
+DEPENDENCY_UP = Gauge(
+    "frontdesk_dependency_up",
+    "1 while the dependency's circuit breaker is closed, 0 while it is open.",
+    ["dependency"],
+)
+
+# EventSinkStats field -> (metric family, help). Counters get a ``_total`` suffix.
+EVENT_SINK_COUNTERS = {
+    "emitted": ("frontdesk_event_sink_emitted", "Events queued for event_log."),
+    "dropped": ("frontdesk_event_sink_dropped", "Events dropped on a full queue or a failed flush."),
+    "written": ("frontdesk_event_sink_written", "Events written to event_log."),
+    "batches": ("frontdesk_event_sink_batches", "COPY batches written to event_log."),
+    "flush_failures": ("frontdesk_event_sink_flush_failures", "COPY batches that failed and were dropped."),
+}
+EVENT_SINK_GAUGES = {
+    "queue_depth": ("frontdesk_event_sink_queue_depth", "Events buffered and not yet written."),
+    "queue_high_water": ("frontdesk_event_sink_queue_high_water", "Deepest the event queue has been."),
+}
+
+
+class EventSinkCollector:
+    """Exports ``event_sink.snapshot()`` on every scrape; nothing while no sink runs."""
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        # Imported here: the events module itself imports this one.
+        from backend.app.services import events
+
+        sink = events.event_sink
+        if sink is None:
+            return
+        snapshot = sink.snapshot()
+        for field, (name, documentation) in EVENT_SINK_COUNTERS.items():
+            yield CounterMetricFamily(name, documentation, value=snapshot[field])
+        for field, (name, documentation) in EVENT_SINK_GAUGES.items():
+            yield GaugeMetricFamily(name, documentation, value=snapshot[field])
+        yield GaugeMetricFamily(
+            "frontdesk_event_sink_queue_capacity", "EVENT_QUEUE_MAX for the event queue.", value=sink.max_queue
+        )
+
+
+REGISTRY.register(EventSinkCollector())
+
+ADVISORY_WAITERS_SQL = """
+SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND NOT granted
+"""
+COMMIT_STATS_SQL = """
+SELECT COALESCE(sum(calls), 0) AS calls,
+       sum(total_exec_time) / NULLIF(sum(calls), 0) AS mean_ms
+FROM pg_stat_statements
+WHERE query ILIKE '%commit_reservation(%'
+"""
+
+
+def observe_latency(endpoint: str):
+    """Decorator recording an async handler's latency under ``endpoint``."""
+    histogram = REQUEST_LATENCY.labels(endpoint=endpoint)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            began = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(perf_counter() - began)
+
+        # Resolve string annotations against the handler's module so FastAPI does not
+        # look them up in this module's globals.
+        wrapper.__signature__ = inspect.signature(func, eval_str=True)
+        return wrapper
+
+    return decorator
+
+
+def observe_event(event_type: str, payload: dict[str, Any] | None) -> None:
+    """Count hold/commit outcomes from the events the handlers already emit."""
+    reason = str((payload or {}).get("reason", "none"))
+    if event_type == "hold.created":
+        HOLDS.labels(result="created", reason="none").inc()
+    elif event_type == "hold.conflict":
+        HOLDS.labels(result="conflict", reason=reason).inc()
+    elif event_type == "reservation.committed":
+        COMMITS.labels(result="committed", reason="none").inc()
+    elif event_type == "reservation.rejected":
+        COMMITS.labels(result="rejected", reason=reason).inc()
+
+
+def _sample_pool(name: str, engine) -> None:
+    pool = engine.sync_engine.pool
+    POOL_CHECKED_OUT.labels(engine=name).set(pool.checkedout())
+    POOL_CAPACITY.labels(engine=name).set(pool.size() + getattr(pool, "_max_overflow", 0))
+
+
+async def sample_database() -> None:
+    """Refresh the sampled gauges; each source fails independently."""
+    _sample_pool("primary", db_session.engine)
+    if db_session.replica_engine is not None:
+        _sample_pool("replica", db_session.replica_engine)
+    for shard, shard_engine in db_session.shard_engines.items():
+        if shard != db_session.DEFAULT_SHARD:
+            _sample_pool(f"shard:{shard}", shard_engine)
+
+    async with db_session.engine.connect() as conn:
+        ADVISORY_LOCK_WAITERS.set((await conn.execute(text(ADVISORY_WAITERS_SQL))).scalar_one())
+        try:
+            row = (await conn.execute(text(COMMIT_STATS_SQL))).one()
+        except Exception:
+            # pg_stat_statements missing from shared_preload_libraries or not readable.
+            await conn.rollback()
+            COMMIT_MEAN_MS.set(float("nan"))
+        else:
+            COMMIT_CALLS.set(row.calls)
+            COMMIT_MEAN_MS.set(row.mean_ms if row.mean_ms is not None else float("nan"))
+
+
+async def _sampler_loop() -> None:
+    while True:
+        try:
+            await sample_database()
+        except Exception:
+            logger.warning("Metrics sampling failed", exc_info=True)
+        await asyncio.sleep(settings.METRICS_SAMPLE_INTERVAL_SECONDS)
+
+
+_sampler_task: asyncio.Task | None = None
+
+
+async def start_metrics_sampler() -> None:
+    global _sampler_task
+    if _sampler_task is None:
+        _sampler_task = asyncio.create_task(_sampler_loop(), name="metrics-sampler")
+
+
+async def stop_metrics_sampler() -> None:
+    global _sampler_task
+    if _sampler_task is not None:
+        _sampler_task.cancel()
+        try:
+            await _sampler_task
+        except asyncio.CancelledError:
+            pass
+        _sampler_task = None
@@ -0,0 +1,137 @@
+"""Per-request profiling of SQL statements and Redis commands.
+
+:class:`ProfilingMiddleware` samples requests at ``PROFILE_SAMPLE_RATE`` and binds a
+:class:`RequestProfile` to a context variable. SQLAlchemy engine events and the
+Redis client wrapper record into whichever profile is bound, so attribution follows
+the request across awaits without passing anything through handlers. Finished
+profiles are kept in a bounded store of the slowest ``PROFILE_KEEP_SLOWEST``
+requests, served by ``GET /api/v1/debug/profiles``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.app.core.config import settings
+
+MAX_STATEMENT_CHARS = 500
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    status: int | None = None
+    duration_ms: float = 0.0
+    db_queries: int = 0
+    db_ms: float = 0.0
+    redis_calls: int = 0
+    redis_ms: float = 0.0
+    slowest_sql_ms: float = 0.0
+    slowest_sql: str | None = None
+
+    def record_sql(self, statement: str, elapsed_ms: float) -> None:
+        self.db_queries += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_sql_ms:
+            self.slowest_sql_ms = elapsed_ms
+            self.slowest_sql = " ".join(statement.split())[:MAX_STATEMENT_CHARS]
+
+    def record_redis(self, elapsed_ms: float) -> None:
+        self.redis_calls += 1
+        self.redis_ms += elapsed_ms
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+
+class ProfileStore:
+    """Keeps the ``keep`` slowest finished profiles."""
+
+    def __init__(self, keep: int) -> None:
+        self.keep = keep
+        self._heap: list[tuple[float, int, RequestProfile]] = []
+        self._counter = itertools.count()
+        self.sampled = 0
+
+    def add(self, profile: RequestProfile) -> None:
+        self.sampled += 1
+        entry = (profile.duration_ms, next(self._counter), profile)
+        if len(self._heap) < self.keep:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def slowest(self, limit: int | None = None) -> list[dict[str, Any]]:
+        ordered = sorted(self._heap, key=lambda entry: entry[0], reverse=True)
+        return [asdict(profile) for _, _, profile in ordered[:limit]]
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self.sampled = 0
+
+
+profile_store = ProfileStore(settings.PROFILE_KEEP_SLOWEST)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = current_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    if starts:
+        profile.record_sql(statement, (perf_counter() - starts.pop()) * 1000)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach statement timing hooks to an async engine (idempotent)."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a sample of HTTP requests."""
+
+    def __init__(self, app, sample_rate: float | None = None, store: ProfileStore | None = None) -> None:
+        self.app = app
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.store = store or profile_store
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(method=scope["method"], path=scope["path"])
+        token = current_profile.set(profile)
+        began = perf_counter()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (perf_counter() - began) * 1000
+            current_profile.reset(token)
+            self.store.add(profile)
@@ -0,0 +1,156 @@
+"""Token-bucket rate limiting in Redis for endpoints that fan out into Postgres.
+
+Each request spends one token from up to three buckets: the API client
+(``RATE_LIMIT_CLIENT_HEADER``, else the peer address), the caller's phone number
+when the payload carries one, and the restaurant. A single Lua call refills every
+bucket from Redis server time, and either spends from all of them or from none,
+so concurrent workers cannot overspend. Keys are hash-tagged with the restaurant
+id, so the script touches one cluster slot; client and phone limits therefore
+apply per restaurant.
+
+The guard runs as a route dependency ahead of the session dependency, so a throttled
+request is answered 429 with ``Retry-After`` before a pooled connection is taken.
+If Redis fails, requests are let through.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+
+from fastapi import HTTPException, Request, status
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+from backend.app.core.metrics import RATE_LIMITED
+from backend.app.core.redis_client import restaurant_tag
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket hashes {tokens, ts}. ARGV: refill rate (tokens/ms) and burst per key.
+# Returns {0, 0} when a token was spent from every bucket, otherwise
+# {milliseconds until the emptiest bucket has a token, its 1-based index}.
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local levels = {}
+local wait, limiting = 0, 0
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local level = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  level = math.min(burst, level + math.max(0, now - ts) * rate)
+  levels[i] = level
+  if level < 1 then
+    local needed = math.ceil((1 - level) / rate)
+    if needed > wait then
+      wait, limiting = needed, i
+    end
+  end
+end
+if wait > 0 then
+  return {wait, limiting}
+end
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil(burst / rate))
+end
+return {0, 0}
+"""
+
+_script = None
+_script_client = None
+
+
+def _token_bucket():
+    global _script, _script_client
+    if _script_client is not redis_module.redis_client:
+        _script = redis_module.redis_client.register_script(TOKEN_BUCKET_LUA)
+        _script_client = redis_module.redis_client
+    return _script
+
+
+def _buckets(
+    scope: str, restaurant_id: str, client_id: str, phone: str | None
+) -> list[tuple[str, str, int, int]]:
+    """(name, key, per_minute, burst) for every bucket this request spends from."""
+    prefix = f"ratelimit:{restaurant_tag(restaurant_id)}:{scope}"
+    buckets = [
+        (
+            "client",
+            f"{prefix}:client:{client_id}",
+            settings.RATE_LIMIT_CLIENT_PER_MINUTE,
+            settings.RATE_LIMIT_CLIENT_BURST,
+        )
+    ]
+    if phone:
+        buckets.append(
+            (
+                "phone",
+                f"{prefix}:phone:{phone}",
+                settings.RATE_LIMIT_PHONE_PER_MINUTE,
+                settings.RATE_LIMIT_PHONE_BURST,
+            )
+        )
+    buckets.append(
+        (
+            "restaurant",
+            f"{prefix}:restaurant",
+            settings.RATE_LIMIT_RESTAURANT_PER_MINUTE,
+            settings.RATE_LIMIT_RESTAURANT_BURST,
+        )
+    )
+    return buckets
+
+
+async def take_token(
+    scope: str, restaurant_id: str, client_id: str, phone: str | None = None
+) -> tuple[int, str | None]:
+    """Spend one token from every bucket; returns (retry_after_ms, limiting bucket) when throttled."""
+    buckets = _buckets(scope, restaurant_id, client_id, phone)
+    args: list[float] = []
+    for _, _, per_minute, burst in buckets:
+        args.extend((per_minute / 60_000, burst))
+    wait_ms, limiting = await _token_bucket()(keys=[key for _, key, _, _ in buckets], args=args)
+    if not wait_ms:
+        return 0, None
+    return int(wait_ms), buckets[int(limiting) - 1][0]
+
+
+def rate_limit(scope: str):
+    """FastAPI dependency that answers 429 + Retry-After once any bucket is empty."""
+
+    async def guard(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED or redis_module.redis_client is None:
+            return
+        try:
+            body = await request.json()
+        except ValueError:
+            return  # malformed bodies are rejected by validation, not here
+        if not isinstance(body, dict) or not isinstance(body.get("restaurant_id"), str):
+            return
+
+        client_id = request.headers.get(settings.RATE_LIMIT_CLIENT_HEADER) or (
+            request.client.host if request.client else "unknown"
+        )
+        phone = body.get("caller_phone") if isinstance(body.get("caller_phone"), str) else None
+        try:
+            wait_ms, limiting = await take_token(scope, body["restaurant_id"], client_id, phone)
+        except Exception:
+            logger.warning("Rate limiter unavailable; allowing request", exc_info=True)
+            return
+        if limiting is None:
+            return
+
+        RATE_LIMITED.labels(scope=scope, bucket=limiting).inc()
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": "Rate limit exceeded", "limit": limiting},
+            headers={"Retry-After": str(max(1, math.ceil(wait_ms / 1000)))},
+        )
+
+    return guard
@@ -1,18 +1,104 @@
+from datetime import datetime
+from time import perf_counter
+
 import redis.asyncio as redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from backend.app.core.config import settings
+from backend.app.core.profiling import current_profile
+
+
+class _ProfiledCommands:
+    """Reports each command round trip (or pipeline flush) to the active request profile."""
+
+    async def execute_command(self, *args, **options):
+        profile = current_profile.get()
+        if profile is None:
+            return await super().execute_command(*args, **options)
+        began = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            profile.record_redis((perf_counter() - began) * 1000)
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def profiled_execute(*exec_args, **exec_kwargs):
+            profile = current_profile.get()
+            if profile is None:
+                return await execute(*exec_args, **exec_kwargs)
+            began = perf_counter()
+            try:
+                return await execute(*exec_args, **exec_kwargs)
+            finally:
+                profile.record_redis((perf_counter() - began) * 1000)
+
+        pipe.execute = profiled_execute
+        return pipe
+
+
+class ProfiledRedis(_ProfiledCommands, redis.Redis):
+    """Standalone Redis client with request profiling."""
+
+
+class ProfiledRedisCluster(_ProfiledCommands, RedisCluster):
+    """Redis Cluster client with request profiling."""
 
 
-redis_client: redis.Redis | None = None
+redis_client: redis.Redis | RedisCluster | None = None
+
+
+def restaurant_tag(restaurant_id: str) -> str:
+    """Hash tag that pins every key of one restaurant to the same cluster slot."""
+    return f"{{{restaurant_id}}}"
+
+
+def hold_key(restaurant_id: str, start_utc: datetime, end_utc: datetime) -> str:
+    """Redis key of the set of short-lived holds on one slot, e.g. ``hold:{<rid>}:202511060000:202511060130``."""
+    return (
+        f"hold:{restaurant_tag(restaurant_id)}:"
+        f"{start_utc.strftime('%Y%m%d%H%M')}:"
+        f"{end_utc.strftime('%Y%m%d%H%M')}"
+    )
+
+
+def booking_version_key(restaurant_id: str) -> str:
+    """Counter bumped on every committed reservation; keys the availability grid cache."""
+    return f"booking_version:{restaurant_tag(restaurant_id)}"
+
+
+def client_options() -> dict:
+    """Pool, timeout, and retry settings shared by the standalone and cluster clients."""
+    return {
+        "decode_responses": True,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        "retry": Retry(
+            ExponentialBackoff(
+                cap=settings.REDIS_RETRY_BACKOFF_CAP_SECONDS,
+                base=settings.REDIS_RETRY_BACKOFF_BASE_SECONDS,
+            ),
+            settings.REDIS_RETRY_ATTEMPTS,
+        ),
+        "retry_on_error": [RedisConnectionError, RedisTimeoutError],
+    }
 
 
 async def init_redis() -> None:
-    """Initialise a shared Redis connection."""
+    """Initialise a shared Redis connection (a cluster client when REDIS_CLUSTER_MODE is set)."""
     global redis_client
-    redis_client = redis.from_url(
-        settings.REDIS_URL,
-        decode_responses=True,
-    )
+    if not settings.REDIS_URL:
+        raise RuntimeError("REDIS_URL is not set")
+    client_class = ProfiledRedisCluster if settings.REDIS_CLUSTER_MODE else ProfiledRedis
+    redis_client = client_class.from_url(settings.REDIS_URL, **client_options())
 
 
 async def close_redis() -> None:
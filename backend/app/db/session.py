@@ -1,25 +1,305 @@
+import asyncio
+import logging
 from collections.abc import AsyncGenerator
+from time import monotonic
+from uuid import UUID
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from backend.app.core.config import settings
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+logger = logging.getLogger(__name__)
+
+# Engines are created on first use (or by init_engine() in the app lifespan) so that
+# importing this module needs no database URL and opens no pool.
+engine: AsyncEngine
+SessionLocal: async_sessionmaker[AsyncSession]
+# Optional streaming replica for availability reads (DATABASE_REPLICA_URL).
+replica_engine: AsyncEngine | None
+ReplicaSessionLocal: async_sessionmaker[AsyncSession] | None
+# Tenant shards by name (DATABASE_SHARDS), each with its own pool. The primary is
+# DEFAULT_SHARD and also holds the restaurant -> shard map.
+shard_engines: dict[str, AsyncEngine]
+ShardSessions: dict[str, async_sessionmaker[AsyncSession]]
+
+DEFAULT_SHARD = "default"
+
+_LAZY_ATTRIBUTES = (
+    "engine",
+    "SessionLocal",
+    "replica_engine",
+    "ReplicaSessionLocal",
+    "shard_engines",
+    "ShardSessions",
 )
 
-SessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10,
+    )
+
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
+def init_engine() -> None:
+    """Create the primary, replica and shard engines that are configured (idempotent)."""
+    global engine, SessionLocal, replica_engine, ReplicaSessionLocal, shard_engines, ShardSessions
+    if "engine" in globals():
+        return
+    if not settings.DATABASE_URL:
+        raise RuntimeError("DATABASE_URL is not set")
+    if DEFAULT_SHARD in settings.DATABASE_SHARDS:
+        raise RuntimeError(f"DATABASE_SHARDS must not redefine the {DEFAULT_SHARD!r} shard")
+
+    primary = _create_engine(settings.DATABASE_URL)
+    replica_engine = None
+    ReplicaSessionLocal = None
+    if settings.DATABASE_REPLICA_URL:
+        replica_engine = _create_engine(settings.DATABASE_REPLICA_URL)
+        ReplicaSessionLocal = _sessionmaker(replica_engine)
+    SessionLocal = _sessionmaker(primary)
+    shard_engines = {DEFAULT_SHARD: primary}
+    ShardSessions = {DEFAULT_SHARD: SessionLocal}
+    for name, url in settings.DATABASE_SHARDS.items():
+        shard_engines[name] = _create_engine(url)
+        ShardSessions[name] = _sessionmaker(shard_engines[name])
+    # Assigned last: its presence marks initialisation as complete.
+    engine = primary
+
+
+async def close_engine() -> None:
+    """Dispose connection pools if the engines were created."""
+    if "engine" in globals():
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+        for name, shard_engine in shard_engines.items():
+            if name != DEFAULT_SHARD:
+                await shard_engine.dispose()
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        init_engine()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Seconds since the replica last replayed a transaction; zero when it has replayed
+# everything it received, so an idle primary does not look like lag. A server that
+# is not in recovery (e.g. a second standalone instance in development) reports zero.
+REPLICA_LAG_SQL = """
+SELECT CASE
+         WHEN NOT pg_is_in_recovery() THEN 0
+         WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+         ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+       END::float8 AS lag_seconds
+"""
+
+
+class ReplicaLagMonitor:
+    """Polls replication lag and decides whether reads may use the replica."""
+
+    def __init__(self, *, max_lag: float, interval: float) -> None:
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag_seconds: float | None = None
+        self.checked_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def use_replica(self) -> bool:
+        """True only with a recent lag sample under ``max_lag``; unknown lag means primary."""
+        init_engine()
+        if replica_engine is None or self.lag_seconds is None or self.checked_at is None:
+            return False
+        if monotonic() - self.checked_at > self.interval * 3:
+            return False
+        return self.lag_seconds <= self.max_lag
+
+    async def refresh(self) -> float | None:
+        init_engine()
+        if replica_engine is None:
+            return None
+        try:
+            async with replica_engine.connect() as conn:
+                self.lag_seconds = (await conn.execute(text(REPLICA_LAG_SQL))).scalar_one()
+        except Exception:
+            logger.warning("Replica lag probe failed; routing reads to primary", exc_info=True)
+            self.lag_seconds = None
+        self.checked_at = monotonic()
+        return self.lag_seconds
+
+    async def start(self) -> None:
+        init_engine()
+        if replica_engine is not None and self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run(), name="replica-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+
+replica_monitor = ReplicaLagMonitor(
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
 )
 
 
+SHARD_MAP_SQL = """
+SELECT shard FROM restaurant_shard_map WHERE restaurant_id = :restaurant_id
+"""
+
+
+class ShardMap:
+    """restaurant_id -> shard name, read from the default shard and cached per worker.
+
+    A stale entry is safe for writes: a commit routed to a node the restaurant has
+    left finds its ``restaurant_moved`` tombstone under ``restaurant_write_fence()``,
+    drops the entry and asks the client to retry.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, str]] = {}
+
+    def cached(self, restaurant_id: str) -> str | None:
+        """The shard for ``restaurant_id`` when known without a query, else None."""
+        init_engine()
+        if len(shard_engines) == 1:
+            return DEFAULT_SHARD
+        restaurant_id = str(restaurant_id)
+        entry = self._entries.get(restaurant_id)
+        if entry is not None and entry[0] > monotonic():
+            return entry[1]
+        try:
+            UUID(restaurant_id)
+        except ValueError:
+            return DEFAULT_SHARD  # unknown restaurant; the default shard answers not found
+        return None
+
+    async def shard_for(self, restaurant_id: str) -> str:
+        shard = self.cached(restaurant_id)
+        if shard is not None:
+            return shard
+        restaurant_id = str(restaurant_id)
+        async with SessionLocal() as session:
+            shard = (
+                await session.execute(text(SHARD_MAP_SQL), {"restaurant_id": restaurant_id})
+            ).scalar_one_or_none() or DEFAULT_SHARD
+        if shard not in shard_engines:
+            raise RuntimeError(f"Restaurant {restaurant_id} is mapped to unconfigured shard {shard!r}")
+        self._entries[restaurant_id] = (monotonic() + self.ttl_seconds, shard)
+        return shard
+
+    def invalidate(self, restaurant_id: str | None = None) -> None:
+        """Drop one restaurant's entry, or every entry when no id is given."""
+        if restaurant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(restaurant_id), None)
+
+
+shard_map = ShardMap(ttl_seconds=settings.SHARD_MAP_CACHE_TTL_SECONDS)
+
+
+async def sessionmaker_for(restaurant_id: str) -> async_sessionmaker[AsyncSession]:
+    """Primary session factory of the shard that holds ``restaurant_id``."""
+    return ShardSessions[await shard_map.shard_for(restaurant_id)]
+
+
+async def request_restaurant_id(request: Request) -> str | None:
+    """``restaurant_id`` from the path, the query string or a JSON body, if any."""
+    restaurant_id = request.path_params.get("restaurant_id") or request.query_params.get("restaurant_id")
+    if restaurant_id is None and request.method in ("POST", "PUT", "PATCH"):
+        try:
+            body = await request.json()  # cached by Starlette for the endpoint's own parsing
+        except ValueError:
+            return None
+        if isinstance(body, dict) and isinstance(body.get("restaurant_id"), str):
+            restaurant_id = body["restaurant_id"]
+    return restaurant_id
+
+
+async def request_shard(request: Request) -> str:
+    """Shard of the request's ``restaurant_id``; the default shard when it has none."""
+    restaurant_id = await request_restaurant_id(request)
+    return await shard_map.shard_for(restaurant_id) if restaurant_id else DEFAULT_SHARD
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Yield a scoped AsyncSession for request handling."""
+    init_engine()
     async with SessionLocal() as session:
         yield session
+
+
+def read_sessionmaker(shard: str = DEFAULT_SHARD) -> tuple[async_sessionmaker[AsyncSession], bool]:
+    """Session factory for lag-tolerant reads and whether it points at the replica.
+
+    The replica follows the default shard only; other shards are read from their primary.
+    """
+    init_engine()
+    if shard != DEFAULT_SHARD:
+        return ShardSessions[shard], False
+    if ReplicaSessionLocal is not None and replica_monitor.use_replica():
+        return ReplicaSessionLocal, True
+    return SessionLocal, False
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session for lag-tolerant reads: the replica when healthy, else the primary.
+
+    ``session.info["replica"]`` tells callers whether a result must be re-checked on
+    the primary before acting on it.
+    """
+    factory, is_replica = read_sessionmaker()
+    async with factory() as session:
+        session.info["replica"] = is_replica
+        yield session
+
+
+async def get_shard_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """:func:`get_session` on the shard of the request's ``restaurant_id``.
+
+    The id is taken from the path, the query string or a JSON body; requests without
+    one use the default shard. ``session.info["shard"]`` names the shard.
+    """
+    shard = await request_shard(request)
+    async with ShardSessions[shard]() as session:
+        session.info["shard"] = shard
+        yield session
+
+
+async def get_shard_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """:func:`get_read_session` on the shard of the request's ``restaurant_id``."""
+    shard = await request_shard(request)
+    factory, is_replica = read_sessionmaker(shard)
+    async with factory() as session:
+        session.info["replica"] = is_replica
+        session.info["shard"] = shard
+        yield session
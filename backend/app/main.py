@@ -1,33 +1,94 @@
 from contextlib import asynccontextmanager
+from importlib import import_module
 
 from fastapi import FastAPI
 
 from backend.app.core.config import settings
+from backend.app.core.dependency_health import dependency_monitor
+from backend.app.core.loop_monitor import loop_monitor, report_runtime
+from backend.app.core.metrics import start_metrics_sampler, stop_metrics_sampler
+from backend.app.core.profiling import ProfilingMiddleware, instrument_engine
 from backend.app.core.redis_client import close_redis, init_redis
-import backend.app.routers.availability as availability
-import backend.app.routers.health as health
-import backend.app.routers.reservations as reservations
-import backend.app.routers.twilio_voice as twilio_voice
-import backend.app.routers.twilio_realtime as twilio_realtime
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    await init_redis()
-    try:
-        yield
-    finally:
-        await close_redis()
-
-
-app = FastAPI(
-    title="AI Front Desk API",
-    lifespan=lifespan,
-)
-
-app.include_router(health.router, prefix=settings.API_PREFIX)
-app.include_router(availability.router, prefix=settings.API_PREFIX)
-app.include_router(reservations.router, prefix=settings.API_PREFIX)
-app.include_router(twilio_voice.router)
-# Enable the realtime bridge when ready:
-app.include_router(twilio_realtime.router)
+from backend.app.db import session as db_session
+from backend.app.db.session import replica_monitor
+from backend.app.services.events import close_event_sink, init_event_sink
+from backend.app.services.schedule import start_schedule_listener, stop_schedule_listener
+
+# Router modules per deployment profile, imported only when mounted. Entries are
+# (module, mounted under API_PREFIX).
+PROFILE_ROUTERS: dict[str, tuple[tuple[str, bool], ...]] = {
+    "api": (
+        ("backend.app.routers.health", True),
+        ("backend.app.routers.debug", True),
+        ("backend.app.routers.availability", True),
+        ("backend.app.routers.reservations", True),
+        ("backend.app.routers.metrics", False),
+    ),
+    "voice": (
+        ("backend.app.routers.health", True),
+        ("backend.app.routers.metrics", False),
+        ("backend.app.routers.twilio_voice", False),
+        ("backend.app.routers.twilio_realtime", False),
+    ),
+}
+PROFILE_ROUTERS["all"] = tuple(dict.fromkeys(PROFILE_ROUTERS["api"] + PROFILE_ROUTERS["voice"]))
+
+
+def _lifespan_for(profile: str):
+    serves_api = profile in ("api", "all")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        report_runtime()
+        await loop_monitor.start()
+        db_session.init_engine()
+        instrument_engine(db_session.engine)
+        if db_session.replica_engine is not None:
+            instrument_engine(db_session.replica_engine)
+        for shard_engine in db_session.shard_engines.values():
+            instrument_engine(shard_engine)
+        await init_redis()
+        await init_event_sink()
+        await dependency_monitor.start()
+        if serves_api:
+            await start_schedule_listener()
+            await replica_monitor.start()
+        await start_metrics_sampler()
+        try:
+            yield
+        finally:
+            await stop_metrics_sampler()
+            if serves_api:
+                await replica_monitor.stop()
+                await stop_schedule_listener()
+            await dependency_monitor.stop()
+            await close_event_sink()
+            await close_redis()
+            await db_session.close_engine()
+            await loop_monitor.stop()
+
+    return lifespan
+
+
+def create_app(profile: str = "all") -> FastAPI:
+    """Build the app with only the routers (and their imports) a profile needs."""
+    if profile not in PROFILE_ROUTERS:
+        raise ValueError(f"Unknown app profile: {profile}")
+
+    app = FastAPI(
+        title="AI Front Desk API",
+        lifespan=_lifespan_for(profile),
+    )
+    app.state.profile = profile
+    app.add_middleware(ProfilingMiddleware)
+
+    for module_name, prefixed in PROFILE_ROUTERS[profile]:
+        router = import_module(module_name).router
+        if prefixed:
+            app.include_router(router, prefix=settings.API_PREFIX)
+        else:
+            app.include_router(router)
+    return app
+
+
+app = create_app(settings.APP_PROFILE)
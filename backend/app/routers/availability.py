@@ -1,108 +1,56 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta, timezone
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core import redis_client as redis_module
-from backend.app.db.session import get_session
-from backend.app.routers.schemas import AvailabilityCheckIn, AvailabilityCheckOut
+from backend.app.core.config import settings
+from backend.app.core.dependency_health import POSTGRES, REDIS, require_dependencies
+from backend.app.core.metrics import ALTERNATES_CHECKED, observe_latency
+from backend.app.core.rate_limit import rate_limit
+from backend.app.core.redis_client import hold_key as make_hold_key
+from backend.app.db.session import get_shard_read_session, get_shard_session, read_sessionmaker, shard_map
+from backend.app.routers.schemas import (
+    AvailabilityCheckIn,
+    AvailabilityCheckOut,
+    AvailabilityGridOut,
+    AvailabilityGridSlot,
+    AvailabilitySearchIn,
+    AvailabilitySearchOut,
+    AvailabilitySearchSlot,
+)
+from backend.app.services import availability_grid, holds, seating
+from backend.app.services.events import emit_event
+from backend.app.services.reservations import capacity_summary, free_parties
+from backend.app.services.schedule import CompiledSchedule, schedule_cache
 
-HOLD_TTL_SECONDS = 300
 MAX_ALT_SEARCH = 32
 ALT_LOOKAHEAD = 4
+ALT_HORIZON = timedelta(hours=24)
+SEARCH_STEP = timedelta(minutes=15)
 
-router = APIRouter()
-
-
-def _slot_key(start_utc: datetime, end_utc: datetime, restaurant_id: str, party_size: int) -> str:
-    return (
-        f"hold:{restaurant_id}:"
-        f"{start_utc.strftime('%Y%m%d%H%M')}:"
-        f"{end_utc.strftime('%Y%m%d%H%M')}:"
-        f"{party_size}"
-    )
-
+logger = logging.getLogger(__name__)
 
-async def _capacity_summary(
-    session: AsyncSession,
-    restaurant_id: str,
-    start_utc: datetime,
-    end_utc: datetime,
-) -> tuple[dict | None, dict]:
-    params = {
-        "restaurant_id": restaurant_id,
-        "start_ts": start_utc,
-        "end_ts": end_utc,
-    }
-    cap_row = await session.execute(
-        text(
-            """
-            SELECT max_covers, max_parties
-            FROM capacity_rule
-            WHERE restaurant_id = :restaurant_id
-              AND tstzrange(start_ts, end_ts, '[)') && tstzrange(:start_ts, :end_ts, '[)')
-            ORDER BY start_ts DESC
-            LIMIT 1
-            """
-        ),
-        params,
-    )
-    capacity = cap_row.mappings().one_or_none()
-
-    summary_row = await session.execute(
-        text(
-            """
-            SELECT COALESCE(SUM(party_size), 0) AS covers,
-                   COUNT(*) AS parties
-            FROM reservation
-            WHERE restaurant_id = :restaurant_id
-              AND status = 'confirmed'
-              AND tstzrange(start_ts, end_ts, '[)') && tstzrange(:start_ts, :end_ts, '[)')
-            """
-        ),
-        params,
-    )
-    usage = summary_row.mappings().one()
-    return capacity, usage
+router = APIRouter()
 
 
-async def _slot_available(
+async def _slot_room(
     session: AsyncSession,
     restaurant_id: str,
     start_utc: datetime,
     end_utc: datetime,
     requested_party: int,
-) -> bool:
-    capacity, usage = await _capacity_summary(session, restaurant_id, start_utc, end_utc)
+) -> int:
+    """Parties the slot still has room for, ignoring holds (0 without a capacity rule)."""
+    capacity, usage = await capacity_summary(session, restaurant_id, start_utc, end_utc)
     if capacity is None:
-        return False
-
-    covers = usage["covers"] + requested_party
-    parties = usage["parties"] + 1
-    if covers > capacity["max_covers"] or parties > capacity["max_parties"]:
-        return False
-
-    existing = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM reservation
-            WHERE restaurant_id = :restaurant_id
-              AND slot_id = :slot_id
-              AND shard = 'A'
-            LIMIT 1
-            """
-        ),
-        {
-            "restaurant_id": restaurant_id,
-            "slot_id": f"{start_utc.strftime('%Y%m%d%H%M')}-{end_utc.strftime('%Y%m%d%H%M')}",
-        },
-    )
-    return existing.first() is None
+        return 0
+    return free_parties(capacity, usage, requested_party)
 
 
 async def _build_alternates(
@@ -111,23 +59,52 @@ async def _build_alternates(
     start_utc: datetime,
     duration: timedelta,
     party_size: int,
+    schedule: CompiledSchedule | None = None,
+    plan: seating.SeatingPlan | None = None,
 ) -> list[str]:
     alts: list[str] = []
     cursor = start_utc
+    horizon = start_utc + ALT_HORIZON
     checked = 0
-    while len(alts) < ALT_LOOKAHEAD and checked < MAX_ALT_SEARCH:
-        cursor += timedelta(minutes=15)
-        checked += 1
+    # Bit k-1 is set when some table (or combination) seats the party at candidate k.
+    table_open = (
+        plan.open_slots(party_size, start_utc + seating.BUCKET, duration, ALT_HORIZON // seating.BUCKET)
+        if plan is not None
+        else None
+    )
+    step = 0
+    while len(alts) < ALT_LOOKAHEAD and checked < MAX_ALT_SEARCH and cursor < horizon:
+        cursor += seating.BUCKET
+        step += 1
         alt_end = cursor + duration
-        if await _slot_available(session, restaurant_id, cursor, alt_end, party_size):
+        # Closed candidates are rejected from the compiled schedule and cost no query.
+        if schedule is not None and not schedule.is_open(cursor, alt_end):
+            continue
+        # So are candidates with no free table, from the floor-plan bitsets.
+        if table_open is not None and not (table_open >> (step - 1)) & 1:
+            continue
+        checked += 1
+        if await _slot_room(session, restaurant_id, cursor, alt_end, party_size):
             alts.append(cursor.isoformat())
+    ALTERNATES_CHECKED.observe(checked)
     return alts
 
 
-@router.post("/availability/check", response_model=AvailabilityCheckOut)
+@router.post(
+    "/availability/check",
+    response_model=AvailabilityCheckOut,
+    # Both guards run before the session dependencies, so rejected requests never touch
+    # the pool; throttling goes first since the dependency guard may look up the shard.
+    dependencies=[
+        Depends(rate_limit("availability_check")),
+        Depends(require_dependencies(POSTGRES, REDIS)),
+    ],
+)
+@observe_latency("check_availability")
 async def check_availability(
     payload: AvailabilityCheckIn,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_shard_session),
+    read_session: AsyncSession = Depends(get_shard_read_session),
 ) -> AvailabilityCheckOut:
     if payload.start_ts.tzinfo is None or payload.start_ts.tzinfo.utcoffset(payload.start_ts) is None:
         raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start_ts must include timezone information")
@@ -141,37 +118,59 @@ async def check_availability(
     start_utc = payload.start_ts.astimezone(timezone.utc)
     end_utc = end_ts.astimezone(timezone.utc)
 
-    capacity, usage = await _capacity_summary(session, payload.restaurant_id, start_utc, end_utc)
+    schedule = await schedule_cache.get(payload.restaurant_id)
+    plan = None
+    floor = await seating.load_floor(read_session, payload.restaurant_id)
+    if floor is not None:
+        # One occupancy read covers the requested slot and every alternate candidate.
+        plan = await seating.load_plan(
+            read_session, floor, payload.restaurant_id, start_utc, start_utc + ALT_HORIZON + duration
+        )
+
+    if schedule is not None and not schedule.is_open(start_utc, end_utc):
+        alternates = await _build_alternates(
+            read_session, payload.restaurant_id, start_utc, duration, payload.party_size, schedule, plan
+        )
+        emit_event(
+            "hold.conflict",
+            payload.restaurant_id,
+            {"reason": "closed", "start_ts": start_utc, "party_size": payload.party_size},
+        )
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Restaurant closed",
+                "alternates": alternates,
+            },
+        )
+
+    capacity, usage = await capacity_summary(read_session, payload.restaurant_id, start_utc, end_utc)
     if capacity is None:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="No capacity rule configured for slot")
 
-    projected_covers = usage["covers"] + payload.party_size
-    projected_parties = usage["parties"] + 1
-    slot_id = f"{start_utc.strftime('%Y%m%d%H%M')}-{end_utc.strftime('%Y%m%d%H%M')}"
-    hold_key = _slot_key(start_utc, end_utc, payload.restaurant_id, payload.party_size)
-
-    existing_hold = await redis_module.redis_client.exists(hold_key)
-    existing_reservation = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM reservation
-            WHERE restaurant_id = :restaurant_id
-              AND slot_id = :slot_id
-              AND shard = 'A'
-            LIMIT 1
-            """
-        ),
-        {"restaurant_id": payload.restaurant_id, "slot_id": slot_id},
-    )
+    # Live holds count against the slot's free parties, whatever their party size.
+    hold_key = make_hold_key(payload.restaurant_id, start_utc, end_utc)
+    held = await holds.live(hold_key)
+    room = free_parties(capacity, usage, payload.party_size)
+    available = room > held
+    if available and plan is not None:
+        available = plan.best_fit(payload.party_size, start_utc, end_utc) is not None
 
-    if (
-        projected_covers > capacity["max_covers"]
-        or projected_parties > capacity["max_parties"]
-        or existing_hold
-        or existing_reservation.first() is not None
-    ):
-        alternates = await _build_alternates(session, payload.restaurant_id, start_utc, duration, payload.party_size)
+    if available and read_session.info.get("replica"):
+        # The replica may trail the primary; confirm there before granting a hold.
+        capacity, usage = await capacity_summary(session, payload.restaurant_id, start_utc, end_utc)
+        room = 0 if capacity is None else free_parties(capacity, usage, payload.party_size)
+        available = room > held
+
+    if not available:
+        alternates = await _build_alternates(
+            read_session, payload.restaurant_id, start_utc, duration, payload.party_size, schedule, plan
+        )
+        emit_event(
+            "hold.conflict",
+            payload.restaurant_id,
+            {"reason": "unavailable", "start_ts": start_utc, "party_size": payload.party_size},
+        )
         raise HTTPException(
             status.HTTP_409_CONFLICT,
             detail={
@@ -181,15 +180,16 @@ async def check_availability(
         )
 
     hold_id = str(uuid4())
-    hold_result = await redis_module.redis_client.set(
-        hold_key,
-        hold_id,
-        nx=True,
-        px=HOLD_TTL_SECONDS * 1000,
-    )
-
-    if not hold_result:
-        alternates = await _build_alternates(session, payload.restaurant_id, start_utc, duration, payload.party_size)
+    # Holds taken since the count above may have used up the room; re-checked atomically.
+    if not await holds.acquire(hold_key, hold_id, limit=room):
+        alternates = await _build_alternates(
+            read_session, payload.restaurant_id, start_utc, duration, payload.party_size, schedule, plan
+        )
+        emit_event(
+            "hold.conflict",
+            payload.restaurant_id,
+            {"reason": "held", "start_ts": start_utc, "party_size": payload.party_size},
+        )
         raise HTTPException(
             status.HTTP_409_CONFLICT,
             detail={
@@ -198,11 +198,196 @@ async def check_availability(
             },
         )
 
+    emit_event(
+        "hold.created",
+        payload.restaurant_id,
+        {"hold_id": hold_id, "start_ts": start_utc, "end_ts": end_utc, "party_size": payload.party_size},
+    )
+
     return AvailabilityCheckOut(
         hold_id=hold_id,
         restaurant_id=payload.restaurant_id,
         start_ts=start_utc,
         end_ts=end_utc,
         duration_minutes=payload.duration_minutes,
-        expires_in_seconds=HOLD_TTL_SECONDS,
+        expires_in_seconds=holds.HOLD_TTL_SECONDS,
+    )
+
+
+@router.get(
+    "/availability/grid",
+    response_model=AvailabilityGridOut,
+    dependencies=[Depends(require_dependencies(POSTGRES))],
+)
+@observe_latency("availability_grid")
+async def availability_grid_endpoint(
+    restaurant_id: str,
+    day: date,
+    party_size: int = Query(ge=1, le=50),
+    duration_minutes: int = Query(90, ge=15, le=240),
+    days: int = Query(1, ge=1, le=7),
+    session: AsyncSession = Depends(get_shard_read_session),
+) -> AvailabilityGridOut:
+    """Remaining capacity for every 15-minute start over ``days`` local days from ``day``.
+
+    Read-only: no holds are placed or checked. A cache hit costs one Redis GET (the
+    booking version) and no query. Grids read from the replica are served but not
+    cached: the replica may lag the version read just before, and a cached copy
+    would outlive that lag.
+    """
+    schedule = await schedule_cache.get(restaurant_id)
+    if schedule is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
+
+    version = await availability_grid.booking_version(restaurant_id)
+    # The shard is part of the key so a move never serves a grid read from the old shard.
+    cache_key = (restaurant_id, session.info["shard"], day, days, party_size, duration_minutes)
+    if version is not None:
+        cached = availability_grid.grid_cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+
+    start_utc = datetime.combine(day, time(0), tzinfo=schedule.tz).astimezone(timezone.utc)
+    end_utc = datetime.combine(day + timedelta(days=days), time(0), tzinfo=schedule.tz).astimezone(timezone.utc)
+    grid = await availability_grid.load_grid(
+        session,
+        restaurant_id,
+        start_utc,
+        (end_utc - start_utc) // seating.BUCKET,
+        timedelta(minutes=duration_minutes),
+        party_size,
+        schedule,
+    )
+    covers = grid.remaining_covers.tolist()
+    parties = grid.remaining_parties.tolist()
+    bookable = grid.bookable.tolist()
+    slots = [
+        AvailabilityGridSlot(
+            start_ts=grid.start(k),
+            remaining_covers=covers[k],
+            remaining_parties=parties[k],
+            bookable=bookable[k],
+        )
+        for k in range(len(covers))
+        if covers[k] >= 0
+    ]
+    result = AvailabilityGridOut(
+        restaurant_id=restaurant_id,
+        day=day,
+        days=days,
+        party_size=party_size,
+        duration_minutes=duration_minutes,
+        booking_version=version,
+        slots=slots,
+    )
+    if version is not None and not session.info["replica"]:
+        availability_grid.grid_cache.put(cache_key, version, result)
+    return result
+
+
+async def _search_restaurant(
+    restaurant_id: str,
+    start_utc: datetime,
+    last_start_utc: datetime,
+    duration: timedelta,
+    party_size: int,
+    limit: int,
+    found: list[tuple[datetime, str, datetime]],
+) -> None:
+    """Append open, unheld slots for one restaurant to ``found`` as they are confirmed.
+
+    Appending incrementally keeps slots found before the search deadline even if
+    the task is cancelled part-way through the window.
+    """
+    schedule = await schedule_cache.get(restaurant_id)
+    if schedule is None:
+        return
+    factory, _ = read_sessionmaker(await shard_map.shard_for(restaurant_id))
+    async with factory() as session:
+        cursor = start_utc
+        checked = 0
+        hits = 0
+        candidates: list[tuple[datetime, datetime, int]] = []
+        while cursor <= last_start_utc and hits < limit and checked < MAX_ALT_SEARCH:
+            slot_end = cursor + duration
+            if schedule.is_open(cursor, slot_end):
+                checked += 1
+                room = await _slot_room(session, restaurant_id, cursor, slot_end, party_size)
+                if room:
+                    candidates.append((cursor, slot_end, room))
+            cursor += SEARCH_STEP
+            # Count holds for a batch of candidates in one pipelined round trip; the
+            # hash-tagged keys all live on one cluster slot.
+            batch_full = len(candidates) >= limit - hits
+            if candidates and (batch_full or cursor > last_start_utc or checked >= MAX_ALT_SEARCH):
+                held = await holds.live_many(
+                    [make_hold_key(restaurant_id, slot_start, slot_end) for slot_start, slot_end, _ in candidates]
+                )
+                for (slot_start, slot_end, room), live in zip(candidates, held):
+                    if live < room and hits < limit:
+                        found.append((slot_start, restaurant_id, slot_end))
+                        hits += 1
+                candidates.clear()
+
+
+@router.post(
+    "/availability/search",
+    response_model=AvailabilitySearchOut,
+    dependencies=[Depends(require_dependencies(POSTGRES, REDIS))],
+)
+async def search_availability(payload: AvailabilitySearchIn) -> AvailabilitySearchOut:
+    """Earliest open slots across several restaurants, searched concurrently.
+
+    Each restaurant is scanned on its own pooled session, at most
+    ``SEARCH_MAX_CONCURRENCY`` at a time. Restaurants still running at
+    ``SEARCH_DEADLINE_SECONDS`` are cancelled and listed in ``incomplete``; slots
+    they had already found are kept. No holds are placed.
+    """
+    for value in (payload.window_start, payload.window_end):
+        if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="window_start and window_end must include timezone information",
+            )
+    if payload.window_end < payload.window_start:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="window_end must not precede window_start")
+
+    if redis_module.redis_client is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis unavailable")
+
+    start_utc = payload.window_start.astimezone(timezone.utc)
+    last_start_utc = payload.window_end.astimezone(timezone.utc)
+    duration = timedelta(minutes=payload.duration_minutes)
+    restaurant_ids = list(dict.fromkeys(payload.restaurant_ids))
+    preference = {restaurant_id: rank for rank, restaurant_id in enumerate(restaurant_ids)}
+
+    found: list[tuple[datetime, str, datetime]] = []
+    semaphore = asyncio.Semaphore(settings.SEARCH_MAX_CONCURRENCY)
+
+    async def search_one(restaurant_id: str) -> None:
+        async with semaphore:
+            await _search_restaurant(
+                restaurant_id, start_utc, last_start_utc, duration, payload.party_size, payload.limit, found
+            )
+
+    tasks = {asyncio.create_task(search_one(restaurant_id)): restaurant_id for restaurant_id in restaurant_ids}
+    done, pending = await asyncio.wait(tasks, timeout=settings.SEARCH_DEADLINE_SECONDS)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    incomplete = {tasks[task] for task in pending}
+    for task in done:
+        if task.exception() is not None:
+            logger.warning("Availability search failed for %s", tasks[task], exc_info=task.exception())
+            incomplete.add(tasks[task])
+
+    ranked = sorted(found, key=lambda slot: (slot[0], preference[slot[1]]))[: payload.limit]
+    return AvailabilitySearchOut(
+        slots=[
+            AvailabilitySearchSlot(restaurant_id=restaurant_id, start_ts=slot_start, end_ts=slot_end)
+            for slot_start, restaurant_id, slot_end in ranked
+        ],
+        incomplete=sorted(incomplete, key=preference.__getitem__),
     )
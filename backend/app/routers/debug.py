@@ -0,0 +1,31 @@
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from backend.app.core.config import settings
+from backend.app.core.profiling import profile_store
+
+
+router = APIRouter()
+
+
+def _require_debug_token(token: str | None) -> None:
+    # Without a configured token the debug surface does not exist.
+    if not settings.DEBUG_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not secrets.compare_digest(token, settings.DEBUG_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+@router.get("/debug/profiles")
+async def debug_profiles(
+    limit: int = Query(20, ge=1, le=500),
+    x_debug_token: str | None = Header(None),
+) -> dict:
+    """Slowest sampled requests with query counts, DB/Redis time and slowest statement."""
+    _require_debug_token(x_debug_token)
+    return {
+        "sample_rate": settings.PROFILE_SAMPLE_RATE,
+        "sampled": profile_store.sampled,
+        "profiles": profile_store.slowest(limit),
+    }
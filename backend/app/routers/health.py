@@ -1,9 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException
 
-from backend.app.core import redis_client as redis_module
-from backend.app.db.session import get_session
+from backend.app.core.config import settings
+from backend.app.core.dependency_health import dependency_monitor
 
 
 router = APIRouter()
@@ -16,15 +14,23 @@ async def healthz() -> dict[str, bool]:
 
 
 @router.get("/readiness")
-async def readiness(session: AsyncSession = Depends(get_session)) -> dict[str, bool]:
-    """Ensure Postgres and Redis are reachable."""
-    if redis_module.redis_client is None:
-        raise HTTPException(status_code=503, detail="Redis unavailable")
-
-    await session.execute(text("SELECT 1"))
-    try:
-        await redis_module.redis_client.ping()
-    except Exception as exc:  # pragma: no cover - defensive guard
-        raise HTTPException(status_code=503, detail="Redis unavailable") from exc
-
+async def readiness() -> dict[str, bool]:
+    """Report Postgres and Redis reachability from the background monitor's last probes.
+
+    Before the monitor has run (e.g. an app served without its lifespan) both
+    dependencies are probed inline once.
+    """
+    if not dependency_monitor.has_state:
+        await dependency_monitor.probe_all()
+
+    down = [name for name, result in dependency_monitor.results.items() if not result.healthy]
+    if down:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "ready": False,
+                "unavailable": {name: dependency_monitor.results[name].error for name in sorted(down)},
+            },
+            headers={"Retry-After": str(settings.BREAKER_RETRY_AFTER_SECONDS)},
+        )
     return {"ready": True}
@@ -1,28 +1,138 @@
-from datetime import timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Literal
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from asyncpg import exceptions as asyncpg_exc
 
 from backend.app.core import redis_client as redis_module
-from backend.app.db.session import get_session
-from backend.app.routers.schemas import CommitReservationIn, CommitReservationOut
-from backend.app.services.reservations import commit_reservation as commit_reservation_service
+from backend.app.core.dependency_health import POSTGRES, REDIS, require_dependencies
+from backend.app.core.metrics import observe_latency
+from backend.app.core.redis_client import hold_key as make_hold_key
+from backend.app.db.session import get_shard_read_session, get_shard_session, read_sessionmaker, shard_map
+from backend.app.routers.schemas import (
+    CommitReservationIn,
+    CommitReservationOut,
+    ReservationOut,
+    ReservationPage,
+)
+from backend.app.services import holds, idempotency
+from backend.app.services.availability_grid import bump_booking_version
+from backend.app.services.events import emit_event
+from backend.app.services.reservations import (
+    COMMIT_CAPACITY_COVERS,
+    COMMIT_CAPACITY_PARTIES,
+    COMMIT_CLOSED,
+    COMMIT_MOVED,
+    COMMIT_NO_CAPACITY_RULE,
+    COMMIT_NO_TABLE,
+    COMMIT_SLOT_BOOKED,
+    capacity_summary,
+    commit_reservation as commit_reservation_service,
+    day_book_etag,
+    decode_cursor,
+    free_parties,
+    list_reservations,
+    stream_day_book_csv,
+    stream_day_book_ndjson,
+)
+from backend.app.services.schedule import schedule_cache
 
 
 router = APIRouter()
 
+IDEMPOTENCY_SCOPE = "commit"
 
-def _slot_key(start_utc: str, end_utc: str, restaurant_id: str, party_size: int) -> str:
-    return f"hold:{restaurant_id}:{start_utc}:{end_utc}:{party_size}"
+# try_commit_reservation() status code -> (HTTP status, detail)
+COMMIT_FAILURES: dict[str, tuple[int, str]] = {
+    COMMIT_SLOT_BOOKED: (status.HTTP_409_CONFLICT, "Slot already booked"),
+    COMMIT_CAPACITY_COVERS: (status.HTTP_409_CONFLICT, "Capacity exceeded"),
+    COMMIT_CAPACITY_PARTIES: (status.HTTP_409_CONFLICT, "Capacity exceeded"),
+    COMMIT_CLOSED: (status.HTTP_409_CONFLICT, "Restaurant closed"),
+    COMMIT_NO_CAPACITY_RULE: (status.HTTP_400_BAD_REQUEST, "No capacity rule configured for slot"),
+    COMMIT_NO_TABLE: (status.HTTP_409_CONFLICT, "No table available"),
+}
 
 
-@router.post("/reservations/commit", response_model=CommitReservationOut, status_code=status.HTTP_201_CREATED)
+def _emit_rejected(payload: CommitReservationIn, start_utc: datetime, reason: str) -> None:
+    emit_event(
+        "reservation.rejected",
+        payload.restaurant_id,
+        {"reason": reason, "start_ts": start_utc, "party_size": payload.party_size},
+    )
+
+
+@router.post(
+    "/reservations/commit",
+    response_model=CommitReservationOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_dependencies(POSTGRES, REDIS))],
+)
+@observe_latency("commit")
 async def commit_endpoint(
     payload: CommitReservationIn,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_shard_session),
+    idempotency_key: str | None = Header(None, max_length=idempotency.MAX_KEY_LENGTH),
 ) -> CommitReservationOut:
+    """Commit a held slot; with ``Idempotency-Key`` retries replay the first result."""
+    if idempotency_key is None:
+        return await _commit(payload, session)
+
+    if redis_module.redis_client is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis unavailable")
+
+    request_fingerprint = idempotency.fingerprint(payload.model_dump(mode="json"))
+    try:
+        stored = await idempotency.claim(IDEMPOTENCY_SCOPE, idempotency_key, request_fingerprint)
+    except idempotency.IdempotencyKeyReused as exc:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request",
+        ) from exc
+    except idempotency.IdempotencyInProgress as exc:
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if stored is not None:
+        return JSONResponse(
+            stored.body,
+            status_code=stored.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        result = await _commit(payload, session)
+    except HTTPException as exc:
+        # Business rejections are final for this request and replay as-is. Server
+        # errors and transient conflicts (those sent with Retry-After) release the
+        # key so a retry runs again.
+        if exc.status_code < 500 and "Retry-After" not in (exc.headers or {}):
+            await idempotency.complete(
+                IDEMPOTENCY_SCOPE, idempotency_key, request_fingerprint, exc.status_code, {"detail": exc.detail}
+            )
+        else:
+            await idempotency.release(IDEMPOTENCY_SCOPE, idempotency_key)
+        raise
+    except BaseException:
+        await idempotency.release(IDEMPOTENCY_SCOPE, idempotency_key)
+        raise
+
+    await idempotency.complete(
+        IDEMPOTENCY_SCOPE,
+        idempotency_key,
+        request_fingerprint,
+        status.HTTP_201_CREATED,
+        result.model_dump(mode="json"),
+    )
+    return result
+
+
+async def _commit(payload: CommitReservationIn, session: AsyncSession) -> CommitReservationOut:
     if payload.start_ts.tzinfo is None or payload.start_ts.tzinfo.utcoffset(payload.start_ts) is None:
         raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start_ts must include timezone information")
 
@@ -32,29 +142,36 @@ async def commit_endpoint(
     start_utc = payload.start_ts.astimezone(timezone.utc)
     end_utc = end_ts.astimezone(timezone.utc)
 
-    hold_key = _slot_key(
-        start_utc.strftime("%Y%m%d%H%M"),
-        end_utc.strftime("%Y%m%d%H%M"),
-        payload.restaurant_id,
-        payload.party_size,
-    )
+    schedule = await schedule_cache.get(payload.restaurant_id)
+    if schedule is not None and not schedule.is_open(start_utc, end_utc):
+        _emit_rejected(payload, start_utc, "Restaurant closed")
+        raise HTTPException(status.HTTP_409_CONFLICT, detail="Restaurant closed")
+
+    hold_key = make_hold_key(payload.restaurant_id, start_utc, end_utc)
 
     if redis_module.redis_client is None:
         raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis unavailable")
 
-    hold_acquired = await redis_module.redis_client.set(
-        hold_key,
-        "1",
-        nx=True,
-        px=300_000,
-    )
-
-    if not hold_acquired:
-        raise HTTPException(status.HTTP_409_CONFLICT, detail="Slot temporarily held by another request")
+    # The caller's own live hold, or a new hold on a slot nobody else holds, costs no
+    # query. Otherwise a transient hold is taken only while the other callers' holds
+    # leave room for one more party. The hold is consumed whatever the outcome.
+    hold_id = payload.hold_id or str(uuid4())
+    if not await holds.acquire(hold_key, hold_id, limit=1):
+        async with session.begin():
+            capacity, usage = await capacity_summary(session, payload.restaurant_id, start_utc, end_utc)
+        if capacity is not None and not await holds.acquire(
+            hold_key, hold_id, limit=free_parties(capacity, usage, payload.party_size)
+        ):
+            _emit_rejected(payload, start_utc, "Slot temporarily held by another request")
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                detail="Slot temporarily held by another request",
+                headers={"Retry-After": "1"},
+            )
 
     try:
         async with session.begin():
-            reservation_id = await commit_reservation_service(
+            result = await commit_reservation_service(
                 session,
                 restaurant_id=payload.restaurant_id,
                 name=payload.name,
@@ -67,20 +184,122 @@ async def commit_endpoint(
                 notes=payload.notes,
             )
     except DBAPIError as exc:
-        await redis_module.redis_client.delete(hold_key)
+        await holds.release(hold_key, hold_id)
         orig = getattr(exc, "orig", exc)
-        message = str(orig)
-        if isinstance(orig, asyncpg_exc.UniqueViolationError) or "Slot already booked" in message:
-            raise HTTPException(status.HTTP_409_CONFLICT, detail="Slot already booked") from exc
-        if "Capacity exceeded" in message:
-            raise HTTPException(status.HTTP_409_CONFLICT, detail="Capacity exceeded") from exc
-        if "No capacity rule" in message:
-            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="No capacity rule configured for slot") from exc
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error") from exc
-    except Exception as exc:
-        await redis_module.redis_client.delete(hold_key)
-        if isinstance(exc, asyncpg_exc.UniqueViolationError) or "Slot already booked" in str(exc):
-            raise HTTPException(status.HTTP_409_CONFLICT, detail="Slot already booked") from exc
+        if isinstance(orig, asyncpg_exc.UniqueViolationError):
+            code, detail = status.HTTP_409_CONFLICT, "Slot already booked"
+        elif isinstance(orig, asyncpg_exc.ExclusionViolationError):
+            # reservation_table_no_overlap: a writer that skipped the advisory locks.
+            code, detail = status.HTTP_409_CONFLICT, "No table available"
+        else:
+            code, detail = status.HTTP_500_INTERNAL_SERVER_ERROR, "Database error"
+        _emit_rejected(payload, start_utc, detail)
+        raise HTTPException(code, detail=detail) from exc
+    except Exception:
+        await holds.release(hold_key, hold_id)
         raise
 
-    return CommitReservationOut(id=reservation_id)
+    if not result.ok:
+        await holds.release(hold_key, hold_id)
+        if result.status == COMMIT_MOVED:
+            # Routed by a stale shard map entry; the retry goes to the new shard.
+            shard_map.invalidate(payload.restaurant_id)
+            _emit_rejected(payload, start_utc, "Restaurant moved shards")
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Restaurant moved to another database shard; retry",
+                headers={"Retry-After": "1"},
+            )
+        code, detail = COMMIT_FAILURES.get(
+            result.status,
+            (status.HTTP_500_INTERNAL_SERVER_ERROR, "Database error"),
+        )
+        _emit_rejected(payload, start_utc, detail)
+        raise HTTPException(code, detail=detail)
+    await holds.release(hold_key, hold_id)
+    reservation_id = result.reservation_id
+    # Cached availability grids for this restaurant are now stale.
+    await bump_booking_version(payload.restaurant_id)
+
+    emit_event(
+        "reservation.committed",
+        payload.restaurant_id,
+        {
+            "reservation_id": reservation_id,
+            "start_ts": start_utc,
+            "party_size": payload.party_size,
+            "source": payload.source,
+        },
+    )
+    return CommitReservationOut(id=reservation_id, tables=list(result.tables))
+
+
+@router.get("/reservations", response_model=ReservationPage)
+async def list_endpoint(
+    restaurant_id: str,
+    reservation_status: Literal["pending", "confirmed", "cancelled"] = Query("confirmed", alias="status"),
+    start_from: datetime | None = Query(None, alias="from"),
+    start_to: datetime | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_shard_read_session),
+) -> ReservationPage:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    rows, next_cursor = await list_reservations(
+        session,
+        restaurant_id=restaurant_id,
+        status=reservation_status,
+        start_from=start_from,
+        start_to=start_to,
+        after=after,
+        limit=limit,
+    )
+    items = [
+        ReservationOut(**{**row, "id": str(row["id"]), "restaurant_id": str(row["restaurant_id"])})
+        for row in rows
+    ]
+    return ReservationPage(items=items, next_cursor=next_cursor)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@router.get("/reservations/export")
+async def export_endpoint(
+    restaurant_id: str,
+    day: date,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    """Stream one local day of reservations; unchanged day books answer 304."""
+    schedule = await schedule_cache.get(restaurant_id)
+    if schedule is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
+
+    start_utc = datetime.combine(day, time(0), tzinfo=schedule.tz).astimezone(timezone.utc)
+    end_utc = datetime.combine(day + timedelta(days=1), time(0), tzinfo=schedule.tz).astimezone(timezone.utc)
+
+    factory, _ = read_sessionmaker(await shard_map.shard_for(restaurant_id))
+    async with factory() as session:
+        etag = await day_book_etag(session, restaurant_id, start_utc, end_utc)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if export_format == "csv":
+        body = stream_day_book_csv(factory, restaurant_id, start_utc, end_utc)
+        media_type = "text/csv"
+    else:
+        body = stream_day_book_ndjson(factory, restaurant_id, start_utc, end_utc)
+        media_type = "application/x-ndjson"
+    headers["Content-Disposition"] = f'attachment; filename="daybook-{restaurant_id}-{day.isoformat()}.{export_format}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel, Field
 
@@ -14,10 +14,13 @@ class CommitReservationIn(BaseModel):
     contact_phone: str | None = Field(default=None, max_length=32)
     contact_email: str | None = Field(default=None, max_length=254)
     notes: str | None = Field(default=None, max_length=1024)
+    # hold_id from /availability/check; the commit consumes that hold.
+    hold_id: str | None = Field(default=None, max_length=64)
 
 
 class CommitReservationOut(BaseModel):
     id: str
+    tables: list[str] = Field(default_factory=list)  # assigned table labels, if the restaurant has tables
 
 
 class AvailabilityCheckIn(BaseModel):
@@ -25,6 +28,8 @@ class AvailabilityCheckIn(BaseModel):
     party_size: int = Field(ge=1, le=50)
     start_ts: datetime
     duration_minutes: int = Field(ge=15, le=240)
+    # Caller ID from the voice channel; only used for per-caller rate limiting.
+    caller_phone: str | None = Field(default=None, max_length=32)
 
 
 class AvailabilityCheckOut(BaseModel):
@@ -34,3 +39,66 @@ class AvailabilityCheckOut(BaseModel):
     end_ts: datetime
     duration_minutes: int
     expires_in_seconds: int
+
+
+class ReservationOut(BaseModel):
+    id: str
+    restaurant_id: str
+    name: str
+    party_size: int
+    start_ts: datetime
+    end_ts: datetime
+    status: str
+    source: str
+    contact_phone: str | None = None
+    contact_email: str | None = None
+    notes: str | None = None
+    created_at: datetime
+
+
+class ReservationPage(BaseModel):
+    items: list[ReservationOut]
+    # Pass back as ?cursor= to fetch the next page; null on the last page.
+    next_cursor: str | None = None
+
+
+class AvailabilitySearchIn(BaseModel):
+    restaurant_ids: list[str] = Field(min_length=1, max_length=50)
+    party_size: int = Field(ge=1, le=50)
+    # Earliest and latest acceptable start times (timezone-aware).
+    window_start: datetime
+    window_end: datetime
+    duration_minutes: int = Field(ge=15, le=240)
+    limit: int = Field(default=10, ge=1, le=50)
+
+
+class AvailabilitySearchSlot(BaseModel):
+    restaurant_id: str
+    start_ts: datetime
+    end_ts: datetime
+
+
+class AvailabilitySearchOut(BaseModel):
+    slots: list[AvailabilitySearchSlot]
+    # Restaurants that missed the deadline or failed; their slots may be missing.
+    incomplete: list[str]
+
+
+class AvailabilityGridSlot(BaseModel):
+    start_ts: datetime
+    remaining_covers: int
+    remaining_parties: int
+    # Fits covers, parties, a slot shard, opening hours and (if any) a table for the party.
+    bookable: bool
+
+
+class AvailabilityGridOut(BaseModel):
+    restaurant_id: str
+    day: date
+    days: int
+    party_size: int
+    duration_minutes: int
+    # Per-restaurant counter bumped by every commit; null when Redis is unavailable.
+    booking_version: int | None = None
+    # Every 15-minute start covered by a capacity rule; holds are not considered.
+    slots: list[AvailabilityGridSlot]
@@ -5,9 +5,11 @@ import audioop
 from typing import Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from websockets.client import connect as ws_connect
 
 from backend.app.core.config import settings
+from backend.app.services import call_state
+from backend.app.services.call_state import CallState
+from backend.app.services.events import emit_event
 
 
 router = APIRouter()
@@ -21,6 +23,39 @@ def _b64d(s: str) -> bytes:
     return base64.b64decode(s.encode("ascii"))
 
 
+SESSION_CONFIG = {
+    "instructions": (
+        "You are the front-desk assistant for Demo Bistro. "
+        "Be concise, friendly, and confirm reservation details: date, time, party size, name, and phone."
+    ),
+    "voice": "verse",
+    # Caller transcripts are kept in the call snapshot so a resumed session has context.
+    "input_audio_transcription": {"model": "whisper-1"},
+}
+RESUME_INSTRUCTIONS = (
+    "The line dropped for a moment and the caller is back. Do not greet them again; "
+    "briefly pick up where the conversation left off."
+)
+
+
+def _transcript_item(role: str, text: str) -> dict:
+    content_type = "input_text" if role == "user" else "text"
+    return {
+        "type": "conversation.item.create",
+        "item": {"type": "message", "role": role, "content": [{"type": content_type, "text": text}]},
+    }
+
+
+async def _wait_for_start(websocket: WebSocket) -> Optional[dict]:
+    # Twilio sends "connected" then "start" before any media.
+    while True:
+        evt = json.loads(await websocket.receive_text())
+        if evt.get("event") == "start":
+            return evt
+        if evt.get("event") == "stop":
+            return None
+
+
 @router.websocket("/ws/twilio-stream")
 async def realtime_bridge(websocket: WebSocket) -> None:
     # Single WS used for Twilio Media Streams <-> OpenAI Realtime audio.
@@ -36,38 +71,64 @@ async def realtime_bridge(websocket: WebSocket) -> None:
         except WebSocketDisconnect:
             return
 
+    # Deferred so API-only workers never load the websockets client.
+    from websockets.client import connect as ws_connect
+
     url = f"wss://api.openai.com/v1/realtime?model={model}"
     headers = [("Authorization", f"Bearer {api_key}")]
 
-    # State for rate conversion and basic VAD
-    up_state: Optional[tuple] = None    # 8k -> 16k
-    down_state: Optional[tuple] = None  # 16k -> 8k
-
     # Naive VAD thresholds (tune live as needed)
     SILENCE_MS = 700
     MIN_SPEECH_MS = 1200
     RMS_THRESH = 200
 
+    import time
+    call_started_ts = time.monotonic()
+    try:
+        start_evt = await _wait_for_start(websocket)
+    except WebSocketDisconnect:
+        return
+    if start_evt is None:
+        return
+    start = start_evt.get("start") or {}
+    call_sid = start.get("callSid") or ""
+    stream_sid = start.get("streamSid") or start_evt.get("streamSid")
+
+    # A snapshot means this CallSid was live on another (or a restarted) worker.
+    state = await call_state.load(call_sid) if call_sid else None
+    resumed = state is not None
+    if state is None:
+        state = CallState(call_sid=call_sid, session=dict(SESSION_CONFIG))
+        caller = (start.get("customParameters") or {}).get("caller")
+        if caller:
+            state.booking["phone"] = caller
+    state.stream_sid = stream_sid
+    emit_event("call.resumed" if resumed else "call.started", None, {
+        "call_sid": call_sid,
+        "stream_sid": stream_sid,
+        "model": model,
+        "turns": state.turns,
+    })
+
     async with ws_connect(url, extra_headers=headers, max_size=None) as ai_ws:
-        # Session settings + greeting so the caller hears something immediately
-        await ai_ws.send(json.dumps({
-            "type": "session.update",
-            "session": {
-                "instructions": (
-                    "You are the front-desk assistant for Demo Bistro. "
-                    "Be concise, friendly, and confirm reservation details: date, time, party size, name, and phone."
-                ),
-                "voice": "verse"
-            }
-        }))
-        await ai_ws.send(json.dumps({"type": "response.create"}))
-
-        import time
+        await ai_ws.send(json.dumps({"type": "session.update", "session": state.session}))
+        if resumed:
+            for role, text in state.transcript:
+                await ai_ws.send(json.dumps(_transcript_item(role, text)))
+            await ai_ws.send(json.dumps({
+                "type": "response.create",
+                "response": {"instructions": RESUME_INSTRUCTIONS},
+            }))
+        else:
+            # Greeting so the caller hears something immediately
+            await ai_ws.send(json.dumps({"type": "response.create"}))
+        await call_state.save(state)
+
         last_voice_ts = time.monotonic()
         speech_started_ts: Optional[float] = None
 
         async def pump_twilio_to_ai():
-            nonlocal up_state, last_voice_ts, speech_started_ts
+            nonlocal last_voice_ts, speech_started_ts
             while True:
                 raw = await websocket.receive_text()
                 evt = json.loads(raw)
@@ -75,7 +136,7 @@ async def realtime_bridge(websocket: WebSocket) -> None:
                 if et == "media":
                     mulaw = _b64d(evt["media"]["payload"])
                     pcm16_8k = audioop.ulaw2lin(mulaw, 2)
-                    pcm16_16k, up_state = audioop.ratecv(pcm16_8k, 2, 1, 8000, 16000, up_state)
+                    pcm16_16k, state.up_state = audioop.ratecv(pcm16_8k, 2, 1, 8000, 16000, state.up_state)
                     await ai_ws.send(json.dumps({
                         "type": "input_audio_buffer.append",
                         "audio": _b64(pcm16_16k),
@@ -93,18 +154,32 @@ async def realtime_bridge(websocket: WebSocket) -> None:
                             await ai_ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
                             await ai_ws.send(json.dumps({"type": "response.create"}))
                             speech_started_ts = None
+                            # Caller turn boundary
+                            await call_state.save(state)
                 elif et == "stop":
-                    # Defensive finalize on stream end
+                    # Defensive finalize on stream end; the call is over, so nothing to resume.
                     await ai_ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
                     await ai_ws.send(json.dumps({"type": "response.create"}))
+                    await call_state.discard(call_sid)
 
         async def pump_ai_to_twilio():
-            nonlocal down_state
             async for raw in ai_ws:
                 try:
                     msg = json.loads(raw)
                 except Exception:
                     continue
+                mt = msg.get("type")
+                if mt == "conversation.item.input_audio_transcription.completed":
+                    state.add_turn("user", msg.get("transcript") or "")
+                    continue
+                if mt == "response.audio_transcript.done":
+                    state.add_turn("assistant", msg.get("transcript") or "")
+                    continue
+                if mt == "response.done":
+                    # Assistant turn boundary
+                    state.turns += 1
+                    await call_state.save(state)
+                    continue
                 # Extract audio payload(s) — formats vary slightly
                 audio_b64 = (
                     (msg.get("delta") or {}).get("audio")
@@ -113,10 +188,11 @@ async def realtime_bridge(websocket: WebSocket) -> None:
                 if not audio_b64:
                     continue
                 pcm16_16k = _b64d(audio_b64)
-                pcm16_8k, down_state = audioop.ratecv(pcm16_16k, 2, 1, 16000, 8000, down_state)
+                pcm16_8k, state.down_state = audioop.ratecv(pcm16_16k, 2, 1, 16000, 8000, state.down_state)
                 mulaw = audioop.lin2ulaw(pcm16_8k, 2)
                 await websocket.send_text(json.dumps({
                     "event": "media",
+                    "streamSid": state.stream_sid,
                     "media": {"payload": _b64(mulaw)},
                 }))
 
@@ -124,3 +200,9 @@ async def realtime_bridge(websocket: WebSocket) -> None:
             await asyncio.gather(pump_twilio_to_ai(), pump_ai_to_twilio())
         except WebSocketDisconnect:
             return
+        finally:
+            emit_event("call.ended", None, {
+                "call_sid": call_sid,
+                "duration_seconds": round(time.monotonic() - call_started_ts, 1),
+                "turns": state.turns,
+            })
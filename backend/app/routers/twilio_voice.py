@@ -1,32 +1,55 @@
-from fastapi import APIRouter, Response, Request, HTTPException
+from html import escape
 
+from fastapi import APIRouter, Response, Request, HTTPException, Query
 
-router = APIRouter()
-from twilio.request_validator import RequestValidator
 from backend.app.core.config import settings
+from backend.app.services import call_state
+
+
+router = APIRouter()
 
 
 @router.post("/twilio/voice", response_class=Response)
-async def twilio_voice_webhook(request: Request) -> Response:
-    """Validate Twilio signature and return TwiML <Connect><Stream>."""
+async def twilio_voice_webhook(request: Request, attempt: int = Query(0, ge=0)) -> Response:
+    """Validate Twilio signature and return TwiML <Connect><Stream>.
+
+    The <Redirect> only runs if the stream ends while the call is still up; Twilio
+    re-enters this webhook with the same CallSid and ``attempt`` counted up. The
+    stream is reconnected (and resumes from the call snapshot) only while a snapshot
+    exists, i.e. a bridge worker died mid-call, and at most
+    ``CALL_RESUME_MAX_ATTEMPTS`` times; otherwise the call is hung up.
+    """
     form = dict((await request.form()).items())
     token = settings.TWILIO_AUTH_TOKEN or ""
     if token:
         url = str(request.url)
         sig = request.headers.get("X-Twilio-Signature")
+        # Imported on first use: the Twilio SDK is heavy and only needed for signed webhooks.
+        from twilio.request_validator import RequestValidator
+
         validator = RequestValidator(token)
         valid = bool(sig and validator.validate(url, form, sig))
         # In dev (ngrok), allow through even if signature fails to ease testing.
         if not valid and not (settings.PUBLIC_BASE_URL and "ngrok" in settings.PUBLIC_BASE_URL):
             raise HTTPException(status_code=403, detail="Invalid signature")
 
+    if attempt:
+        call_sid = form.get("CallSid", "")
+        if attempt > settings.CALL_RESUME_MAX_ATTEMPTS or not await call_state.exists(call_sid):
+            await call_state.discard(call_sid)
+            return Response(content="<Response><Hangup/></Response>", media_type="application/xml")
+
     public_url = settings.PUBLIC_BASE_URL or str(request.base_url).rstrip('/')
     wss_url = public_url.replace('http://','wss://').replace('https://','wss://') + '/ws/twilio-stream'
+    caller = escape(form.get("From", ""))
     twiml = f"""
     <Response>
       <Connect>
-        <Stream url="{wss_url}"/>
+        <Stream url="{wss_url}">
+          <Parameter name="caller" value="{caller}"/>
+        </Stream>
       </Connect>
+      <Redirect method="POST">{escape(public_url)}/twilio/voice?attempt={attempt + 1}</Redirect>
     </Response>
     """.strip()
     return Response(content=twiml, media_type="application/xml")
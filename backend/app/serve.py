@@ -0,0 +1,65 @@
+"""Run the API under uvicorn with the event loop selected by ``LOOP_RUNTIME``.
+
+    python -m backend.app.serve --port 8000
+
+``uvloop`` pairs the libuv loop with the ``httptools`` HTTP parser; ``asyncio`` uses
+the standard library loop with ``h11``. ``auto`` prefers uvloop when installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+
+import uvicorn
+
+from backend.app.core.config import settings
+
+
+def resolve_runtime(requested: str) -> tuple[str, str]:
+    """Map LOOP_RUNTIME to uvicorn's (loop, http) implementation names."""
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    if requested == "uvloop" and not has_uvloop:
+        raise SystemExit("LOOP_RUNTIME=uvloop but uvloop is not installed")
+    if requested == "uvloop" or (requested == "auto" and has_uvloop):
+        http = "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+        return "uvloop", http
+    return "asyncio", "h11"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the front desk API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--runtime",
+        choices=("auto", "asyncio", "uvloop"),
+        default=settings.LOOP_RUNTIME,
+        help="overrides LOOP_RUNTIME",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=("api", "voice", "all"),
+        default=settings.APP_PROFILE,
+        help="routers to mount; overrides APP_PROFILE",
+    )
+    args = parser.parse_args()
+
+    loop, http = resolve_runtime(args.runtime)
+    # Workers re-read the environment; the in-process settings cover --workers 1.
+    os.environ["APP_PROFILE"] = settings.APP_PROFILE = args.profile
+    print(f"Starting uvicorn with loop={loop} http={http} profile={args.profile}", flush=True)
+    uvicorn.run(
+        "backend.app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Remaining capacity for every 15-minute start of a day or week, in one pass.
+
+Two queries load the window's capacity rules and non-cancelled reservations (as
+epoch microseconds). For a slot ``[s, s + d)`` a reservation ``[a, b)`` overlaps
+when ``a < s + d`` and ``b > s``, so with starts ``s_k = origin + k * 15min``:
+
+* ``a < s_k + d``  <=>  ``k >= floor((a - d) / 15min) + 1``
+* ``b <= s_k``     <=>  ``k >= ceil(b / 15min)``
+
+Each reservation adds its party size (and 1) at those two bucket indices. Cumulative
+sums give, for every start at once, the covers and parties of overlapping
+reservations, which is what ``capacity_summary`` counts for a single slot. Capacity
+rules, opening hours and table bitsets (``SeatingPlan.open_slots``) are applied the
+same way as index ranges and masks.
+
+Results are cached in process per restaurant, database shard and query, keyed on
+the restaurant's booking version: a Redis counter (``booking_version:{<rid>}``) that
+every committed reservation increments. The version is read before the grid, so a
+grid can only be newer than its version; grids built on a lagging replica are not
+cached. Capacity-rule, schedule and table edits do not bump it, and neither do
+cancellations, which the API has no path for and which are made in SQL (Postgres
+cannot reach Redis). They show up within ``GRID_CACHE_TTL_SECONDS``; a cancellation
+only frees capacity, so until then a cached grid under-reports, never over-reports.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Any, Hashable, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+from backend.app.core.redis_client import booking_version_key
+from backend.app.services import seating
+from backend.app.services.schedule import CompiledSchedule
+
+logger = logging.getLogger(__name__)
+
+BUCKET_US = seating.BUCKET_SECONDS * 1_000_000
+
+CAPACITY_RULES_SQL = """
+SELECT (extract(epoch FROM start_ts) * 1000000)::bigint AS start_us,
+       (extract(epoch FROM end_ts) * 1000000)::bigint AS end_us,
+       max_covers,
+       max_parties
+FROM capacity_rule
+WHERE restaurant_id = :restaurant_id
+  AND tstzrange(start_ts, end_ts, '[)') && tstzrange(:window_start, :window_end, '[)')
+ORDER BY start_ts
+"""
+# confirmed: counts toward covers/parties. Every non-cancelled row takes a shard of
+# its exact slot (reservation_slot_shard_uniq).
+BOOKINGS_SQL = """
+SELECT (extract(epoch FROM start_ts) * 1000000)::bigint AS start_us,
+       (extract(epoch FROM end_ts) * 1000000)::bigint AS end_us,
+       party_size,
+       (status = 'confirmed')::int AS confirmed
+FROM reservation
+WHERE restaurant_id = :restaurant_id
+  AND status <> 'cancelled'
+  AND slot_range && tstzrange(:window_start, :window_end, '[)')
+"""
+
+
+@dataclass(frozen=True)
+class Grid:
+    origin: datetime
+    # Per start k (origin + k * 15min); remaining_* are -1 where no capacity rule applies.
+    remaining_covers: np.ndarray
+    remaining_parties: np.ndarray
+    bookable: np.ndarray
+
+    def start(self, k: int) -> datetime:
+        return self.origin + k * seating.BUCKET
+
+
+def _epoch_us(ts: datetime) -> int:
+    return round(ts.timestamp() * 1_000_000)
+
+
+def _first_overlapping(start_us: np.ndarray | int, duration_us: int):
+    """Smallest k with ``start < origin + k * 15min + duration`` (origin-relative)."""
+    return (start_us - duration_us) // BUCKET_US + 1
+
+
+def _first_after(end_us: np.ndarray | int):
+    """Smallest k with ``end <= origin + k * 15min`` (origin-relative)."""
+    return -(-end_us // BUCKET_US)
+
+
+def _prefix_counts(first: np.ndarray, last: np.ndarray, weights: np.ndarray, count: int) -> np.ndarray:
+    """Sum of ``weights`` over rows with ``first <= k < last``, for every k in [0, count)."""
+    first = np.clip(first, 0, count)
+    last = np.clip(last, 0, count)
+    added = np.bincount(first, weights=weights, minlength=count + 1)
+    removed = np.bincount(last, weights=weights, minlength=count + 1)
+    return np.cumsum(added - removed)[:count].astype(np.int64)
+
+
+def _open_mask(schedule: CompiledSchedule, origin: datetime, count: int, duration: timedelta) -> np.ndarray:
+    """Starts whose whole slot fits one open interval (hours minus blackouts)."""
+    mask = np.zeros(count, dtype=bool)
+    origin_us = _epoch_us(origin)
+    duration_us = duration // timedelta(microseconds=1)
+    window_end = origin + count * seating.BUCKET + duration
+    for opens, closes in schedule.open_intervals(origin, window_end):
+        first = -(-(_epoch_us(opens) - origin_us) // BUCKET_US)
+        last = (_epoch_us(closes) - origin_us - duration_us) // BUCKET_US
+        if last >= first:
+            mask[max(first, 0) : min(last + 1, count)] = True
+    return mask
+
+
+def _bits(value: int, count: int) -> np.ndarray:
+    raw = np.frombuffer(value.to_bytes((count + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:count].astype(bool)
+
+
+def build_grid(
+    origin: datetime,
+    count: int,
+    duration: timedelta,
+    party_size: int,
+    rules: Sequence[Sequence[int]],
+    bookings: Sequence[Sequence[int]],
+    schedule: CompiledSchedule | None = None,
+    plan: seating.SeatingPlan | None = None,
+) -> Grid:
+    """Vectorized grid for ``count`` starts from ``origin``.
+
+    ``rules`` are ``(start_us, end_us, max_covers, max_parties)`` in start order (a
+    later overlapping rule wins, like the single-slot lookup); ``bookings`` are
+    ``(start_us, end_us, party_size, confirmed)`` rows of non-cancelled reservations.
+    """
+    origin_us = _epoch_us(origin)
+    duration_us = duration // timedelta(microseconds=1)
+
+    max_covers = np.full(count, -1, dtype=np.int64)
+    max_parties = np.full(count, -1, dtype=np.int64)
+    for start_us, end_us, covers, parties in rules:
+        first = max(_first_overlapping(start_us - origin_us, duration_us), 0)
+        last = min(_first_after(end_us - origin_us), count)
+        max_covers[first:last] = covers
+        max_parties[first:last] = parties
+
+    rows = np.asarray(bookings, dtype=np.int64).reshape(-1, 4)
+    starts = rows[:, 0] - origin_us
+    ends = rows[:, 1] - origin_us
+    confirmed = rows[:, 3].astype(bool)
+    first = _first_overlapping(starts[confirmed], duration_us)
+    last = _first_after(ends[confirmed])
+    covers = _prefix_counts(first, last, rows[confirmed, 2].astype(np.float64), count)
+    parties = _prefix_counts(first, last, np.ones(len(first)), count)
+
+    # Shards are per exact slot: same start bucket and the same duration.
+    exact = (rows[:, 1] - rows[:, 0] == duration_us) & (starts % BUCKET_US == 0)
+    exact_k = starts[exact] // BUCKET_US
+    exact_k = exact_k[(exact_k >= 0) & (exact_k < count)]
+    shards = np.bincount(exact_k, minlength=count)[:count]
+
+    has_rule = max_covers > 0
+    bookable = (
+        has_rule
+        & (covers + party_size <= max_covers)
+        & (parties + 1 <= max_parties)
+        & (shards < max_parties)
+    )
+    if schedule is not None:
+        bookable &= _open_mask(schedule, origin, count, duration)
+    if plan is not None:
+        bookable &= _bits(plan.open_slots(party_size, origin, duration, count), count)
+
+    return Grid(
+        origin=origin,
+        remaining_covers=np.where(has_rule, np.maximum(max_covers - covers, 0), -1),
+        remaining_parties=np.where(has_rule, np.maximum(max_parties - parties, 0), -1),
+        bookable=bookable,
+    )
+
+
+async def load_grid(
+    session: AsyncSession,
+    restaurant_id: str,
+    origin: datetime,
+    count: int,
+    duration: timedelta,
+    party_size: int,
+    schedule: CompiledSchedule | None,
+) -> Grid:
+    window = {
+        "restaurant_id": restaurant_id,
+        "window_start": origin,
+        "window_end": origin + count * seating.BUCKET + duration,
+    }
+    rules = (await session.execute(text(CAPACITY_RULES_SQL), window)).all()
+    bookings = (await session.execute(text(BOOKINGS_SQL), window)).all()
+    plan = None
+    floor = await seating.load_floor(session, restaurant_id)
+    if floor is not None:
+        plan = await seating.load_plan(session, floor, restaurant_id, origin, window["window_end"])
+    return build_grid(origin, count, duration, party_size, rules, bookings, schedule, plan)
+
+
+async def booking_version(restaurant_id: str) -> int | None:
+    """Current booking version, or None when Redis cannot say (skip the cache)."""
+    if redis_module.redis_client is None:
+        return None
+    try:
+        return int(await redis_module.redis_client.get(booking_version_key(restaurant_id)) or 0)
+    except Exception:
+        logger.warning("Could not read booking version for %s", restaurant_id, exc_info=True)
+        return None
+
+
+async def bump_booking_version(restaurant_id: str) -> None:
+    """Invalidate cached grids for a restaurant after a booking change."""
+    if redis_module.redis_client is None:
+        return
+    try:
+        await redis_module.redis_client.incr(booking_version_key(restaurant_id))
+    except Exception:
+        logger.warning("Could not bump booking version for %s", restaurant_id, exc_info=True)
+
+
+class GridCache:
+    """Bounded in-process cache of rendered grids keyed on (query, booking version)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, int, Any]] = {}
+
+    def get(self, key: Hashable, version: int) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, stored_version, value = entry
+        if stored_version != version or monotonic() - stored_at >= self._ttl:
+            del self._entries[key]
+            return None
+        return value
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        self._entries.pop(key, None)
+        while len(self._entries) >= self._max_entries:
+            # Dicts keep insertion order, so the first entry is the oldest.
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (monotonic(), version, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+grid_cache = GridCache(settings.GRID_CACHE_TTL_SECONDS, settings.GRID_CACHE_MAX_ENTRIES)
@@ -0,0 +1,415 @@
+"""Bulk loading of hours, blackouts and capacity windows from CSV/Parquet.
+
+Frames are validated column-wise with pandas, copied into temporary staging tables
+with ``COPY`` and merged into ``hours_rule``, ``blackout`` and ``capacity_rule`` in a
+single transaction. ``scripts/load_schedules.py`` is the command-line entry point.
+
+Merge semantics per restaurant present in a file:
+
+* ``hours_rule`` – all existing rows are replaced.
+* ``blackout`` / ``capacity_rule`` – existing rows overlapping the span covered by the
+  file (earliest ``start_ts`` to latest ``end_ts``) are replaced; rows outside it stay.
+
+Timestamps must carry a UTC offset; times of day are ``HH:MM`` or ``HH:MM:SS``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+
+from backend.app.db import session as db_session
+
+HOURS_COLUMNS = ("restaurant_id", "day_of_week", "open_time", "close_time")
+BLACKOUT_COLUMNS = ("restaurant_id", "start_ts", "end_ts", "reason")
+CAPACITY_COLUMNS = (
+    "restaurant_id",
+    "start_ts",
+    "end_ts",
+    "max_covers",
+    "max_parties",
+    "party_min",
+    "party_max",
+)
+# Defaults mirror capacity_rule in sql/010_schema.sql.
+PARTY_MIN_DEFAULT = 1
+PARTY_MAX_DEFAULT = 12
+
+UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+# A time of day followed by "Z" or a numeric offset; rejects naive and date-only values.
+OFFSET_PATTERN = r"\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}(?::?\d{2})?)$"
+ONE_DAY = pd.Timedelta(days=1)
+
+STAGING_DDL = {
+    "hours_rule": """
+        CREATE TEMP TABLE stage_hours_rule (
+          restaurant_id uuid NOT NULL,
+          day_of_week int NOT NULL,
+          open_time time NOT NULL,
+          close_time time NOT NULL
+        ) ON COMMIT DROP
+    """,
+    "blackout": """
+        CREATE TEMP TABLE stage_blackout (
+          restaurant_id uuid NOT NULL,
+          start_ts timestamptz NOT NULL,
+          end_ts timestamptz NOT NULL,
+          reason text
+        ) ON COMMIT DROP
+    """,
+    "capacity_rule": """
+        CREATE TEMP TABLE stage_capacity_rule (
+          restaurant_id uuid NOT NULL,
+          start_ts timestamptz NOT NULL,
+          end_ts timestamptz NOT NULL,
+          max_covers int NOT NULL,
+          max_parties int NOT NULL,
+          party_min int NOT NULL,
+          party_max int NOT NULL
+        ) ON COMMIT DROP
+    """,
+}
+
+MERGE_SQL = {
+    "hours_rule": (
+        """
+        DELETE FROM hours_rule h
+         USING (SELECT DISTINCT restaurant_id FROM stage_hours_rule) s
+         WHERE h.restaurant_id = s.restaurant_id
+        """,
+        """
+        INSERT INTO hours_rule (restaurant_id, day_of_week, open_time, close_time)
+        SELECT restaurant_id, day_of_week, open_time, close_time FROM stage_hours_rule
+        """,
+    ),
+    "blackout": (
+        """
+        DELETE FROM blackout b
+         USING (
+           SELECT restaurant_id, min(start_ts) AS lo, max(end_ts) AS hi
+           FROM stage_blackout GROUP BY restaurant_id
+         ) s
+         WHERE b.restaurant_id = s.restaurant_id
+           AND b.start_ts < s.hi
+           AND b.end_ts > s.lo
+        """,
+        """
+        INSERT INTO blackout (restaurant_id, start_ts, end_ts, reason)
+        SELECT restaurant_id, start_ts, end_ts, reason FROM stage_blackout
+        """,
+    ),
+    "capacity_rule": (
+        """
+        DELETE FROM capacity_rule c
+         USING (
+           SELECT restaurant_id, min(start_ts) AS lo, max(end_ts) AS hi
+           FROM stage_capacity_rule GROUP BY restaurant_id
+         ) s
+         WHERE c.restaurant_id = s.restaurant_id
+           AND c.start_ts < s.hi
+           AND c.end_ts > s.lo
+        """,
+        """
+        INSERT INTO capacity_rule (
+          restaurant_id, start_ts, end_ts, max_covers, max_parties, party_min, party_max
+        )
+        SELECT restaurant_id, start_ts, end_ts, max_covers, max_parties, party_min, party_max
+        FROM stage_capacity_rule
+        """,
+    ),
+}
+
+
+class BulkLoadError(RuntimeError):
+    """Raised when staged rows cannot be merged (e.g. unknown restaurants)."""
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    table: str
+    row: int  # 1-based data row in the source file (header excluded)
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.table} row {self.row}: {self.message}"
+
+
+@dataclass
+class LoadReport:
+    rows: dict[str, int] = field(default_factory=dict)
+    replaced: dict[str, int] = field(default_factory=dict)
+    validate_seconds: float = 0.0
+    copy_seconds: float = 0.0
+    merge_seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    def summary(self) -> str:
+        lines = []
+        for table, count in self.rows.items():
+            lines.append(f"{table}: {count} rows loaded, {self.replaced.get(table, 0)} replaced")
+        for phase, seconds in (
+            ("validate", self.validate_seconds),
+            ("copy", self.copy_seconds),
+            ("merge", self.merge_seconds),
+        ):
+            rate = self.total_rows / seconds if seconds else float("inf")
+            lines.append(f"{phase:>8}: {seconds:8.3f}s  {rate:12,.0f} rows/s")
+        return "\n".join(lines)
+
+
+def read_frame(path: str | Path) -> pd.DataFrame:
+    """Read a CSV or Parquet file (by extension); Parquet needs pyarrow installed."""
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        try:
+            return pd.read_parquet(path)
+        except ImportError as exc:
+            raise BulkLoadError("Reading Parquet requires pyarrow (pip install pyarrow)") from exc
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def _flag(issues: list[ValidationIssue], table: str, mask: pd.Series, message: str) -> None:
+    for position in np.flatnonzero(mask.to_numpy(dtype=bool, na_value=False)):
+        issues.append(ValidationIssue(table, int(position) + 1, message))
+
+
+def _missing_columns(table: str, frame: pd.DataFrame, required: tuple[str, ...]) -> list[ValidationIssue]:
+    missing = [column for column in required if column not in frame.columns]
+    return [ValidationIssue(table, 0, f"missing column '{column}'") for column in missing]
+
+
+def _restaurant_ids(table: str, frame: pd.DataFrame, issues: list[ValidationIssue]) -> pd.Series:
+    ids = frame["restaurant_id"].astype("string").str.strip().str.lower()
+    _flag(issues, table, ~ids.str.fullmatch(UUID_PATTERN).fillna(False), "restaurant_id is not a UUID")
+    return ids
+
+
+def _timestamps(table: str, frame: pd.DataFrame, column: str, issues: list[ValidationIssue]) -> pd.Series:
+    raw = frame[column]
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        if getattr(raw.dt, "tz", None) is None:
+            _flag(issues, table, pd.Series(True, index=raw.index), f"{column} has no timezone")
+            return pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns, UTC]")
+        return raw.dt.tz_convert("UTC")
+
+    text_values = raw.astype("string").str.strip()
+    _flag(
+        issues,
+        table,
+        text_values.notna() & ~text_values.str.contains(OFFSET_PATTERN, regex=True).fillna(False),
+        f"{column} must include a UTC offset",
+    )
+    parsed = pd.to_datetime(text_values, utc=True, errors="coerce", format="ISO8601")
+    _flag(issues, table, parsed.isna(), f"{column} is not a valid timestamp")
+    return parsed
+
+
+def _integers(
+    table: str,
+    frame: pd.DataFrame,
+    column: str,
+    issues: list[ValidationIssue],
+    default: int | None = None,
+) -> pd.Series:
+    if column not in frame.columns and default is not None:
+        return pd.Series(default, index=frame.index, dtype="int64")
+    values = pd.to_numeric(frame[column], errors="coerce")
+    if default is not None:
+        values = values.where(frame[column].notna(), default)
+    _flag(issues, table, values.isna() | (values % 1 != 0), f"{column} is not an integer")
+    return values.fillna(0).astype("int64")
+
+
+def _times_of_day(table: str, frame: pd.DataFrame, column: str, issues: list[ValidationIssue]) -> pd.Series:
+    text_values = frame[column].astype("string").str.strip()
+    text_values = text_values.where(text_values.str.len() != 5, text_values + ":00")
+    deltas = pd.to_timedelta(text_values, errors="coerce")
+    _flag(
+        issues,
+        table,
+        deltas.isna() | (deltas < pd.Timedelta(0)) | (deltas >= ONE_DAY),
+        f"{column} is not a time of day",
+    )
+    return deltas
+
+
+def _overlaps(group_keys: list[pd.Series], starts: pd.Series, ends: pd.Series) -> pd.Series:
+    """True for rows that start before the previous row (same group, by start) ends."""
+    ordered = pd.DataFrame({f"k{i}": key for i, key in enumerate(group_keys)})
+    ordered["start"] = starts
+    ordered["end"] = ends
+    ordered = ordered.sort_values([*ordered.columns[: len(group_keys)], "start"], kind="stable")
+    previous_end = ordered.groupby(list(ordered.columns[: len(group_keys)]), sort=False)["end"].shift()
+    overlap = (ordered["start"] < previous_end).fillna(False)
+    return overlap.reindex(starts.index)
+
+
+def validate_hours(frame: pd.DataFrame) -> tuple[pd.DataFrame, list[ValidationIssue]]:
+    table = "hours_rule"
+    issues = _missing_columns(table, frame, HOURS_COLUMNS)
+    if issues:
+        return frame.iloc[0:0], issues
+
+    ids = _restaurant_ids(table, frame, issues)
+    dow = _integers(table, frame, "day_of_week", issues)
+    _flag(issues, table, (dow < 0) | (dow > 6), "day_of_week must be 0 (Sunday) to 6")
+    opens = _times_of_day(table, frame, "open_time", issues)
+    closes = _times_of_day(table, frame, "close_time", issues)
+    _flag(issues, table, opens == closes, "open_time equals close_time")
+
+    # Windows closing at or before they open run past midnight (see sql/060_schedule.sql).
+    close_span = closes.where(closes > opens, closes + ONE_DAY)
+    _flag(issues, table, _overlaps([ids, dow], opens, close_span), "overlaps another window on the same day")
+    # The part after midnight belongs to the next weekday (Saturday spills into Sunday)
+    # and must end by that day's first opening.
+    first_open = opens.groupby([ids, dow]).min()
+    next_day = pd.MultiIndex.from_arrays([ids, (dow + 1) % 7])
+    next_first_open = pd.Series(first_open.reindex(next_day).to_numpy(), index=frame.index)
+    _flag(
+        issues,
+        table,
+        (closes <= opens) & (closes > next_first_open),
+        "runs past midnight into a window on the next day",
+    )
+
+    midnight = pd.Timestamp(0)
+    clean = pd.DataFrame(
+        {
+            "restaurant_id": ids,
+            "day_of_week": dow,
+            "open_time": (midnight + opens).dt.time,
+            "close_time": (midnight + closes).dt.time,
+        }
+    )
+    return clean, issues
+
+
+def validate_blackouts(frame: pd.DataFrame) -> tuple[pd.DataFrame, list[ValidationIssue]]:
+    table = "blackout"
+    issues = _missing_columns(table, frame, BLACKOUT_COLUMNS[:3])
+    if issues:
+        return frame.iloc[0:0], issues
+
+    ids = _restaurant_ids(table, frame, issues)
+    starts = _timestamps(table, frame, "start_ts", issues)
+    ends = _timestamps(table, frame, "end_ts", issues)
+    _flag(issues, table, starts >= ends, "start_ts must be before end_ts")
+
+    reasons = frame["reason"].astype("string") if "reason" in frame.columns else pd.Series(pd.NA, index=frame.index)
+    clean = pd.DataFrame({"restaurant_id": ids, "start_ts": starts, "end_ts": ends, "reason": reasons})
+    return clean, issues
+
+
+def validate_capacity(frame: pd.DataFrame) -> tuple[pd.DataFrame, list[ValidationIssue]]:
+    table = "capacity_rule"
+    issues = _missing_columns(table, frame, CAPACITY_COLUMNS[:5])
+    if issues:
+        return frame.iloc[0:0], issues
+
+    ids = _restaurant_ids(table, frame, issues)
+    starts = _timestamps(table, frame, "start_ts", issues)
+    ends = _timestamps(table, frame, "end_ts", issues)
+    _flag(issues, table, starts >= ends, "start_ts must be before end_ts")
+
+    max_covers = _integers(table, frame, "max_covers", issues)
+    max_parties = _integers(table, frame, "max_parties", issues)
+    party_min = _integers(table, frame, "party_min", issues, default=PARTY_MIN_DEFAULT)
+    party_max = _integers(table, frame, "party_max", issues, default=PARTY_MAX_DEFAULT)
+    _flag(issues, table, max_covers <= 0, "max_covers must be positive")
+    _flag(issues, table, max_parties <= 0, "max_parties must be positive")
+    _flag(issues, table, party_min < 1, "party_min must be at least 1")
+    _flag(issues, table, party_max < party_min, "party_max must be >= party_min")
+    # commit_reservation() applies a single rule per slot, so windows must not overlap.
+    _flag(issues, table, _overlaps([ids], starts, ends), "overlaps another capacity window")
+
+    clean = pd.DataFrame(
+        {
+            "restaurant_id": ids,
+            "start_ts": starts,
+            "end_ts": ends,
+            "max_covers": max_covers,
+            "max_parties": max_parties,
+            "party_min": party_min,
+            "party_max": party_max,
+        }
+    )
+    return clean, issues
+
+
+VALIDATORS = {
+    "hours_rule": validate_hours,
+    "blackout": validate_blackouts,
+    "capacity_rule": validate_capacity,
+}
+COLUMNS = {
+    "hours_rule": HOURS_COLUMNS,
+    "blackout": BLACKOUT_COLUMNS,
+    "capacity_rule": CAPACITY_COLUMNS,
+}
+
+
+def validate_frames(
+    frames: dict[str, pd.DataFrame],
+) -> tuple[dict[str, pd.DataFrame], list[ValidationIssue]]:
+    """Validate each table's frame; returns cleaned frames and every issue found."""
+    cleaned: dict[str, pd.DataFrame] = {}
+    issues: list[ValidationIssue] = []
+    for table, frame in frames.items():
+        clean, table_issues = VALIDATORS[table](frame)
+        cleaned[table] = clean
+        issues.extend(table_issues)
+    return cleaned, issues
+
+
+def _records(table: str, frame: pd.DataFrame) -> list[tuple]:
+    columns = COLUMNS[table]
+    values = [frame[column].astype(object).where(frame[column].notna(), None).tolist() for column in columns]
+    values[0] = [UUID(value) for value in values[0]]
+    return list(zip(*values))
+
+
+async def load_frames(frames: dict[str, pd.DataFrame], report: LoadReport | None = None) -> LoadReport:
+    """COPY validated frames into staging tables and merge them in one transaction."""
+    report = report or LoadReport()
+    async with db_session.engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        async with raw.transaction():
+            began = perf_counter()
+            for table, frame in frames.items():
+                await raw.execute(STAGING_DDL[table])
+                await raw.copy_records_to_table(
+                    f"stage_{table}",
+                    records=_records(table, frame),
+                    columns=COLUMNS[table],
+                )
+                await raw.execute(f"ANALYZE stage_{table}")
+                report.rows[table] = len(frame)
+            report.copy_seconds = perf_counter() - began
+
+            began = perf_counter()
+            for table in frames:
+                unknown = await raw.fetch(
+                    f"""
+                    SELECT DISTINCT s.restaurant_id
+                    FROM stage_{table} s
+                    WHERE NOT EXISTS (SELECT 1 FROM restaurant r WHERE r.id = s.restaurant_id)
+                    """
+                )
+                if unknown:
+                    ids = ", ".join(str(row["restaurant_id"]) for row in unknown[:5])
+                    raise BulkLoadError(f"{table}: unknown restaurant_id(s): {ids}")
+
+                delete_sql, insert_sql = MERGE_SQL[table]
+                status = await raw.execute(delete_sql)
+                report.replaced[table] = int(status.split()[-1])
+                await raw.execute(insert_sql)
+            report.merge_seconds = perf_counter() - began
+    return report
@@ -0,0 +1,146 @@
+"""Per-call bridge state, snapshotted to Redis so another worker can resume a call.
+
+The realtime bridge saves a :class:`CallState` at every turn boundary (caller turn
+committed, assistant response done) under ``call:{<CallSid>}`` for
+``CALL_STATE_TTL_SECONDS``. When Twilio reconnects the stream for the same CallSid
+(the TwiML ``<Redirect>`` after ``<Connect>`` re-enters the webhook if the stream
+drops, and the webhook reconnects only while a snapshot exists, up to
+``CALL_RESUME_MAX_ATTEMPTS`` times), the new worker loads the snapshot with one GET. It restores the resampler
+state, re-seeds the upstream session with its config and recent transcript, and
+carries on without greeting again.
+
+Snapshots are compact JSON with short keys, deflated and base64-encoded so they
+survive the client's ``decode_responses=True``.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MAX_TRANSCRIPT_TURNS = 20
+
+
+@dataclass
+class CallState:
+    call_sid: str
+    stream_sid: str | None = None
+    started_at: float = field(default_factory=time.time)
+    turns: int = 0
+    # Fields the agent has collected so far (name, party_size, start_ts, phone, ...).
+    booking: dict[str, Any] = field(default_factory=dict)
+    hold_id: str | None = None
+    # Upstream session.update payload (instructions, voice, transcription).
+    session: dict[str, Any] = field(default_factory=dict)
+    # Most recent (role, text) turns, replayed into a new upstream session.
+    transcript: list[tuple[str, str]] = field(default_factory=list)
+    # audioop.ratecv states: caller 8k -> 16k and assistant 16k -> 8k.
+    up_state: tuple | None = None
+    down_state: tuple | None = None
+
+    def add_turn(self, role: str, text: str) -> None:
+        text = text.strip()
+        if text:
+            self.transcript.append((role, text))
+            del self.transcript[:-MAX_TRANSCRIPT_TURNS]
+
+
+def _tuples(value: Any) -> Any:
+    """JSON arrays back to the nested tuples audioop.ratecv expects."""
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
+
+
+def encode(state: CallState) -> str:
+    payload = {
+        "v": SNAPSHOT_VERSION,
+        "c": state.call_sid,
+        "s": state.stream_sid,
+        "t0": state.started_at,
+        "n": state.turns,
+        "b": state.booking,
+        "h": state.hold_id,
+        "cfg": state.session,
+        "tx": state.transcript,
+        "up": state.up_state,
+        "dn": state.down_state,
+    }
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.b64encode(zlib.compress(raw, 1)).decode("ascii")
+
+
+def decode(blob: str) -> CallState | None:
+    payload = json.loads(zlib.decompress(base64.b64decode(blob)))
+    if payload.get("v") != SNAPSHOT_VERSION:
+        return None
+    return CallState(
+        call_sid=payload["c"],
+        stream_sid=payload["s"],
+        started_at=payload["t0"],
+        turns=payload["n"],
+        booking=payload["b"],
+        hold_id=payload["h"],
+        session=payload["cfg"],
+        transcript=[(role, text) for role, text in payload["tx"]],
+        up_state=_tuples(payload["up"]),
+        down_state=_tuples(payload["dn"]),
+    )
+
+
+def state_key(call_sid: str) -> str:
+    return f"call:{{{call_sid}}}"
+
+
+async def save(state: CallState) -> None:
+    """Snapshot ``state``; failures are logged, never raised into the audio path."""
+    if redis_module.redis_client is None:
+        return
+    try:
+        await redis_module.redis_client.set(
+            state_key(state.call_sid), encode(state), ex=settings.CALL_STATE_TTL_SECONDS
+        )
+    except Exception:
+        logger.warning("Could not snapshot call %s", state.call_sid, exc_info=True)
+
+
+async def load(call_sid: str) -> CallState | None:
+    if redis_module.redis_client is None:
+        return None
+    try:
+        blob = await redis_module.redis_client.get(state_key(call_sid))
+        return decode(blob) if blob else None
+    except Exception:
+        logger.warning("Could not load call snapshot %s; starting fresh", call_sid, exc_info=True)
+        return None
+
+
+async def exists(call_sid: str) -> bool:
+    """Whether a resumable snapshot is stored for ``call_sid`` (no decoding)."""
+    if redis_module.redis_client is None:
+        return False
+    try:
+        return bool(await redis_module.redis_client.exists(state_key(call_sid)))
+    except Exception:
+        logger.warning("Could not check call snapshot %s", call_sid, exc_info=True)
+        return False
+
+
+async def discard(call_sid: str) -> None:
+    if redis_module.redis_client is None:
+        return
+    try:
+        await redis_module.redis_client.delete(state_key(call_sid))
+    except Exception:
+        logger.warning("Could not drop call snapshot %s", call_sid, exc_info=True)
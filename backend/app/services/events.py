@@ -0,0 +1,231 @@
+"""Fire-and-forget event logging into ``event_log``.
+
+Request handlers and the realtime bridge call :func:`emit_event` without awaiting.
+Events are buffered in a bounded in-process queue and written by a background task
+with ``COPY`` once a batch fills up or the flush interval elapses, so logging never
+adds a round trip to the request path.
+
+``event_log`` is partitioned by day (``sql/070_event_log_partitions.sql``); a second
+background task keeps future partitions created and applies the retention policy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import observe_event
+from backend.app.db import session as db_session
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = ("ts", "restaurant_id", "type", "payload_json")
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+@dataclass
+class EventSinkStats:
+    emitted: int = 0
+    dropped: int = 0
+    written: int = 0
+    batches: int = 0
+    flush_failures: int = 0
+    queue_depth: int = 0
+    queue_high_water: int = 0
+
+
+def _as_uuid(value: Any) -> UUID | None:
+    if value is None or isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+class EventSink:
+    """Bounded buffer flushed to Postgres in batches by a single background task."""
+
+    def __init__(
+        self,
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        drop_policy: str = DROP_NEWEST,
+    ) -> None:
+        if drop_policy not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown event drop policy: {drop_policy}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.stats = EventSinkStats()
+        self._buffer: deque[tuple] = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def emit(
+        self,
+        event_type: str,
+        restaurant_id: Any = None,
+        payload: dict[str, Any] | None = None,
+    ) -> bool:
+        """Queue an event; returns False when it was dropped because the buffer is full."""
+        record = (
+            datetime.now(timezone.utc),
+            _as_uuid(restaurant_id),
+            event_type,
+            json.dumps(payload, default=str) if payload is not None else None,
+        )
+        if len(self._buffer) >= self.max_queue:
+            self.stats.dropped += 1
+            if self.drop_policy == DROP_NEWEST:
+                return False
+            self._buffer.popleft()
+
+        self._buffer.append(record)
+        self.stats.emitted += 1
+        depth = len(self._buffer)
+        if depth > self.stats.queue_high_water:
+            self.stats.queue_high_water = depth
+        if depth >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def snapshot(self) -> dict[str, int]:
+        """Counters plus current queue depth, for metrics and debugging."""
+        self.stats.queue_depth = len(self._buffer)
+        return asdict(self.stats)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-sink")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush whatever is still buffered."""
+        if self._task is not None:
+            # Wake the writer instead of cancelling it so an in-flight COPY is not lost.
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            await self._write(batch)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def _write(self, batch: list[tuple]) -> None:
+        try:
+            async with db_session.engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "event_log",
+                    records=batch,
+                    columns=EVENT_COLUMNS,
+                )
+                await conn.commit()
+        except Exception:
+            self.stats.flush_failures += 1
+            self.stats.dropped += len(batch)
+            logger.exception("Failed to write %d events to event_log", len(batch))
+            return
+        self.stats.batches += 1
+        self.stats.written += len(batch)
+
+
+async def maintain_event_partitions() -> tuple[int, int]:
+    """Create upcoming daily partitions and retire expired ones; returns (created, removed)."""
+    async with db_session.SessionLocal() as session:
+        row = (
+            await session.execute(
+                text(
+                    """
+                    SELECT created, removed
+                    FROM event_log_maintain(:days_ahead, make_interval(days => :keep_days), :drop)
+                    """
+                ),
+                {
+                    "days_ahead": settings.EVENT_PARTITION_DAYS_AHEAD,
+                    "keep_days": settings.EVENT_RETENTION_DAYS,
+                    "drop": settings.EVENT_RETENTION_DROP,
+                },
+            )
+        ).one()
+        await session.commit()
+    return row.created, row.removed
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        try:
+            created, removed = await maintain_event_partitions()
+            if created or removed:
+                logger.info("event_log partitions: %d created, %d retired", created, removed)
+        except Exception:
+            logger.exception("event_log partition maintenance failed")
+        await asyncio.sleep(settings.EVENT_MAINTENANCE_INTERVAL_SECONDS)
+
+
+event_sink: EventSink | None = None
+_maintenance_task: asyncio.Task | None = None
+
+
+async def init_event_sink() -> None:
+    """Start the shared event sink and the partition maintenance task."""
+    global event_sink, _maintenance_task
+    event_sink = EventSink(
+        max_queue=settings.EVENT_QUEUE_MAX,
+        batch_size=settings.EVENT_BATCH_SIZE,
+        flush_interval=settings.EVENT_FLUSH_INTERVAL_SECONDS,
+        drop_policy=settings.EVENT_DROP_POLICY,
+    )
+    await event_sink.start()
+    _maintenance_task = asyncio.create_task(_maintenance_loop(), name="event-log-maintenance")
+
+
+async def close_event_sink() -> None:
+    """Flush buffered events and stop background tasks if they were initialised."""
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
+    if event_sink is not None:
+        await event_sink.stop()
+
+
+def emit_event(
+    event_type: str,
+    restaurant_id: Any = None,
+    payload: dict[str, Any] | None = None,
+) -> None:
+    """Record an event without blocking; only metrics are updated when the sink is not running."""
+    observe_event(event_type, payload)
+    if event_sink is not None:
+        event_sink.emit(event_type, restaurant_id, payload)
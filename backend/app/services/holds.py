@@ -0,0 +1,83 @@
+"""Short-lived slot holds in Redis, counted against the parties a slot has room for.
+
+All holds on one slot (restaurant, start, end) are members of one sorted set,
+``hold:{<rid>}:<start>:<end>``, scored by their expiry in Redis server
+milliseconds. A hold is only added while the live holds stay below the slot's free
+parties (``free_parties``), checked and written in one Lua call so concurrent
+workers cannot overshoot. Several callers can therefore hold the same slot while
+shards remain, and a hold never blocks an unrelated party of the same size.
+
+A commit consumes its hold, or a transient one it takes for itself, whatever the
+outcome. Expired members are pruned by the next acquire on the set, and the set
+itself expires with its last hold.
+"""
+
+from __future__ import annotations
+
+from time import time
+
+from backend.app.core import redis_client as redis_module
+
+HOLD_TTL_SECONDS = 300
+
+# KEYS: the slot's hold set. ARGV: hold id, most live holds allowed, ttl in ms.
+# Returns 1 when the hold is live afterwards (already held, or added), else 0.
+ACQUIRE_LUA = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+  return 1
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+  return 0
+end
+local ttl = tonumber(ARGV[3])
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[1])
+if redis.call('PTTL', KEYS[1]) < ttl then
+  redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return 1
+"""
+
+_script = None
+_script_client = None
+
+
+def _acquire_script():
+    global _script, _script_client
+    if _script_client is not redis_module.redis_client:
+        _script = redis_module.redis_client.register_script(ACQUIRE_LUA)
+        _script_client = redis_module.redis_client
+    return _script
+
+
+def _now_ms() -> int:
+    return int(time() * 1000)
+
+
+async def acquire(key: str, hold_id: str, limit: int, ttl_seconds: int = HOLD_TTL_SECONDS) -> bool:
+    """Add ``hold_id`` to the slot unless ``limit`` holds are already live.
+
+    A hold that is already live is kept as is (its expiry is not extended).
+    """
+    acquired = await _acquire_script()(keys=[key], args=[hold_id, limit, ttl_seconds * 1000])
+    return bool(acquired)
+
+
+async def live(key: str) -> int:
+    """Live holds on one slot."""
+    return await redis_module.redis_client.zcount(key, f"({_now_ms()}", "+inf")
+
+
+async def live_many(keys: list[str]) -> list[int]:
+    """Live holds on several slots in one pipelined round trip (keys of one restaurant)."""
+    floor = f"({_now_ms()}"
+    async with redis_module.redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.zcount(key, floor, "+inf")
+        return await pipe.execute()
+
+
+async def release(key: str, hold_id: str) -> None:
+    await redis_module.redis_client.zrem(key, hold_id)
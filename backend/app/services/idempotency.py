@@ -0,0 +1,102 @@
+"""Redis-backed ``Idempotency-Key`` records for retried POSTs.
+
+The first request with a key claims it with ``SET NX GET`` (a *pending* record that
+expires after ``IDEMPOTENCY_PENDING_TTL_SECONDS`` in case the worker dies), runs,
+and replaces the record with its response for ``IDEMPOTENCY_TTL_SECONDS``. Later
+requests with the same key replay that response; one arriving while the first is
+still running polls until it completes or ``IDEMPOTENCY_WAIT_SECONDS`` pass.
+Each record stores a fingerprint of the request body so a key reused for a
+different request is rejected rather than answered with someone else's result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+
+MAX_KEY_LENGTH = 255
+PENDING = "pending"
+COMPLETED = "completed"
+_POLL_INITIAL_SECONDS = 0.025
+_POLL_MAX_SECONDS = 0.2
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used with a different request body."""
+
+
+class IdempotencyInProgress(Exception):
+    """The original request is still running after the wait budget."""
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: Any
+
+
+def fingerprint(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def record_key(scope: str, key: str) -> str:
+    return f"idem:{scope}:{key}"
+
+
+async def claim(scope: str, key: str, request_fingerprint: str) -> StoredResponse | None:
+    """Claim ``key`` for this request, or return the response already stored for it.
+
+    Returns ``None`` when the caller owns the key and must run the request, then
+    call :func:`complete` or :func:`release`.
+    """
+    redis_key = record_key(scope, key)
+    pending = json.dumps({"state": PENDING, "fingerprint": request_fingerprint})
+    deadline = monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = _POLL_INITIAL_SECONDS
+
+    while True:
+        # SET NX GET (Redis 7): claims the key, or returns the existing record in the
+        # same round trip.
+        raw = await redis_module.redis_client.set(
+            redis_key, pending, nx=True, get=True, ex=settings.IDEMPOTENCY_PENDING_TTL_SECONDS
+        )
+        if raw is None:
+            return None
+
+        record = json.loads(raw)
+        if record["fingerprint"] != request_fingerprint:
+            raise IdempotencyKeyReused(key)
+        if record["state"] == COMPLETED:
+            return StoredResponse(record["status_code"], record["body"])
+        if monotonic() >= deadline:
+            raise IdempotencyInProgress(key)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+
+async def complete(
+    scope: str, key: str, request_fingerprint: str, status_code: int, body: Any
+) -> None:
+    """Store the final response so retries replay it."""
+    record = {
+        "state": COMPLETED,
+        "fingerprint": request_fingerprint,
+        "status_code": status_code,
+        "body": body,
+    }
+    await redis_module.redis_client.set(
+        record_key(scope, key), json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS
+    )
+
+
+async def release(scope: str, key: str) -> None:
+    """Drop a pending claim after a failure that a retry should re-run (5xx)."""
+    await redis_module.redis_client.delete(record_key(scope, key))
@@ -1,7 +1,113 @@
+import base64
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
 
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.services import seating
+from backend.app.services.slots import slot_key
+
+
+# Status codes returned by try_commit_reservation() (see sql/030_commit_reservation.sql).
+COMMIT_OK = "ok"
+COMMIT_CLOSED = "closed"
+COMMIT_NO_CAPACITY_RULE = "no_capacity_rule"
+COMMIT_SLOT_BOOKED = "slot_booked"
+COMMIT_CAPACITY_COVERS = "capacity_covers"
+COMMIT_CAPACITY_PARTIES = "capacity_parties"
+# Reported by commit_reservation() itself when the restaurant has tables and none
+# (or no join_group combination) seats the party for the slot.
+COMMIT_NO_TABLE = "no_table"
+# Reported by commit_reservation() when the session's shard is no longer the
+# restaurant's home (restaurant_write_fence() found a restaurant_moved tombstone).
+COMMIT_MOVED = "moved"
+
+
+@dataclass(frozen=True)
+class CommitResult:
+    status: str
+    reservation_id: str | None
+    covers: int | None
+    parties: int | None
+    tables: tuple[str, ...] = ()  # labels of the assigned tables
+
+    @property
+    def ok(self) -> bool:
+        return self.status == COMMIT_OK
+
+
+async def capacity_summary(
+    session: AsyncSession,
+    restaurant_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> tuple[dict | None, dict]:
+    """Capacity rule for a slot (None if none applies) and its current usage.
+
+    Usage is the overlapping confirmed covers and parties, plus the shards taken on
+    the exact slot.
+    """
+    params = {
+        "restaurant_id": restaurant_id,
+        "start_ts": start_utc,
+        "end_ts": end_utc,
+        "slot_key": slot_key(start_utc, end_utc),
+    }
+    cap_row = await session.execute(
+        text(
+            """
+            SELECT max_covers, max_parties
+            FROM capacity_rule
+            WHERE restaurant_id = :restaurant_id
+              AND tstzrange(start_ts, end_ts, '[)') && tstzrange(:start_ts, :end_ts, '[)')
+            ORDER BY start_ts DESC
+            LIMIT 1
+            """
+        ),
+        params,
+    )
+    capacity = cap_row.mappings().one_or_none()
+
+    summary_row = await session.execute(
+        text(
+            """
+            SELECT COALESCE(SUM(party_size), 0) AS covers,
+                   COUNT(*) AS parties,
+                   (
+                     SELECT COUNT(*)
+                     FROM reservation
+                     WHERE restaurant_id = :restaurant_id
+                       AND slot_key = :slot_key
+                       AND status <> 'cancelled'
+                   ) AS shards_taken
+            FROM reservation
+            WHERE restaurant_id = :restaurant_id
+              AND status = 'confirmed'
+              AND slot_range && tstzrange(:start_ts, :end_ts, '[)')
+            """
+        ),
+        params,
+    )
+    usage = summary_row.mappings().one()
+    return capacity, usage
+
+
+def free_parties(capacity: dict, usage: dict, requested_party: int) -> int:
+    """How many more parties the slot can take, before counting holds.
+
+    0 unless the covers fit, else the fewer of the free parties and the free shards
+    of this exact slot.
+    """
+    if usage["covers"] + requested_party > capacity["max_covers"]:
+        return 0
+    return max(capacity["max_parties"] - max(usage["parties"], usage["shards_taken"]), 0)
 
 
 async def commit_reservation(
@@ -16,16 +122,47 @@ async def commit_reservation(
     contact_phone: str | None,
     contact_email: str | None,
     notes: str | None,
-) -> str:
-    """Invoke the commit_reservation() SQL function and return the new reservation id."""
+) -> CommitResult:
+    """Invoke try_commit_reservation() and return its status code and current usage.
+
+    Expected outcomes (closed, booked, over capacity, no table) come back as status
+    codes; only invalid input and database failures raise. For restaurants with
+    tables, the slot's advisory locks are taken first so the best-fit table choice
+    and the insert see the same occupancy; the assignment is written in the same
+    transaction.
+
+    Every commit first takes the restaurant's write fence (shared), so a shard move
+    cannot copy the restaurant away while the booking is in flight.
+    """
     end_ts = start_ts + timedelta(minutes=duration_minutes)
 
+    moved_to = (
+        await session.execute(
+            text("SELECT restaurant_write_fence(:restaurant_id)"), {"restaurant_id": restaurant_id}
+        )
+    ).scalar_one()
+    if moved_to is not None:
+        return CommitResult(status=COMMIT_MOVED, reservation_id=None, covers=None, parties=None)
+
+    option = None
+    floor = await seating.load_floor(session, restaurant_id, fresh=True)
+    if floor is not None:
+        await session.execute(
+            text("SELECT lock_reservation_slot(:restaurant_id, :start_ts, :end_ts)"),
+            {"restaurant_id": restaurant_id, "start_ts": start_ts, "end_ts": end_ts},
+        )
+        plan = await seating.load_plan(session, floor, restaurant_id, start_ts, end_ts)
+        option = plan.best_fit(party_size, start_ts, end_ts)
+        if option is None:
+            return CommitResult(status=COMMIT_NO_TABLE, reservation_id=None, covers=None, parties=None)
+
     query = text(
         """
-        SELECT commit_reservation(
+        SELECT r.status, r.reservation_id, r.covers, r.parties
+        FROM try_commit_reservation(
           :restaurant_id, :name, :party, :start_ts, :end_ts,
           :source, :phone, :email, :notes
-        ) AS reservation_id
+        ) AS r
         """
     )
 
@@ -45,4 +182,209 @@ async def commit_reservation(
     )
 
     row = result.one()
-    return str(row.reservation_id)
+    commit = CommitResult(
+        status=row.status,
+        reservation_id=str(row.reservation_id) if row.reservation_id is not None else None,
+        covers=row.covers,
+        parties=row.parties,
+    )
+    if option is None or not commit.ok:
+        return commit
+
+    await session.execute(
+        text(
+            """
+            INSERT INTO reservation_table (reservation_id, table_id, restaurant_id, slot_range)
+            SELECT :reservation_id, table_id, :restaurant_id, tstzrange(:start_ts, :end_ts, '[)')
+            FROM unnest(CAST(:table_ids AS uuid[])) AS table_id
+            """
+        ),
+        {
+            "reservation_id": commit.reservation_id,
+            "restaurant_id": restaurant_id,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "table_ids": option.table_ids,
+        },
+    )
+    return replace(commit, tables=option.labels)
+
+
+RESERVATION_COLUMNS = (
+    "id",
+    "restaurant_id",
+    "name",
+    "party_size",
+    "start_ts",
+    "end_ts",
+    "status",
+    "source",
+    "contact_phone",
+    "contact_email",
+    "notes",
+    "created_at",
+)
+EXPORT_FETCH_SIZE = 500
+
+
+def encode_cursor(start_ts: datetime, reservation_id: str) -> str:
+    """Opaque keyset cursor for the last row of a page."""
+    raw = f"{start_ts.isoformat()}|{reservation_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Inverse of :func:`encode_cursor`; raises ValueError for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_raw, id_raw = raw.split("|", 1)
+        return datetime.fromisoformat(start_raw), UUID(id_raw)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+async def list_reservations(
+    session: AsyncSession,
+    *,
+    restaurant_id: str,
+    status: str,
+    start_from: datetime | None,
+    start_to: datetime | None,
+    after: tuple[datetime, UUID] | None,
+    limit: int,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """One keyset page ordered by (start_ts, id); returns rows and the next cursor.
+
+    reservation_restaurant_status_start_id_idx serves the ``status`` equality, the
+    range and the ordering, so deep pages cost the same as the first. Optional
+    bounds are only added when set: ``:x IS NULL OR ...`` guards would hide them
+    from the generic plan asyncpg switches to after a few executions.
+    """
+    clauses = ["restaurant_id = :restaurant_id", "status = :status"]
+    params: dict[str, Any] = {
+        "restaurant_id": restaurant_id,
+        "status": status,
+        # One extra row tells us whether another page exists.
+        "limit": limit + 1,
+    }
+    if start_from is not None:
+        clauses.append("start_ts >= :start_from")
+        params["start_from"] = start_from
+    if start_to is not None:
+        clauses.append("start_ts < :start_to")
+        params["start_to"] = start_to
+    if after is not None:
+        clauses.append("(start_ts, id) > (:after_ts, CAST(:after_id AS uuid))")
+        params["after_ts"], params["after_id"] = after
+    query = text(
+        f"""
+        SELECT {", ".join(RESERVATION_COLUMNS)}
+        FROM reservation
+        WHERE {" AND ".join(clauses)}
+        ORDER BY start_ts, id
+        LIMIT :limit
+        """
+    )
+    result = await session.execute(query, params)
+    rows = [dict(row) for row in result.mappings()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["start_ts"], str(last["id"]))
+    return rows, next_cursor
+
+
+async def day_book_etag(
+    session: AsyncSession,
+    restaurant_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> str:
+    """Fingerprint of a day book that changes whenever any of its rows does.
+
+    Every insert, update or delete gives the affected row a new ``xmin`` (or removes
+    it), so hashing ``(id, xmin)`` detects changes without reading row payloads.
+    """
+    row = (
+        await session.execute(
+            text(
+                """
+                SELECT count(*) AS n,
+                       md5(COALESCE(string_agg(id::text || ':' || xmin::text, ',' ORDER BY id), '')) AS digest
+                FROM reservation
+                WHERE restaurant_id = :restaurant_id
+                  AND start_ts >= :start_ts
+                  AND start_ts < :end_ts
+                """
+            ),
+            {"restaurant_id": restaurant_id, "start_ts": start_utc, "end_ts": end_utc},
+        )
+    ).one()
+    return f'"{row.n}-{row.digest}"'
+
+
+async def _day_book_rows(
+    session_factory: async_sessionmaker[AsyncSession],
+    restaurant_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> AsyncIterator[dict[str, Any]]:
+    # Dedicated session: the stream outlives the request handler's session.
+    async with session_factory() as session:
+        result = await session.stream(
+            text(
+                f"""
+                SELECT {", ".join(RESERVATION_COLUMNS)}
+                FROM reservation
+                WHERE restaurant_id = :restaurant_id
+                  AND start_ts >= :start_ts
+                  AND start_ts < :end_ts
+                ORDER BY start_ts, id
+                """
+            ).execution_options(yield_per=EXPORT_FETCH_SIZE),
+            {"restaurant_id": restaurant_id, "start_ts": start_utc, "end_ts": end_utc},
+        )
+        async for row in result.mappings():
+            yield dict(row)
+
+
+async def stream_day_book_ndjson(
+    session_factory: async_sessionmaker[AsyncSession],
+    restaurant_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> AsyncIterator[bytes]:
+    """One JSON object per line, read through a server-side cursor."""
+    async for row in _day_book_rows(session_factory, restaurant_id, start_utc, end_utc):
+        yield (json.dumps(row, default=str) + "\n").encode()
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_day_book_csv(
+    session_factory: async_sessionmaker[AsyncSession],
+    restaurant_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> AsyncIterator[bytes]:
+    """CSV with a header row, read through a server-side cursor."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RESERVATION_COLUMNS)
+    pending = 0
+    async for row in _day_book_rows(session_factory, restaurant_id, start_utc, end_utc):
+        writer.writerow(_csv_value(row[column]) for column in RESERVATION_COLUMNS)
+        pending += 1
+        if pending >= EXPORT_FETCH_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
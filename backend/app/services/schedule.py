@@ -0,0 +1,251 @@
+"""Compiled per-restaurant opening schedules.
+
+Hours rules are stored as local wall-clock times per weekday and blackouts as UTC
+ranges. Evaluating them per candidate slot would cost a query each time, so every
+restaurant is compiled once into UTC open intervals (DST-aware via ``zoneinfo``)
+and kept in memory until its TTL expires or Postgres notifies us of a change
+through the ``schedule_changed`` channel (see ``sql/060_schedule.sql``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.db import session as db_session
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_CHANNEL = "schedule_changed"
+
+Interval = tuple[datetime, datetime]
+
+
+@dataclass(frozen=True)
+class HoursWindow:
+    day_of_week: int  # Postgres convention: 0 = Sunday
+    open_time: time
+    close_time: time
+
+
+def _merge(intervals: list[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CompiledSchedule:
+    """Open intervals for a single restaurant, evaluated without touching the database."""
+
+    def __init__(
+        self,
+        restaurant_id: str,
+        tz_name: str,
+        hours: list[HoursWindow],
+        blackouts: list[Interval],
+    ) -> None:
+        self.restaurant_id = restaurant_id
+        self.tz = ZoneInfo(tz_name)
+        self._by_dow: dict[int, list[HoursWindow]] = {}
+        for window in hours:
+            self._by_dow.setdefault(window.day_of_week, []).append(window)
+        self._unrestricted = not hours
+        self._blackouts = _merge(blackouts)
+        self._blackout_ends = [end for _, end in self._blackouts]
+        self._day_cache: dict[date, list[Interval]] = {}
+
+    def _day_intervals(self, local_day: date) -> list[Interval]:
+        cached = self._day_cache.get(local_day)
+        if cached is not None:
+            return cached
+
+        dow = (local_day.weekday() + 1) % 7
+        intervals: list[Interval] = []
+        for window in self._by_dow.get(dow, ()):
+            close_day = local_day
+            if window.close_time <= window.open_time:
+                close_day = local_day + timedelta(days=1)
+            opens = datetime.combine(local_day, window.open_time, tzinfo=self.tz)
+            closes = datetime.combine(close_day, window.close_time, tzinfo=self.tz)
+            intervals.append((opens.astimezone(timezone.utc), closes.astimezone(timezone.utc)))
+        self._day_cache[local_day] = intervals
+        return intervals
+
+    def _hours_between(self, start_utc: datetime, end_utc: datetime) -> list[Interval]:
+        # Start one local day early so windows that close after midnight are included.
+        day = start_utc.astimezone(self.tz).date() - timedelta(days=1)
+        last_day = end_utc.astimezone(self.tz).date()
+        intervals: list[Interval] = []
+        while day <= last_day:
+            intervals.extend(self._day_intervals(day))
+            day += timedelta(days=1)
+        return _merge(intervals)
+
+    def _overlaps_blackout(self, start_utc: datetime, end_utc: datetime) -> bool:
+        idx = bisect_left(self._blackout_ends, start_utc)
+        # Blackout ends are exclusive, so an end equal to start_utc does not overlap.
+        while idx < len(self._blackouts) and self._blackouts[idx][1] <= start_utc:
+            idx += 1
+        return idx < len(self._blackouts) and self._blackouts[idx][0] < end_utc
+
+    def is_open(self, start_utc: datetime, end_utc: datetime) -> bool:
+        """Return True when [start_utc, end_utc) fits inside opening hours and avoids blackouts."""
+        if self._overlaps_blackout(start_utc, end_utc):
+            return False
+        if self._unrestricted:
+            return True
+        return any(
+            opens <= start_utc and end_utc <= closes
+            for opens, closes in self._hours_between(start_utc, end_utc)
+        )
+
+    def open_intervals(self, start_utc: datetime, end_utc: datetime) -> list[Interval]:
+        """UTC open intervals (hours minus blackouts) clipped to [start_utc, end_utc)."""
+        if self._unrestricted:
+            hours = [(start_utc, end_utc)]
+        else:
+            hours = self._hours_between(start_utc, end_utc)
+
+        result: list[Interval] = []
+        for opens, closes in hours:
+            cursor = max(opens, start_utc)
+            closes = min(closes, end_utc)
+            idx = bisect_left(self._blackout_ends, cursor)
+            while cursor < closes:
+                while idx < len(self._blackouts) and self._blackouts[idx][1] <= cursor:
+                    idx += 1
+                if idx == len(self._blackouts) or self._blackouts[idx][0] >= closes:
+                    result.append((cursor, closes))
+                    break
+                b_start, b_end = self._blackouts[idx]
+                if b_start > cursor:
+                    result.append((cursor, b_start))
+                cursor = b_end
+        return result
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+async def load_schedule(session: AsyncSession, restaurant_id: str) -> CompiledSchedule | None:
+    """Fetch hours, blackouts and timezone for a restaurant in a single round trip."""
+    row = (
+        await session.execute(
+            text(
+                """
+                SELECT r.timezone,
+                       COALESCE((
+                         SELECT json_agg(json_build_array(h.day_of_week, h.open_time, h.close_time))
+                         FROM hours_rule h
+                         WHERE h.restaurant_id = r.id
+                       ), '[]'::json)::text AS hours,
+                       COALESCE((
+                         SELECT json_agg(json_build_array(b.start_ts, b.end_ts))
+                         FROM blackout b
+                         WHERE b.restaurant_id = r.id
+                       ), '[]'::json)::text AS blackouts
+                FROM restaurant r
+                WHERE r.id = :restaurant_id
+                """
+            ),
+            {"restaurant_id": restaurant_id},
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+
+    hours = [
+        HoursWindow(int(dow), time.fromisoformat(opens), time.fromisoformat(closes))
+        for dow, opens, closes in json.loads(row.hours)
+    ]
+    blackouts = [(_parse_ts(start), _parse_ts(end)) for start, end in json.loads(row.blackouts)]
+    return CompiledSchedule(restaurant_id, row.timezone, hours, blackouts)
+
+
+class ScheduleCache:
+    """In-memory cache of compiled schedules keyed by restaurant id."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, CompiledSchedule | None]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, restaurant_id: str) -> CompiledSchedule | None:
+        """Return the compiled schedule, loading it on a short-lived session when missing.
+
+        A dedicated session keeps cache misses from opening a transaction on the
+        caller's session (``commit_endpoint`` begins its own transaction afterwards).
+        """
+        restaurant_id = str(restaurant_id)
+        entry = self._entries.get(restaurant_id)
+        if entry is not None and entry[0] > monotonic():
+            return entry[1]
+
+        lock = self._locks.setdefault(restaurant_id, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(restaurant_id)
+            if entry is not None and entry[0] > monotonic():
+                return entry[1]
+            factory = await db_session.sessionmaker_for(restaurant_id)
+            async with factory() as session:
+                schedule = await load_schedule(session, restaurant_id)
+            self._entries[restaurant_id] = (monotonic() + self.ttl_seconds, schedule)
+            return schedule
+
+    def invalidate(self, restaurant_id: str | None = None) -> None:
+        """Drop one restaurant's schedule, or every schedule when no id is given."""
+        if restaurant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(restaurant_id), None)
+
+
+schedule_cache = ScheduleCache(ttl_seconds=settings.SCHEDULE_CACHE_TTL_SECONDS)
+
+_listener_conns: list[AsyncConnection] = []
+
+
+def _on_schedule_changed(_conn, _pid: int, _channel: str, payload: str) -> None:
+    schedule_cache.invalidate(payload or None)
+
+
+def _on_listener_terminated(_conn) -> None:
+    # Notifications may have been missed; fall back to reloading everything.
+    schedule_cache.invalidate()
+
+
+async def start_schedule_listener() -> None:
+    """LISTEN for schedule changes on one dedicated connection per shard; TTL expiry covers failures."""
+    db_session.init_engine()
+    for shard, engine in db_session.shard_engines.items():
+        try:
+            conn = await engine.connect()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.add_listener(SCHEDULE_CHANNEL, _on_schedule_changed)
+            raw.driver_connection.add_termination_listener(_on_listener_terminated)
+        except Exception:  # pragma: no cover - depends on live database
+            logger.warning("Schedule change listener unavailable on %s; relying on cache TTL", shard, exc_info=True)
+            continue
+        _listener_conns.append(conn)
+
+
+async def stop_schedule_listener() -> None:
+    """Close the LISTEN connections that were started."""
+    while _listener_conns:
+        await _listener_conns.pop().close()
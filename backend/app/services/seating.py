@@ -0,0 +1,212 @@
+"""Table assignment on per-table occupancy bitsets.
+
+A :class:`FloorPlan` is a restaurant's active tables plus every way to seat a party:
+single tables, and 2..``MAX_COMBINED_TABLES`` tables from one ``join_group`` when no
+single member is big enough. Options for a party size are listed in best-fit
+order (fewest empty seats, then fewest tables) and cached with the floor plan.
+
+A :class:`SeatingPlan` adds occupancy for a time window. Each table's occupancy is
+an int whose bit ``i`` is the 15-minute bucket starting ``i`` buckets after the
+window origin, so "are these tables free for this slot" is
+``(occ_a | occ_b) & slot_mask == 0`` and :meth:`SeatingPlan.open_slots` answers
+every candidate start of an alternates search with a handful of shifts per option.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import combinations
+from time import monotonic
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+
+BUCKET = timedelta(minutes=15)
+BUCKET_SECONDS = 900
+MAX_COMBINED_TABLES = 3
+
+
+@dataclass(frozen=True)
+class Table:
+    id: str
+    label: str
+    seats_min: int
+    seats_max: int
+    join_group: str | None = None
+
+
+@dataclass(frozen=True)
+class SeatingOption:
+    tables: tuple[Table, ...]
+    members: tuple[int, ...]  # indexes into FloorPlan.tables
+    seats_min: int
+    seats_max: int
+
+    @property
+    def table_ids(self) -> list[str]:
+        return [table.id for table in self.tables]
+
+    @property
+    def labels(self) -> tuple[str, ...]:
+        return tuple(table.label for table in self.tables)
+
+
+def _bucket(ts: datetime) -> int:
+    return int(ts.timestamp() // BUCKET_SECONDS)
+
+
+def _bucket_ceil(ts: datetime) -> int:
+    return -int(-ts.timestamp() // BUCKET_SECONDS)
+
+
+class FloorPlan:
+    def __init__(self, tables: Sequence[Table]) -> None:
+        self.tables = tuple(tables)
+        self.index = {table.id: i for i, table in enumerate(self.tables)}
+        self._options = self._build_options()
+        self._by_party: dict[int, list[SeatingOption]] = {}
+
+    def _build_options(self) -> list[SeatingOption]:
+        options = [
+            SeatingOption((table,), (i,), table.seats_min, table.seats_max)
+            for i, table in enumerate(self.tables)
+        ]
+        groups: dict[str, list[int]] = {}
+        for i, table in enumerate(self.tables):
+            if table.join_group:
+                groups.setdefault(table.join_group, []).append(i)
+        for members in groups.values():
+            for size in range(2, min(MAX_COMBINED_TABLES, len(members)) + 1):
+                for combo in combinations(members, size):
+                    tables = tuple(self.tables[i] for i in combo)
+                    options.append(
+                        SeatingOption(
+                            tables,
+                            combo,
+                            # Only join tables for parties no single member seats.
+                            max(table.seats_max for table in tables) + 1,
+                            sum(table.seats_max for table in tables),
+                        )
+                    )
+        return options
+
+    def options_for(self, party_size: int) -> list[SeatingOption]:
+        options = self._by_party.get(party_size)
+        if options is None:
+            options = sorted(
+                (o for o in self._options if o.seats_min <= party_size <= o.seats_max),
+                key=lambda o: (o.seats_max, len(o.tables), o.labels),
+            )
+            self._by_party[party_size] = options
+        return options
+
+
+class SeatingPlan:
+    def __init__(self, floor: FloorPlan, origin: datetime) -> None:
+        self.floor = floor
+        self.origin_bucket = _bucket(origin)
+        self.occupancy = [0] * len(floor.tables)
+
+    def _span(self, start: datetime, end: datetime) -> int:
+        first = max(_bucket(start) - self.origin_bucket, 0)
+        last = _bucket_ceil(end) - self.origin_bucket
+        return ((1 << (last - first)) - 1) << first if last > first else 0
+
+    def occupy(self, table_id: str, start: datetime, end: datetime) -> None:
+        i = self.floor.index.get(table_id)
+        if i is not None:
+            self.occupancy[i] |= self._span(start, end)
+
+    def _busy(self, option: SeatingOption) -> int:
+        busy = 0
+        for i in option.members:
+            busy |= self.occupancy[i]
+        return busy
+
+    def best_fit(self, party_size: int, start: datetime, end: datetime) -> SeatingOption | None:
+        """Best-fitting free table or combination for the slot, or None."""
+        mask = self._span(start, end)
+        for option in self.floor.options_for(party_size):
+            if not self._busy(option) & mask:
+                return option
+        return None
+
+    def open_slots(self, party_size: int, first_start: datetime, duration: timedelta, count: int) -> int:
+        """Bitset whose bit ``k`` is set when the party fits at ``first_start + k * 15min``.
+
+        ``first_start`` must not precede the plan's origin.
+        """
+        offset = _bucket(first_start) - self.origin_bucket
+        length = _bucket_ceil(first_start + duration) - _bucket(first_start)
+        window = (1 << count) - 1
+        open_bits = 0
+        for option in self.floor.options_for(party_size):
+            # Bit s of blocked is set when any bucket in [s, s + length) is busy.
+            blocked = self._busy(option) >> offset
+            covered = 1
+            while covered < length:
+                step = min(covered, length - covered)
+                blocked |= blocked >> step
+                covered += step
+            open_bits |= ~blocked & window
+            if open_bits == window:
+                break
+        return open_bits
+
+
+TABLES_SQL = """
+SELECT id, label, seats_min, seats_max, join_group
+FROM restaurant_table
+WHERE restaurant_id = :restaurant_id AND active
+ORDER BY label
+"""
+OCCUPANCY_SQL = """
+SELECT table_id, lower(slot_range) AS start_ts, upper(slot_range) AS end_ts
+FROM reservation_table
+WHERE restaurant_id = :restaurant_id
+  AND slot_range && tstzrange(:window_start, :window_end, '[)')
+"""
+
+# restaurant_id -> (loaded_at, floor plan or None when the restaurant has no tables)
+_floor_cache: dict[str, tuple[float, FloorPlan | None]] = {}
+
+
+async def load_floor(session: AsyncSession, restaurant_id: str, *, fresh: bool = False) -> FloorPlan | None:
+    """Active tables of a restaurant; cached for FLOOR_PLAN_CACHE_TTL_SECONDS unless ``fresh``."""
+    cached = _floor_cache.get(restaurant_id)
+    if not fresh and cached is not None and monotonic() - cached[0] < settings.FLOOR_PLAN_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    rows = (await session.execute(text(TABLES_SQL), {"restaurant_id": restaurant_id})).all()
+    tables = tuple(
+        Table(str(row.id), row.label, row.seats_min, row.seats_max, row.join_group) for row in rows
+    )
+    floor = None
+    if tables:
+        # Reuse the previous plan (and its per-party option lists) when nothing changed.
+        previous = cached[1] if cached is not None else None
+        floor = previous if previous is not None and previous.tables == tables else FloorPlan(tables)
+    _floor_cache[restaurant_id] = (monotonic(), floor)
+    return floor
+
+
+async def load_plan(
+    session: AsyncSession,
+    floor: FloorPlan,
+    restaurant_id: str,
+    window_start: datetime,
+    window_end: datetime,
+) -> SeatingPlan:
+    """Occupancy of ``floor`` between ``window_start`` and ``window_end``."""
+    plan = SeatingPlan(floor, window_start)
+    rows = await session.execute(
+        text(OCCUPANCY_SQL),
+        {"restaurant_id": restaurant_id, "window_start": window_start, "window_end": window_end},
+    )
+    for row in rows:
+        plan.occupy(str(row.table_id), row.start_ts, row.end_ts)
+    return plan
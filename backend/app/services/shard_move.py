@@ -0,0 +1,244 @@
+"""Online move of one restaurant's rows to another database shard.
+
+``scripts/move_restaurant.py`` is the command-line entry point. A move runs in
+four steps:
+
+1. **Copy** – clear any earlier copy on the target, then copy every row of the
+   restaurant (restaurant, hours, blackouts, capacity windows, tables,
+   reservations and their table assignments) from one REPEATABLE READ snapshot of
+   the source. Bookings keep committing on the source meanwhile.
+2. **Catch up** – copy only what changed since the last pass, detected by
+   comparing each row's ``xmin`` with the value copied. Repeat ``passes`` times.
+3. **Cut over** – on the source, take ``restaurant_move_lock()``. It conflicts
+   with the shared ``restaurant_write_fence()`` every commit holds, so in-flight
+   commits finish and new ones wait. Then run a last catch-up pass, write the
+   ``restaurant_moved`` tombstone and commit the target, then the source. Commits
+   are blocked only for this one pass. Commits that were waiting, and any later
+   commit routed by a stale shard map, find the tombstone and answer 503 with
+   ``Retry-After``.
+4. **Route** – point ``restaurant_shard_map`` on the default shard at the target.
+
+With ``drop_source`` the restaurant is deleted from the source (the tombstone
+stays) once every worker's shard map cache has expired. Non-booking edits to a
+restaurant's configuration are not fenced; avoid them while a move runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from time import perf_counter
+from uuid import UUID
+
+from backend.app.core.config import settings
+from backend.app.db import session as db_session
+
+# (table, column holding the restaurant id), parents before children. Every table
+# has an ``id`` primary key except reservation_table, which is copied per reservation.
+MOVED_TABLES = (
+    ("restaurant", "id"),
+    ("hours_rule", "restaurant_id"),
+    ("blackout", "restaurant_id"),
+    ("capacity_rule", "restaurant_id"),
+    ("restaurant_table", "restaurant_id"),
+    ("reservation", "restaurant_id"),
+)
+# Cancelled reservations first so a slot shard they released is free before the
+# booking that took it over is written.
+ROW_ORDER = {"reservation": "ORDER BY status <> 'cancelled'"}
+
+COLUMNS_SQL = """
+SELECT column_name FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = $1 AND is_generated = 'NEVER'
+ORDER BY ordinal_position
+"""
+SHARD_MAP_UPSERT_SQL = """
+INSERT INTO restaurant_shard_map (restaurant_id, shard) VALUES ($1, $2)
+ON CONFLICT (restaurant_id) DO UPDATE SET shard = EXCLUDED.shard, updated_at = now()
+"""
+
+
+class ShardMoveError(RuntimeError):
+    """Raised when a move cannot start or cannot complete."""
+
+
+@dataclass
+class MoveReport:
+    source: str
+    target: str
+    # rows written to the target per pass, keyed by table
+    passes: list[dict[str, int]] = field(default_factory=list)
+    copy_seconds: float = 0.0
+    catch_up_seconds: float = 0.0
+    # how long commits for the restaurant were fenced
+    cutover_seconds: float = 0.0
+    dropped_source: bool = False
+
+    def summary(self) -> str:
+        lines = [f"{self.source} -> {self.target}"]
+        for number, rows in enumerate(self.passes):
+            label = "copy" if number == 0 else ("cutover" if number == len(self.passes) - 1 else f"catch-up {number}")
+            lines.append(f"{label:>10}: " + ", ".join(f"{table} {count}" for table, count in rows.items() if count))
+        for phase, seconds in (
+            ("copy", self.copy_seconds),
+            ("catch-up", self.catch_up_seconds),
+            ("cutover", self.cutover_seconds),
+        ):
+            lines.append(f"{phase:>10}: {seconds:8.3f}s")
+        if self.dropped_source:
+            lines.append(f"removed from {self.source}")
+        return "\n".join(lines)
+
+
+async def _columns(conn, table: str) -> list[str]:
+    return [row["column_name"] for row in await conn.fetch(COLUMNS_SQL, table)]
+
+
+def _upsert_sql(table: str, columns: list[str]) -> str:
+    placeholders = ", ".join(f"${n}" for n in range(1, len(columns) + 1))
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    )
+
+
+class RestaurantCopier:
+    """Copies one restaurant between two asyncpg connections, remembering each row's xmin."""
+
+    def __init__(self, restaurant_id: UUID) -> None:
+        self.restaurant_id = restaurant_id
+        self.copied: dict[str, dict[UUID, str]] = {table: {} for table, _ in MOVED_TABLES}
+        self._columns: dict[str, list[str]] = {}
+
+    async def sync(self, source, target) -> dict[str, int]:
+        """Bring the target up to the source's current state; returns rows written per table.
+
+        The first call replaces whatever the target held for the restaurant.
+        """
+        if not self._columns:
+            for table, _ in MOVED_TABLES + (("reservation_table", "restaurant_id"),):
+                self._columns[table] = await _columns(source, table)
+            await target.execute("DELETE FROM restaurant WHERE id = $1", self.restaurant_id)
+
+        current: dict[str, dict[UUID, str]] = {}
+        for table, key in MOVED_TABLES:
+            rows = await source.fetch(f"SELECT id, xmin::text AS xmin FROM {table} WHERE {key} = $1", self.restaurant_id)
+            current[table] = {row["id"]: row["xmin"] for row in rows}
+
+        # Deletes children first; ON DELETE CASCADE covers rows of removed parents.
+        for table, _ in reversed(MOVED_TABLES):
+            removed = [row_id for row_id in self.copied[table] if row_id not in current[table]]
+            if removed:
+                await target.execute(f"DELETE FROM {table} WHERE id = ANY($1::uuid[])", removed)
+
+        written: dict[str, int] = {}
+        for table, _ in MOVED_TABLES:
+            changed = [row_id for row_id, xmin in current[table].items() if self.copied[table].get(row_id) != xmin]
+            written[table] = len(changed)
+            if not changed:
+                continue
+            columns = self._columns[table]
+            rows = await source.fetch(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id = ANY($1::uuid[]) {ROW_ORDER.get(table, '')}",
+                changed,
+            )
+            await target.executemany(_upsert_sql(table, columns), [tuple(row) for row in rows])
+
+        # Table assignments follow their reservation: an insert or a cancellation
+        # always gives the reservation row a new xmin.
+        changed_reservations = [
+            row_id
+            for row_id, xmin in current["reservation"].items()
+            if self.copied["reservation"].get(row_id) != xmin
+        ]
+        written["reservation_table"] = 0
+        if changed_reservations:
+            columns = self._columns["reservation_table"]
+            await target.execute(
+                "DELETE FROM reservation_table WHERE reservation_id = ANY($1::uuid[])", changed_reservations
+            )
+            links = await source.fetch(
+                f"SELECT {', '.join(columns)} FROM reservation_table WHERE reservation_id = ANY($1::uuid[])",
+                changed_reservations,
+            )
+            if links:
+                await target.copy_records_to_table(
+                    "reservation_table", records=[tuple(link) for link in links], columns=columns
+                )
+            written["reservation_table"] = len(links)
+
+        self.copied = current
+        return written
+
+
+async def _raw(conn):
+    return (await conn.get_raw_connection()).driver_connection
+
+
+async def move_restaurant(
+    restaurant_id: str,
+    target: str,
+    *,
+    passes: int = 2,
+    drop_source: bool = False,
+    report: MoveReport | None = None,
+) -> MoveReport:
+    """Move ``restaurant_id`` to shard ``target`` online; see the module docstring."""
+    db_session.init_engine()
+    if target not in db_session.shard_engines:
+        raise ShardMoveError(f"Unknown shard {target!r}; configure it in DATABASE_SHARDS")
+    rid = UUID(str(restaurant_id))
+    db_session.shard_map.invalidate(rid)
+    source = await db_session.shard_map.shard_for(str(rid))
+    if source == target:
+        raise ShardMoveError(f"Restaurant {rid} already lives on {target!r}")
+    report = report or MoveReport(source=source, target=target)
+    copier = RestaurantCopier(rid)
+
+    async with (
+        db_session.shard_engines[source].connect() as source_conn,
+        db_session.shard_engines[target].connect() as target_conn,
+    ):
+        src, dst = await _raw(source_conn), await _raw(target_conn)
+        moved_to = await src.fetchval("SELECT moved_to FROM restaurant_moved WHERE restaurant_id = $1", rid)
+        if moved_to is not None and moved_to != target:
+            raise ShardMoveError(f"Restaurant {rid} already moved from {source!r} to {moved_to!r}")
+
+        if moved_to is None:
+            if not await src.fetchval("SELECT EXISTS (SELECT 1 FROM restaurant WHERE id = $1)", rid):
+                raise ShardMoveError(f"Restaurant {rid} not found on {source!r}")
+
+            for number in range(passes):
+                began = perf_counter()
+                async with src.transaction(isolation="repeatable_read", readonly=True), dst.transaction():
+                    report.passes.append(await copier.sync(src, dst))
+                if number == 0:
+                    report.copy_seconds = perf_counter() - began
+                else:
+                    report.catch_up_seconds += perf_counter() - began
+
+            began = perf_counter()
+            async with src.transaction():
+                await src.execute("SELECT restaurant_move_lock($1)", rid)
+                async with dst.transaction():
+                    report.passes.append(await copier.sync(src, dst))
+                    await dst.execute("DELETE FROM restaurant_moved WHERE restaurant_id = $1", rid)
+                await src.execute(
+                    "INSERT INTO restaurant_moved (restaurant_id, moved_to) VALUES ($1, $2)", rid, target
+                )
+            report.cutover_seconds = perf_counter() - began
+        # else: an earlier run committed the tombstone but not the shard map; finish it.
+
+    async with db_session.engine.connect() as directory_conn:
+        directory = await _raw(directory_conn)
+        await directory.execute(SHARD_MAP_UPSERT_SQL, rid, target)
+    db_session.shard_map.invalidate(rid)
+
+    if drop_source:
+        # Let every worker's cached map entry expire before reads lose the old copy.
+        await asyncio.sleep(settings.SHARD_MAP_CACHE_TTL_SECONDS)
+        async with db_session.shard_engines[source].connect() as source_conn:
+            await (await _raw(source_conn)).execute("DELETE FROM restaurant WHERE id = $1", rid)
+        report.dropped_source = True
+    return report
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+SLOT_SPAN_BITS = 16
+
+
+def slot_key(start_utc: datetime, end_utc: datetime) -> int:
+    """Integer slot identity matching the ``reservation.slot_key`` generated column.
+
+    Start minute since the epoch in the high bits, duration in minutes in the low
+    ``SLOT_SPAN_BITS`` bits (see ``reservation_slot_key()`` in ``sql/080_reservation_slot_keys.sql``).
+    """
+    start_minute = int(start_utc.timestamp() // 60)
+    end_minute = int(end_utc.timestamp() // 60)
+    return (start_minute << SLOT_SPAN_BITS) | (end_minute - start_minute)
@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, time, timedelta, timezone
+
+from backend.app.services.availability_grid import GridCache, build_grid
+from backend.app.services.schedule import CompiledSchedule, HoursWindow
+from backend.app.services.seating import BUCKET, FloorPlan, SeatingPlan, Table
+
+# Local midnight in New York on a Saturday.
+ORIGIN = datetime(2025, 11, 8, 5, 0, tzinfo=timezone.utc)
+COUNT = 96
+
+
+def _us(ts: datetime) -> int:
+    return round(ts.timestamp() * 1_000_000)
+
+
+def _overlaps(a_start, a_end, b_start, b_end) -> bool:
+    return a_start < b_end and b_start < a_end
+
+
+def test_grid_matches_single_slot_capacity_summary():
+    rng = random.Random(11)
+    duration = timedelta(minutes=100)  # deliberately not a whole number of buckets
+    rules = [
+        (_us(ORIGIN + timedelta(hours=11)), _us(ORIGIN + timedelta(hours=17)), 40, 8),
+        (_us(ORIGIN + timedelta(hours=16)), _us(ORIGIN + timedelta(hours=23)), 60, 12),
+    ]
+    bookings = []
+    for _ in range(80):
+        # Some starts off the 15-minute grid, some before the window opens.
+        start = ORIGIN + timedelta(minutes=rng.randrange(-120, 24 * 60, 5))
+        length = timedelta(minutes=rng.choice((60, 90, 100, 120)))
+        bookings.append((_us(start), _us(start + length), rng.randint(1, 8), int(rng.random() < 0.8)))
+
+    for party in (2, 6):
+        grid = build_grid(ORIGIN, COUNT, duration, party, rules, bookings)
+        for k in range(COUNT):
+            start = _us(ORIGIN + k * BUCKET)
+            end = start + duration // timedelta(microseconds=1)
+            applying = [rule for rule in rules if _overlaps(rule[0], rule[1], start, end)]
+            if not applying:
+                assert grid.remaining_covers[k] == -1 and not grid.bookable[k]
+                continue
+            _, _, max_covers, max_parties = max(applying, key=lambda rule: rule[0])
+            overlapping = [b for b in bookings if b[3] and _overlaps(b[0], b[1], start, end)]
+            covers = sum(b[2] for b in overlapping)
+            shards = sum(1 for b in bookings if b[0] == start and b[1] == end)
+            assert grid.remaining_covers[k] == max(max_covers - covers, 0)
+            assert grid.remaining_parties[k] == max(max_parties - len(overlapping), 0)
+            assert grid.bookable[k] == (
+                covers + party <= max_covers and len(overlapping) + 1 <= max_parties and shards < max_parties
+            )
+
+
+def test_grid_applies_opening_hours_and_tables():
+    schedule = CompiledSchedule(
+        "demo",
+        "America/New_York",
+        [HoursWindow(6, time(17), time(22))],
+        [(ORIGIN + timedelta(hours=19), ORIGIN + timedelta(hours=19, minutes=30))],
+    )
+    plan = SeatingPlan(FloorPlan([Table("t4", "4A", 1, 4)]), ORIGIN)
+    plan.occupy("t4", ORIGIN + timedelta(hours=21), ORIGIN + timedelta(hours=22))
+    duration = timedelta(minutes=90)
+    rules = [(_us(ORIGIN), _us(ORIGIN + timedelta(days=1)), 100, 20)]
+
+    grid = build_grid(ORIGIN, COUNT, duration, 4, rules, [], schedule, plan)
+
+    for k in range(COUNT):
+        start = ORIGIN + k * BUCKET
+        expected = schedule.is_open(start, start + duration) and plan.best_fit(4, start, start + duration) is not None
+        assert grid.bookable[k] == expected
+    assert grid.bookable.any()
+
+
+def test_grid_cache_misses_once_the_booking_version_moves():
+    cache = GridCache(ttl_seconds=60, max_entries=2)
+    cache.put("a", 1, "grid-a")
+
+    assert cache.get("a", 1) == "grid-a"
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) is None  # the stale entry was dropped
+
+    cache.put("a", 2, "grid-a2")
+    cache.put("b", 2, "grid-b")
+    cache.put("c", 2, "grid-c")
+    assert cache.get("a", 2) is None  # oldest evicted at max_entries
+    assert cache.get("c", 2) == "grid-c"
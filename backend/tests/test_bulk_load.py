@@ -0,0 +1,71 @@
+import io
+
+import pandas as pd
+
+from backend.app.services.bulk_load import validate_frames
+
+RESTAURANT = "6f1c1d8e-1f7a-4a8f-9a3c-2b1d3c4e5f60"
+
+
+def _csv(body: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(body), dtype=str, keep_default_na=False, na_values=[""])
+
+
+def test_capacity_windows_validated_and_defaulted():
+    frame = _csv(
+        "restaurant_id,start_ts,end_ts,max_covers,max_parties,party_min,party_max\n"
+        f"{RESTAURANT},2026-01-02T16:00:00-05:00,2026-01-02T16:15:00-05:00,40,10,,\n"
+        f"{RESTAURANT},2026-01-02T16:10:00-05:00,2026-01-02T16:30:00-05:00,40,10,4,2\n"
+        f"{RESTAURANT},2026-01-03 17:00,2026-01-03T16:45:00-05:00,0,10,1,12\n"
+        "not-a-uuid,2026-01-02T18:00:00Z,2026-01-02T18:15:00Z,40,x,1,12\n"
+    )
+    cleaned, issues = validate_frames({"capacity_rule": frame})
+    found = {(issue.row, issue.message) for issue in issues}
+
+    assert (2, "overlaps another capacity window") in found
+    assert (2, "party_max must be >= party_min") in found
+    assert (3, "start_ts must include a UTC offset") in found
+    assert (3, "max_covers must be positive") in found
+    assert (4, "restaurant_id is not a UUID") in found
+    assert (4, "max_parties is not an integer") in found
+    assert not any(issue.row == 1 for issue in issues)
+
+    first = cleaned["capacity_rule"].iloc[0]
+    assert (first["party_min"], first["party_max"]) == (1, 12)
+    assert first["start_ts"] == pd.Timestamp("2026-01-02T21:00:00Z")
+
+
+def test_hours_overnight_windows_and_overlaps():
+    frame = _csv(
+        "restaurant_id,day_of_week,open_time,close_time\n"
+        f"{RESTAURANT},5,18:00,02:00\n"
+        f"{RESTAURANT},5,23:00,23:30\n"
+        f"{RESTAURANT},6,12:00,12:00\n"
+        f"{RESTAURANT},7,16:00,22:00\n"
+    )
+    _, issues = validate_frames({"hours_rule": frame})
+
+    assert [str(issue) for issue in issues] == [
+        "hours_rule row 4: day_of_week must be 0 (Sunday) to 6",
+        "hours_rule row 3: open_time equals close_time",
+        "hours_rule row 2: overlaps another window on the same day",
+    ]
+
+
+def test_hours_overnight_spill_checked_against_the_next_day():
+    frame = _csv(
+        "restaurant_id,day_of_week,open_time,close_time\n"
+        f"{RESTAURANT},5,18:00,02:00\n"
+        f"{RESTAURANT},6,01:00,03:00\n"
+        f"{RESTAURANT},6,20:00,01:30\n"
+        f"{RESTAURANT},0,01:30,04:00\n"
+        f"{RESTAURANT},1,22:00,03:00\n"
+        f"{RESTAURANT},2,03:00,06:00\n"
+    )
+    _, issues = validate_frames({"hours_rule": frame})
+
+    # Friday's spill reaches Saturday 01:00; Saturday's ends as Sunday opens (allowed),
+    # as does Monday's spill into Tuesday.
+    assert [str(issue) for issue in issues] == [
+        "hours_rule row 1: runs past midnight into a window on the next day",
+    ]
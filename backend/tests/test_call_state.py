@@ -0,0 +1,97 @@
+import audioop
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+from backend.app.main import app
+from backend.app.services import call_state
+from backend.app.services.call_state import MAX_TRANSCRIPT_TURNS, CallState
+
+
+class _Store:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _mid_call_state() -> CallState:
+    state = CallState(call_sid="CA123", stream_sid="MZ456", session={"voice": "verse"})
+    state.booking.update({"phone": "+15550001", "party_size": 4, "name": "Rivera"})
+    state.hold_id = "hold-1"
+    state.turns = 3
+    for turn in range(MAX_TRANSCRIPT_TURNS + 5):
+        state.add_turn("user" if turn % 2 else "assistant", f"turn {turn}")
+    _, state.up_state = audioop.ratecv(b"\x10\x00" * 160, 2, 1, 8000, 16000, None)
+    _, state.down_state = audioop.ratecv(b"\x20\x00" * 320, 2, 1, 16000, 8000, None)
+    return state
+
+
+def test_snapshot_round_trip_restores_resampler_state():
+    state = _mid_call_state()
+    blob = call_state.encode(state)
+    restored = call_state.decode(blob)
+
+    assert restored == state
+    assert len(restored.transcript) == MAX_TRANSCRIPT_TURNS
+    assert restored.transcript[-1] == ("assistant", f"turn {MAX_TRANSCRIPT_TURNS + 4}")
+    # A resumed worker continues the same filter rather than restarting it.
+    chunk = b"\x30\x00" * 160
+    assert audioop.ratecv(chunk, 2, 1, 8000, 16000, restored.up_state) == audioop.ratecv(
+        chunk, 2, 1, 8000, 16000, state.up_state
+    )
+    assert len(blob) < 1024
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_saved_loaded_and_discarded_per_call_sid(monkeypatch):
+    store = _Store()
+    monkeypatch.setattr(redis_module, "redis_client", store)
+    state = _mid_call_state()
+
+    await call_state.save(state)
+    assert list(store.values) == ["call:{CA123}"]
+    assert await call_state.load("CA123") == state
+    assert await call_state.load("CA999") is None
+
+    await call_state.discard("CA123")
+    assert await call_state.load("CA123") is None
+
+
+@pytest.mark.asyncio
+async def test_voice_webhook_reconnects_only_while_a_snapshot_exists(monkeypatch):
+    store = _Store()
+    monkeypatch.setattr(redis_module, "redis_client", store)
+    monkeypatch.setattr(settings, "TWILIO_AUTH_TOKEN", None)
+    monkeypatch.setattr(settings, "CALL_RESUME_MAX_ATTEMPTS", 2)
+    await call_state.save(_mid_call_state())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+
+        async def webhook(query: str = "") -> str:
+            response = await client.post(f"/twilio/voice{query}", data={"CallSid": "CA123"})
+            assert response.status_code == 200
+            return response.text
+
+        assert "/twilio/voice?attempt=1</Redirect>" in await webhook()
+        # A worker died mid-call: reconnect and count the attempt.
+        assert "/twilio/voice?attempt=2</Redirect>" in await webhook("?attempt=1")
+        # Retry cap reached: hang up and drop the snapshot.
+        assert "<Hangup/>" in await webhook("?attempt=3")
+        assert await call_state.load("CA123") is None
+        # The stream ended normally (snapshot discarded on stop): no loop.
+        assert "<Hangup/>" in await webhook("?attempt=1")
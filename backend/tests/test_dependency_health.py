@@ -0,0 +1,151 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from backend.app.core import dependency_health
+from backend.app.core.config import settings
+from backend.app.db import session as db_session
+from backend.app.core.dependency_health import (
+    POSTGRES,
+    REDIS,
+    DependencyMonitor,
+    require_dependencies,
+)
+
+
+def _monitor_with_probes(monkeypatch, postgres, redis, shards=None) -> DependencyMonitor:
+    monkeypatch.setattr(settings, "DATABASE_SHARDS", shards or {})
+    monkeypatch.setitem(dependency_health.PROBES, POSTGRES, postgres)
+    monkeypatch.setitem(dependency_health.PROBES, REDIS, redis)
+    return DependencyMonitor(interval=60, timeout=0.05, failure_threshold=2)
+
+
+async def _ok(*_) -> None:
+    return None
+
+
+async def _hang(*_) -> None:
+    await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_threshold_and_closes_on_recovery(monkeypatch):
+    state = {"down": True}
+
+    async def flaky(*_) -> None:
+        if state["down"]:
+            raise ConnectionRefusedError("connection refused")
+
+    monitor = _monitor_with_probes(monkeypatch, _ok, flaky)
+
+    await monitor.probe_all()
+    assert monitor.is_available(REDIS)  # one failure is below the threshold
+    await monitor.probe_all()
+    assert not monitor.is_available(REDIS)
+    assert monitor.is_available(POSTGRES)
+    assert "connection refused" in monitor.results[REDIS].error
+
+    state["down"] = False
+    await monitor.probe_all()
+    assert monitor.is_available(REDIS)
+    assert monitor.results[REDIS].healthy
+
+
+@pytest.mark.asyncio
+async def test_hung_dependency_counts_as_failure(monkeypatch):
+    monitor = _monitor_with_probes(monkeypatch, _hang, _ok)
+
+    await monitor.probe_all()
+    await monitor.probe_all()
+
+    assert not monitor.is_available(POSTGRES)
+    assert monitor.results[POSTGRES].error.startswith("timed out")
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_with_retryable_503(monkeypatch):
+    async def down(*_) -> None:
+        raise OSError("unreachable")
+
+    monitor = _monitor_with_probes(monkeypatch, down, _ok)
+    monkeypatch.setattr(dependency_health, "dependency_monitor", monitor)
+    await monitor.probe_all()
+    await monitor.probe_all()
+
+    app = FastAPI()
+
+    @app.post("/hot", dependencies=[Depends(require_dependencies(POSTGRES, REDIS))])
+    async def hot() -> dict[str, bool]:
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/hot")
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Postgres unavailable"
+        assert int(response.headers["Retry-After"]) > 0
+
+        monkeypatch.setitem(dependency_health.PROBES, POSTGRES, _ok)
+        await monitor.probe_all()
+        assert (await client.post("/hot")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_each_database_shard_has_its_own_breaker(monkeypatch):
+    async def east_down(shard: str) -> None:
+        if shard == "east":
+            raise OSError("unreachable")
+
+    monitor = _monitor_with_probes(monkeypatch, east_down, _ok, shards={"east": "postgresql+asyncpg://east"})
+    monkeypatch.setattr(dependency_health, "dependency_monitor", monitor)
+    await monitor.probe_all()
+    await monitor.probe_all()
+
+    assert set(monitor.results) == {POSTGRES, "postgres:east", REDIS}
+    assert monitor.is_available(POSTGRES)
+    assert not monitor.is_available("postgres:east")
+
+    async def restaurant_from_query(request):
+        return request.query_params.get("restaurant_id")
+
+    lookups: list[str] = []
+
+    async def shard_for(restaurant_id: str) -> str:
+        lookups.append(restaurant_id)
+        if restaurant_id == "stalled":
+            await asyncio.sleep(1)
+        if restaurant_id == "unmapped":
+            raise RuntimeError("mapped to unconfigured shard 'west'")
+        return "east"
+
+    cached = {"r-default": "default"}
+    monkeypatch.setattr(db_session, "request_restaurant_id", restaurant_from_query)
+    monkeypatch.setattr(db_session.shard_map, "cached", cached.get)
+    monkeypatch.setattr(db_session.shard_map, "shard_for", shard_for)
+    app = FastAPI()
+
+    @app.post("/hot", dependencies=[Depends(require_dependencies(POSTGRES))])
+    async def hot() -> dict[str, bool]:
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def hot_status(restaurant_id: str) -> tuple[int, str | None]:
+            response = await client.post("/hot", params={"restaurant_id": restaurant_id})
+            return response.status_code, response.json().get("detail")
+
+        assert await hot_status("r-default") == (200, None)
+        assert await hot_status("r-east") == (503, "Postgres shard 'east' unavailable")
+        # Lookups that stall or fail answer the retryable 503, within the probe timeout.
+        assert await hot_status("stalled") == (503, "Postgres unavailable")
+        assert await hot_status("unmapped") == (503, "Postgres unavailable")
+
+        # With the default shard (which holds the map) down, uncached entries are not looked up.
+        monkeypatch.setitem(dependency_health.PROBES, POSTGRES, _hang)
+        await monitor.probe_all()
+        await monitor.probe_all()
+        lookups.clear()
+        assert await hot_status("r-new") == (503, "Postgres unavailable")
+        assert lookups == []
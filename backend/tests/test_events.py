@@ -0,0 +1,47 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.events import DROP_NEWEST, DROP_OLDEST, EventSink
+
+
+def test_drop_policies_bound_the_buffer():
+    newest = EventSink(max_queue=2, batch_size=10, flush_interval=1.0, drop_policy=DROP_NEWEST)
+    assert newest.emit("a") and newest.emit("b")
+    assert newest.emit("c") is False
+    assert [record[2] for record in newest._buffer] == ["a", "b"]
+
+    oldest = EventSink(max_queue=2, batch_size=10, flush_interval=1.0, drop_policy=DROP_OLDEST)
+    for event_type in ("a", "b", "c"):
+        oldest.emit(event_type)
+    assert [record[2] for record in oldest._buffer] == ["b", "c"]
+
+    stats = oldest.snapshot()
+    assert stats["dropped"] == 1
+    assert stats["queue_depth"] == 2
+    assert stats["queue_high_water"] == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_copies_events_into_event_log():
+    event_type = f"pytest.{uuid4().hex}"
+    sink = EventSink(max_queue=100, batch_size=2, flush_interval=0.05)
+    await sink.start()
+    for n in range(5):
+        sink.emit(event_type, None, {"n": n})
+    await sink.stop()
+
+    async with SessionLocal() as session:
+        count = (
+            await session.execute(
+                text("SELECT count(*) FROM event_log WHERE type = :type"),
+                {"type": event_type},
+            )
+        ).scalar_one()
+        await session.execute(text("DELETE FROM event_log WHERE type = :type"), {"type": event_type})
+        await session.commit()
+
+    assert count == 5
+    assert sink.snapshot()["written"] == 5
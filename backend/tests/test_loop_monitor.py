@@ -0,0 +1,36 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from backend.app.core.loop_monitor import LoopLagMonitor, loop_runtime
+from backend.app.serve import resolve_runtime
+
+
+def _blocking_transcode() -> None:
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocked_loop_is_measured_and_logged_with_stack(caplog):
+    monitor = LoopLagMonitor(interval=0.05, slow_callback_ms=50)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        with caplog.at_level(logging.WARNING, logger="backend.app.core.loop_monitor"):
+            _blocking_transcode()
+            await asyncio.sleep(0.15)
+    finally:
+        await monitor.stop()
+
+    assert monitor.blocked_events == 1
+    assert monitor.max_lag >= 0.2
+    assert "_blocking_transcode" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_runtime_resolution():
+    assert loop_runtime() in ("asyncio", "uvloop")
+    assert resolve_runtime("asyncio") == ("asyncio", "h11")
+    assert resolve_runtime("uvloop")[0] == "uvloop"
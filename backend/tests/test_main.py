@@ -0,0 +1,23 @@
+import pytest
+
+from backend.app.main import create_app
+
+
+def _paths(profile: str) -> set[str]:
+    return {route.path for route in create_app(profile).routes}
+
+
+def test_profiles_mount_only_their_routers():
+    api, voice, everything = _paths("api"), _paths("voice"), _paths("all")
+
+    assert "/api/v1/availability/check" in api
+    assert "/twilio/voice" not in api
+    assert "/ws/twilio-stream" in voice
+    assert "/api/v1/reservations/commit" not in voice
+    assert api | voice == everything
+    assert {"/api/v1/healthz", "/metrics"} <= api & voice
+
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        create_app("batch")
@@ -0,0 +1,56 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.app.core.metrics import HOLDS, observe_event
+from backend.app.main import app
+from backend.app.services import events
+
+
+def test_events_feed_hold_counters():
+    conflict = HOLDS.labels(result="conflict", reason="held")
+    before = conflict._value.get()
+
+    observe_event("hold.conflict", {"reason": "held", "start_ts": "2025-11-05T20:00:00Z"})
+    observe_event("hold.created", {"hold_id": "x"})
+
+    assert conflict._value.get() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_families():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    for name in (
+        "frontdesk_request_latency_seconds",
+        "frontdesk_holds_total",
+        "frontdesk_alternates_checked",
+        "frontdesk_pg_advisory_lock_waiters",
+        "frontdesk_db_pool_checked_out",
+    ):
+        assert name in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exports_event_sink_backpressure(monkeypatch):
+    sink = events.EventSink(max_queue=2, batch_size=10, flush_interval=60)
+    monkeypatch.setattr(events, "event_sink", sink)
+    for _ in range(3):
+        sink.emit("hold.created")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        body = (await client.get("/metrics")).text
+
+    for line in (
+        "frontdesk_event_sink_queue_depth 2.0",
+        "frontdesk_event_sink_queue_high_water 2.0",
+        "frontdesk_event_sink_queue_capacity 2.0",
+        "frontdesk_event_sink_dropped_total 1.0",
+        "frontdesk_event_sink_written_total 0.0",
+        "frontdesk_event_sink_flush_failures_total 0.0",
+    ):
+        assert line in body.splitlines()
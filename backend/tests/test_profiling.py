@@ -0,0 +1,57 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.app.core.config import settings
+from backend.app.core.profiling import ProfileStore, ProfilingMiddleware, RequestProfile, current_profile
+from backend.app.main import app
+
+
+async def _fake_endpoint(scope, receive, send):
+    profile = current_profile.get()
+    profile.record_sql("SELECT  1\n FROM capacity_rule", 4.0)
+    profile.record_sql("SELECT 2", 9.5)
+    profile.record_redis(0.3)
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_store_keeps_only_slowest_profiles():
+    store = ProfileStore(keep=2)
+    for duration in (5.0, 50.0, 1.0, 20.0):
+        store.add(RequestProfile(method="GET", path=f"/{duration}", duration_ms=duration))
+
+    assert [profile["duration_ms"] for profile in store.slowest()] == [50.0, 20.0]
+    assert store.sampled == 4
+
+
+@pytest.mark.asyncio
+async def test_middleware_attributes_queries_to_request():
+    store = ProfileStore(keep=5)
+    transport = ASGITransport(app=ProfilingMiddleware(_fake_endpoint, sample_rate=1.0, store=store))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/v1/availability/check")
+
+    assert response.status_code == 204
+    [profile] = store.slowest()
+    assert profile["path"] == "/api/v1/availability/check"
+    assert profile["status"] == 204
+    assert profile["db_queries"] == 2
+    assert profile["db_ms"] == pytest.approx(13.5)
+    assert profile["slowest_sql"] == "SELECT 2"
+    assert profile["redis_calls"] == 1
+    assert current_profile.get() is None
+
+
+@pytest.mark.asyncio
+async def test_debug_profiles_requires_token(monkeypatch):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(settings, "DEBUG_API_TOKEN", None)
+        assert (await client.get("/api/v1/debug/profiles")).status_code == 404
+
+        monkeypatch.setattr(settings, "DEBUG_API_TOKEN", "s3cret")
+        assert (await client.get("/api/v1/debug/profiles", headers={"X-Debug-Token": "nope"})).status_code == 403
+        allowed = await client.get("/api/v1/debug/profiles", headers={"X-Debug-Token": "s3cret"})
+
+    assert allowed.status_code == 200
+    assert "profiles" in allowed.json()
@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from backend.app.core import rate_limit as rate_limit_module
+from backend.app.core import redis_client as redis_module
+from backend.app.core.rate_limit import rate_limit
+
+
+def _app(opened: list[str]) -> FastAPI:
+    app = FastAPI()
+
+    async def session_dependency():
+        opened.append("session")
+        yield None
+
+    @app.post("/check", dependencies=[Depends(rate_limit("availability_check"))])
+    async def check(session=Depends(session_dependency)) -> dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+async def _post(app: FastAPI, body: dict) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/check", json=body, headers={"X-Client-Id": "voice-agent"})
+
+
+@pytest.mark.asyncio
+async def test_throttled_request_is_rejected_before_a_session_opens(monkeypatch):
+    calls = []
+
+    async def empty_bucket(scope, restaurant_id, client_id, phone=None):
+        calls.append((scope, restaurant_id, client_id, phone))
+        return 1500, "phone"
+
+    monkeypatch.setattr(redis_module, "redis_client", object())
+    monkeypatch.setattr(rate_limit_module, "take_token", empty_bucket)
+    opened: list[str] = []
+
+    response = await _post(_app(opened), {"restaurant_id": "r1", "caller_phone": "+15550001"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.json()["detail"]["limit"] == "phone"
+    assert calls == [("availability_check", "r1", "voice-agent", "+15550001")]
+    assert opened == []
+
+
+@pytest.mark.asyncio
+async def test_limiter_fails_open_when_redis_errors(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis_module, "redis_client", object())
+    monkeypatch.setattr(rate_limit_module, "take_token", broken)
+    opened: list[str] = []
+
+    response = await _post(_app(opened), {"restaurant_id": "r1"})
+
+    assert response.status_code == 200
+    assert opened == ["session"]
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from redis.crc import key_slot
+
+from backend.app.core import redis_client as redis_module
+from backend.app.core.config import settings
+from backend.app.core.redis_client import ProfiledRedis, ProfiledRedisCluster, hold_key
+
+
+def test_hold_keys_share_a_cluster_slot_per_restaurant():
+    restaurant_id = "6f1c2a0e-5d0b-4c43-9a7e-0f3b8e1d2c44"
+    start = datetime(2025, 11, 6, 0, 0, tzinfo=timezone.utc)
+    keys = [
+        hold_key(restaurant_id, start + timedelta(minutes=15 * i), start + timedelta(minutes=15 * i + 90))
+        for i in range(8)
+    ]
+
+    assert keys[0] == f"hold:{{{restaurant_id}}}:202511060000:202511060130"
+    assert len({key_slot(key.encode()) for key in keys}) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_mode_and_pool_settings_follow_config(monkeypatch):
+    monkeypatch.setattr(redis_module, "redis_client", None)
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:6379/0")
+    monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 7)
+
+    await redis_module.init_redis()
+    try:
+        assert isinstance(redis_module.redis_client, ProfiledRedis)
+        assert redis_module.redis_client.connection_pool.max_connections == 7
+    finally:
+        await redis_module.close_redis()
+
+    monkeypatch.setattr(settings, "REDIS_CLUSTER_MODE", True)
+    await redis_module.init_redis()
+    try:
+        assert isinstance(redis_module.redis_client, ProfiledRedisCluster)
+    finally:
+        await redis_module.close_redis()
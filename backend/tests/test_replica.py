@@ -0,0 +1,33 @@
+from time import monotonic
+
+from backend.app.db import session as db_session
+from backend.app.db.session import ReplicaLagMonitor
+
+
+def _monitor(lag: float | None, age: float = 0.0) -> ReplicaLagMonitor:
+    monitor = ReplicaLagMonitor(max_lag=2.0, interval=5.0)
+    monitor.lag_seconds = lag
+    monitor.checked_at = None if lag is None else monotonic() - age
+    return monitor
+
+
+def _use_replica_engine(monkeypatch, replica) -> None:
+    # Stand in for init_engine() so no database URL is needed.
+    monkeypatch.setattr(db_session, "init_engine", lambda: None)
+    monkeypatch.setattr(db_session, "replica_engine", replica, raising=False)
+
+
+def test_reads_fall_back_to_primary_when_replica_lags(monkeypatch):
+    _use_replica_engine(monkeypatch, object())
+
+    assert _monitor(0.4).use_replica()
+    assert not _monitor(7.5).use_replica()
+    # Unknown or stale lag samples are treated as unhealthy.
+    assert not _monitor(None).use_replica()
+    assert not _monitor(0.4, age=60).use_replica()
+
+
+def test_no_replica_configured_routes_to_primary(monkeypatch):
+    _use_replica_engine(monkeypatch, None)
+
+    assert not _monitor(0.0).use_replica()
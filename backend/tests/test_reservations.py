@@ -1,5 +1,7 @@
 import asyncio
+import json
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
@@ -10,9 +12,13 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy import text
 
 from backend.app.core import redis_client as redis_module
-from backend.app.core.redis_client import close_redis, init_redis
+from backend.app.core.config import settings
+from backend.app.core.redis_client import close_redis, hold_key as make_hold_key, init_redis
 from backend.app.db.session import SessionLocal
 from backend.app.main import app
+from backend.app.services import holds, seating
+from backend.app.services.seating import BUCKET
+from backend.app.services.slots import slot_key
 
 
 pytestmark = pytest.mark.asyncio(loop_scope="module")
@@ -88,6 +94,32 @@ def seed_data():
     conn.close()
 
 
+@asynccontextmanager
+async def _max_parties(restaurant_id, max_parties: int):
+    """Temporarily lower max_parties on the seeded capacity rule."""
+    async with SessionLocal() as session:
+        capacity = (
+            await session.execute(
+                text("SELECT id, max_parties FROM capacity_rule WHERE restaurant_id = :rid ORDER BY start_ts LIMIT 1"),
+                {"rid": restaurant_id},
+            )
+        ).mappings().one()
+        await session.execute(
+            text("UPDATE capacity_rule SET max_parties = :max_parties WHERE id = :id"),
+            {"max_parties": max_parties, "id": capacity["id"]},
+        )
+        await session.commit()
+    try:
+        yield
+    finally:
+        async with SessionLocal() as session:
+            await session.execute(
+                text("UPDATE capacity_rule SET max_parties = :max_parties WHERE id = :id"),
+                {"max_parties": capacity["max_parties"], "id": capacity["id"]},
+            )
+            await session.commit()
+
+
 async def test_commit_reservation_success():
     await init_redis()
     try:
@@ -111,38 +143,35 @@ async def test_commit_reservation_success():
 
         start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
         end = start + timedelta(minutes=payload["duration_minutes"])
-        hold_key = f"hold:{payload['restaurant_id']}:{start.strftime('%Y%m%d%H%M')}:{end.strftime('%Y%m%d%H%M')}:{payload['party_size']}"
+        hold_key = make_hold_key(payload["restaurant_id"], start, end)
 
         async with AsyncClient(transport=transport, base_url="http://test") as client:
             response = await client.post("/api/v1/reservations/commit", json=payload)
 
             assert response.status_code == 201, response.text
             reservation_id = response.json()["id"]
+            # The commit consumed its hold, so the slot is not held afterwards.
+            assert await redis_module.redis_client.zcard(hold_key) == 0
 
+            # A second party of the same size for the same start/duration lands on the next shard.
             second_response = await client.post("/api/v1/reservations/commit", json=payload)
-            assert second_response.status_code == 409
-            assert second_response.json()["detail"] == "Slot temporarily held by another request"
-
-            if redis_module.redis_client:
-                await redis_module.redis_client.delete(hold_key)
-
-            third_response = await client.post("/api/v1/reservations/commit", json=payload)
-            assert third_response.status_code == 409
-            assert third_response.json()["detail"] == "Slot already booked"
+            assert second_response.status_code == 201, second_response.text
+            second_reservation_id = second_response.json()["id"]
 
         async with SessionLocal() as session:
             rows = await session.execute(
-                text("SELECT status FROM reservation WHERE id = :id"),
-                {"id": reservation_id},
+                text("SELECT status, shard FROM reservation WHERE id IN (:first, :second) ORDER BY shard"),
+                {"first": reservation_id, "second": second_reservation_id},
             )
-            status = rows.scalar_one()
+            booked = rows.all()
             await session.execute(
-                text("DELETE FROM reservation WHERE id = :id"),
-                {"id": reservation_id},
+                text("DELETE FROM reservation WHERE id IN (:first, :second)"),
+                {"first": reservation_id, "second": second_reservation_id},
             )
             await session.commit()
 
-        assert status == "confirmed"
+        assert [row.status for row in booked] == ["confirmed", "confirmed"]
+        assert [row.shard for row in booked] == [0, 1]
 
         if redis_module.redis_client:
             await redis_module.redis_client.delete(hold_key)
@@ -150,6 +179,105 @@ async def test_commit_reservation_success():
         await close_redis()
 
 
+async def test_commit_retries_with_idempotency_key_replay():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = (
+                await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+            ).scalar_one()
+
+        transport = ASGITransport(app=app)
+        payload = {
+            "restaurant_id": str(restaurant_id),
+            "name": "Retrying Guest",
+            "party_size": 3,
+            "start_ts": "2025-11-07T18:30:00-05:00",
+            "duration_minutes": 60,
+            "source": "phone",
+        }
+        key = f"pytest-{uuid4()}"
+        headers = {"Idempotency-Key": key}
+
+        start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
+        end = start + timedelta(minutes=payload["duration_minutes"])
+        hold_key = make_hold_key(payload["restaurant_id"], start, end)
+
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            # A duplicate sent while the first is in flight waits for its result.
+            first, concurrent = await asyncio.gather(
+                client.post("/api/v1/reservations/commit", json=payload, headers=headers),
+                client.post("/api/v1/reservations/commit", json=payload, headers=headers),
+            )
+            retry = await client.post("/api/v1/reservations/commit", json=payload, headers=headers)
+            reused = await client.post(
+                "/api/v1/reservations/commit",
+                json={**payload, "party_size": 4},
+                headers=headers,
+            )
+
+        assert first.status_code == concurrent.status_code == retry.status_code == 201
+        assert first.json() == concurrent.json() == retry.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert reused.status_code == 422
+
+        async with SessionLocal() as session:
+            booked = (
+                await session.execute(
+                    text("SELECT count(*) FROM reservation WHERE name = 'Retrying Guest'")
+                )
+            ).scalar_one()
+            await session.execute(text("DELETE FROM reservation WHERE name = 'Retrying Guest'"))
+            await session.commit()
+        assert booked == 1
+
+        await redis_module.redis_client.delete(hold_key, f"idem:commit:{key}")
+    finally:
+        await close_redis()
+
+
+async def test_idempotency_key_is_released_after_a_transient_conflict():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = (
+                await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+            ).scalar_one()
+
+        payload = {
+            "restaurant_id": str(restaurant_id),
+            "name": "Held Out Guest",
+            "party_size": 2,
+            "start_ts": "2025-11-07T20:00:00-05:00",
+            "duration_minutes": 60,
+            "source": "web",
+        }
+        key = f"pytest-{uuid4()}"
+        headers = {"Idempotency-Key": key}
+        start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
+        hold_key = make_hold_key(payload["restaurant_id"], start, start + timedelta(minutes=60))
+
+        transport = ASGITransport(app=app)
+        async with _max_parties(restaurant_id, 1), AsyncClient(transport=transport, base_url="http://test") as client:
+            assert await holds.acquire(hold_key, "someone-else", limit=1)
+            held = await client.post("/api/v1/reservations/commit", json=payload, headers=headers)
+            assert held.status_code == 409
+            assert held.headers["Retry-After"] == "1"
+
+            # The other hold lapses; the same key runs the commit instead of replaying 409.
+            await holds.release(hold_key, "someone-else")
+            retry = await client.post("/api/v1/reservations/commit", json=payload, headers=headers)
+            assert retry.status_code == 201, retry.text
+            assert "Idempotent-Replayed" not in retry.headers
+
+        async with SessionLocal() as session:
+            await session.execute(text("DELETE FROM reservation WHERE id = :id"), {"id": retry.json()["id"]})
+            await session.commit()
+        await redis_module.redis_client.delete(hold_key, f"idem:commit:{key}")
+    finally:
+        await close_redis()
+
+
 async def test_health_endpoints():
     await init_redis()
     transport = ASGITransport(app=app)
@@ -184,13 +312,10 @@ async def test_availability_hold_and_conflict():
 
         start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
         end = start + timedelta(minutes=payload["duration_minutes"])
-        hold_key = (
-            f"hold:{payload['restaurant_id']}:"
-            f"{start.strftime('%Y%m%d%H%M')}:{end.strftime('%Y%m%d%H%M')}:{payload['party_size']}"
-        )
+        hold_key = make_hold_key(payload["restaurant_id"], start, end)
 
         transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as client:
+        async with _max_parties(restaurant_id, 2), AsyncClient(transport=transport, base_url="http://test") as client:
             first = await client.post("/api/v1/availability/check", json=payload)
             assert first.status_code == 200, first.text
             data = first.json()
@@ -199,10 +324,29 @@ async def test_availability_hold_and_conflict():
                 ttl = await redis_module.redis_client.ttl(hold_key)
                 assert ttl is not None and 0 < ttl <= 300
 
+            # An unrelated party of the same size gets its own hold while shards remain.
             second = await client.post("/api/v1/availability/check", json=payload)
-            assert second.status_code == 409
-            assert "alternates" in second.json()["detail"]
+            assert second.status_code == 200, second.text
+            assert second.json()["hold_id"] != data["hold_id"]
+
+            # Two live holds use up max_parties = 2.
+            third = await client.post("/api/v1/availability/check", json=payload)
+            assert third.status_code == 409
+            assert "alternates" in third.json()["detail"]
+
+            # Committing consumes the first hold; the booking and the second hold still fill the slot.
+            committed = await client.post(
+                "/api/v1/reservations/commit",
+                json={**payload, "name": "Held Guest", "source": "phone", "hold_id": data["hold_id"]},
+            )
+            assert committed.status_code == 201, committed.text
+            assert await redis_module.redis_client.zrange(hold_key, 0, -1) == [second.json()["hold_id"]]
+            fourth = await client.post("/api/v1/availability/check", json=payload)
+            assert fourth.status_code == 409
 
+        async with SessionLocal() as session:
+            await session.execute(text("DELETE FROM reservation WHERE id = :id"), {"id": committed.json()["id"]})
+            await session.commit()
         if redis_module.redis_client:
             await redis_module.redis_client.delete(hold_key)
     finally:
@@ -221,28 +365,25 @@ async def test_parallel_commit_race():
             "restaurant_id": str(restaurant_id),
             "name": "Parallel Guest",
             "party_size": 2,
-            "start_ts": "2025-11-05T21:30:00-05:00",
+            "start_ts": "2025-11-05T17:30:00-05:00",
             "duration_minutes": 90,
             "source": "staff",
         }
 
         start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
         end = start + timedelta(minutes=payload["duration_minutes"])
-        hold_key = (
-            f"hold:{payload['restaurant_id']}:"
-            f"{start.strftime('%Y%m%d%H%M')}:{end.strftime('%Y%m%d%H%M')}:{payload['party_size']}"
-        )
+        hold_key = make_hold_key(payload["restaurant_id"], start, end)
 
         transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as client:
+        async with _max_parties(restaurant_id, 2), AsyncClient(transport=transport, base_url="http://test") as client:
 
             async def post_reservation():
                 return await client.post("/api/v1/reservations/commit", json=payload)
 
-            responses = await asyncio.gather(post_reservation(), post_reservation())
+            responses = await asyncio.gather(post_reservation(), post_reservation(), post_reservation())
 
         status_codes = sorted(response.status_code for response in responses)
-        assert status_codes == [201, 409]
+        assert status_codes == [201, 201, 409]
 
         async with SessionLocal() as session:
             await session.execute(
@@ -263,7 +404,7 @@ async def test_capacity_enforced():
         "restaurant_id": None,
         "name": "Capacity Guest",
         "party_size": 4,
-        "start_ts": "2025-11-05T22:30:00-05:00",
+        "start_ts": "2025-11-05T16:30:00-05:00",
         "duration_minutes": 60,
         "source": "staff",
     }
@@ -272,7 +413,7 @@ async def test_capacity_enforced():
         "restaurant_id": None,
         "name": "Capacity Guest 2",
         "party_size": 2,
-        "start_ts": "2025-11-05T22:45:00-05:00",
+        "start_ts": "2025-11-05T16:45:00-05:00",
         "duration_minutes": 60,
         "source": "staff",
     }
@@ -321,14 +462,8 @@ async def test_capacity_enforced():
         )
         await session.commit()
 
-    hold_key_first = (
-        f"hold:{payload_first['restaurant_id']}:"
-        f"{start_first.strftime('%Y%m%d%H%M')}:{end_first.strftime('%Y%m%d%H%M')}:{payload_first['party_size']}"
-    )
-    hold_key_second = (
-        f"hold:{payload_second['restaurant_id']}:"
-        f"{start_second.strftime('%Y%m%d%H%M')}:{end_second.strftime('%Y%m%d%H%M')}:{payload_second['party_size']}"
-    )
+    hold_key_first = make_hold_key(payload_first["restaurant_id"], start_first, end_first)
+    hold_key_second = make_hold_key(payload_second["restaurant_id"], start_second, end_second)
 
     if redis_module.redis_client:
         await redis_module.redis_client.delete(hold_key_first)
@@ -340,9 +475,6 @@ async def test_capacity_enforced():
             first = await client.post("/api/v1/reservations/commit", json=payload_first)
             assert first.status_code == 201
 
-            if redis_module.redis_client:
-                await redis_module.redis_client.delete(hold_key_first)
-
             second = await client.post("/api/v1/reservations/commit", json=payload_second)
             assert second.status_code == 409
             assert second.json()["detail"] == "Capacity exceeded"
@@ -369,3 +501,322 @@ async def test_capacity_enforced():
             await redis_module.redis_client.delete(hold_key_first)
             await redis_module.redis_client.delete(hold_key_second)
         await close_redis()
+
+
+async def test_closed_slots_rejected():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = (
+                await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+            ).scalar_one()
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            after_hours = await client.post(
+                "/api/v1/availability/check",
+                json={
+                    "restaurant_id": str(restaurant_id),
+                    "party_size": 2,
+                    "start_ts": "2025-11-06T03:00:00-05:00",
+                    "duration_minutes": 90,
+                },
+            )
+            assert after_hours.status_code == 409
+            assert after_hours.json()["detail"]["message"] == "Restaurant closed"
+
+            blackout = await client.post(
+                "/api/v1/reservations/commit",
+                json={
+                    "restaurant_id": str(restaurant_id),
+                    "name": "Blackout Guest",
+                    "party_size": 2,
+                    "start_ts": "2025-12-24T19:00:00-05:00",
+                    "duration_minutes": 90,
+                    "source": "staff",
+                },
+            )
+            assert blackout.status_code == 409
+            assert blackout.json()["detail"] == "Restaurant closed"
+
+        async with SessionLocal() as session:
+            is_open = (
+                await session.execute(
+                    text("SELECT restaurant_slot_open(:restaurant_id, :start_ts, :end_ts)"),
+                    {
+                        "restaurant_id": restaurant_id,
+                        "start_ts": datetime(2025, 11, 6, 8, 0, tzinfo=timezone.utc),
+                        "end_ts": datetime(2025, 11, 6, 9, 30, tzinfo=timezone.utc),
+                    },
+                )
+            ).scalar_one()
+        assert is_open is False
+    finally:
+        await close_redis()
+
+
+async def test_slot_key_matches_sql_encoding():
+    start = datetime(2025, 11, 5, 23, 7, 42, tzinfo=timezone.utc)
+    end = start + timedelta(minutes=105)
+    async with SessionLocal() as session:
+        sql_key = (
+            await session.execute(
+                text("SELECT reservation_slot_key(:start_ts, :end_ts)"),
+                {"start_ts": start, "end_ts": end},
+            )
+        ).scalar_one()
+
+    assert sql_key == slot_key(start, end)
+    assert sql_key & 0xFFFF == 105
+
+
+async def test_listing_pages_and_day_book_etag():
+    async with SessionLocal() as session:
+        restaurant_id = (
+            await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+        ).scalar_one()
+        inserted = (
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO reservation (restaurant_id, name, party_size, start_ts, end_ts, status, source)
+                    SELECT :restaurant_id, 'Listing Guest ' || n, 2,
+                           '2025-11-12 17:00:00-05'::timestamptz + n * interval '30 minutes',
+                           '2025-11-12 18:30:00-05'::timestamptz + n * interval '30 minutes',
+                           'confirmed', 'staff'
+                    FROM generate_series(0, 2) AS n
+                    RETURNING id
+                    """
+                ),
+                {"restaurant_id": restaurant_id},
+            )
+        ).scalars().all()
+        await session.commit()
+
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            params = {
+                "restaurant_id": str(restaurant_id),
+                "from": "2025-11-12T00:00:00-05:00",
+                "to": "2025-11-13T00:00:00-05:00",
+                "limit": 2,
+            }
+            first = await client.get("/api/v1/reservations", params=params)
+            assert first.status_code == 200, first.text
+            page = first.json()
+            assert len(page["items"]) == 2
+            assert page["next_cursor"]
+
+            second = await client.get("/api/v1/reservations", params={**params, "cursor": page["next_cursor"]})
+            rest = second.json()
+            assert [item["name"] for item in page["items"] + rest["items"]] == [
+                "Listing Guest 0",
+                "Listing Guest 1",
+                "Listing Guest 2",
+            ]
+            assert rest["next_cursor"] is None
+
+            export_params = {"restaurant_id": str(restaurant_id), "day": "2025-11-12"}
+            export = await client.get("/api/v1/reservations/export", params=export_params)
+            assert export.status_code == 200
+            lines = [json.loads(line) for line in export.text.splitlines()]
+            assert {line["name"] for line in lines} >= {"Listing Guest 0", "Listing Guest 2"}
+            etag = export.headers["etag"]
+
+            unchanged = await client.get(
+                "/api/v1/reservations/export", params=export_params, headers={"If-None-Match": etag}
+            )
+            assert unchanged.status_code == 304
+
+            async with SessionLocal() as session:
+                await session.execute(
+                    text("UPDATE reservation SET status = 'cancelled' WHERE id = :id"),
+                    {"id": inserted[0]},
+                )
+                await session.commit()
+
+            changed = await client.get(
+                "/api/v1/reservations/export",
+                params={**export_params, "format": "csv"},
+                headers={"If-None-Match": etag},
+            )
+            assert changed.status_code == 200
+            assert changed.headers["etag"] != etag
+            assert changed.text.splitlines()[0].startswith("id,restaurant_id,name")
+    finally:
+        async with SessionLocal() as session:
+            await session.execute(text("DELETE FROM reservation WHERE id = ANY(:ids)"), {"ids": inserted})
+            await session.commit()
+
+
+async def test_availability_search_ranks_across_restaurants():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = (
+                await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+            ).scalar_one()
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/availability/search",
+                json={
+                    "restaurant_ids": [str(restaurant_id), str(uuid4())],
+                    "party_size": 2,
+                    "window_start": "2025-11-13T19:00:00-05:00",
+                    "window_end": "2025-11-13T20:00:00-05:00",
+                    "duration_minutes": 90,
+                    "limit": 3,
+                },
+            )
+
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["incomplete"] == []
+        starts = [datetime.fromisoformat(slot["start_ts"]) for slot in data["slots"]]
+        assert len(starts) == 3
+        assert starts == sorted(starts)
+        assert starts[0] == datetime(2025, 11, 14, 0, 0, tzinfo=timezone.utc)
+        assert {slot["restaurant_id"] for slot in data["slots"]} == {str(restaurant_id)}
+    finally:
+        await close_redis()
+
+
+async def test_commit_assigns_best_fit_table():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = str(
+                (await session.execute(text("SELECT id FROM restaurant LIMIT 1"))).scalar_one()
+            )
+            await session.execute(
+                text(
+                    """
+                    INSERT INTO restaurant_table (restaurant_id, label, seats_min, seats_max)
+                    VALUES (:rid, 'pytest-2', 1, 2), (:rid, 'pytest-4', 2, 4)
+                    """
+                ),
+                {"rid": restaurant_id},
+            )
+            await session.commit()
+
+        base = {
+            "restaurant_id": restaurant_id,
+            "name": "Seated Guest",
+            "start_ts": "2025-11-10T18:00:00-05:00",
+            "duration_minutes": 90,
+            "source": "web",
+        }
+        start = datetime.fromisoformat(base["start_ts"]).astimezone(timezone.utc)
+        end = start + timedelta(minutes=base["duration_minutes"])
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            seated = await client.post("/api/v1/reservations/commit", json={**base, "party_size": 3})
+            # The four-top is taken and the two-top is too small.
+            no_table = await client.post("/api/v1/reservations/commit", json={**base, "party_size": 4})
+
+        assert seated.status_code == 201, seated.text
+        assert seated.json()["tables"] == ["pytest-4"]
+        assert no_table.status_code == 409
+        assert no_table.json()["detail"] == "No table available"
+
+        async with SessionLocal() as session:
+            await session.execute(text("DELETE FROM reservation WHERE name = 'Seated Guest'"))
+            await session.execute(
+                text("DELETE FROM restaurant_table WHERE label LIKE 'pytest-%'")
+            )
+            await session.commit()
+        await redis_module.redis_client.delete(make_hold_key(restaurant_id, start, end))
+    finally:
+        seating._floor_cache.clear()
+        await close_redis()
+
+
+async def test_availability_check_rate_limited_per_caller(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PHONE_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PHONE_PER_MINUTE", 1)
+    await init_redis()
+    restaurant_id = str(uuid4())
+    try:
+        payload = {
+            "restaurant_id": restaurant_id,
+            "party_size": 2,
+            "start_ts": "2025-11-11T19:00:00-05:00",
+            "duration_minutes": 90,
+            "caller_phone": "+15550002",
+        }
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [
+                (await client.post("/api/v1/availability/check", json=payload)).status_code
+                for _ in range(2)
+            ]
+            throttled = await client.post("/api/v1/availability/check", json=payload)
+            other_caller = await client.post(
+                "/api/v1/availability/check", json={**payload, "caller_phone": "+15550003"}
+            )
+
+        # The restaurant has no capacity rule, so admitted checks end in 400.
+        assert statuses == [400, 400]
+        assert throttled.status_code == 429
+        assert int(throttled.headers["Retry-After"]) >= 1
+        assert throttled.json()["detail"]["limit"] == "phone"
+        assert other_caller.status_code == 400
+    finally:
+        keys = [key async for key in redis_module.redis_client.scan_iter(f"ratelimit:{{{restaurant_id}}}:*")]
+        if keys:
+            await redis_module.redis_client.delete(*keys)
+        await close_redis()
+
+
+async def test_availability_grid_tracks_commits_through_booking_version():
+    await init_redis()
+    try:
+        async with SessionLocal() as session:
+            restaurant_id = (
+                await session.execute(text("SELECT id FROM restaurant LIMIT 1"))
+            ).scalar_one()
+
+        payload = {
+            "restaurant_id": str(restaurant_id),
+            "name": "Grid Guest",
+            "party_size": 6,
+            "start_ts": "2025-11-19T18:00:00-05:00",
+            "duration_minutes": 90,
+            "source": "staff",
+        }
+        params = {"restaurant_id": str(restaurant_id), "day": "2025-11-19", "party_size": 2}
+        start = datetime.fromisoformat(payload["start_ts"]).astimezone(timezone.utc)
+        end = start + timedelta(minutes=payload["duration_minutes"])
+
+        def slot(grid: dict, ts: datetime) -> dict:
+            return next(s for s in grid["slots"] if datetime.fromisoformat(s["start_ts"]) == ts)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            before = await client.get("/api/v1/availability/grid", params=params)
+            assert before.status_code == 200, before.text
+            before = before.json()
+            # Closed before 16:00 local; the last start must finish by 22:00.
+            assert not slot(before, start - timedelta(hours=3))["bookable"]
+            assert slot(before, start)["bookable"]
+            assert not slot(before, start + timedelta(hours=2, minutes=45))["bookable"]
+
+            committed = await client.post("/api/v1/reservations/commit", json=payload)
+            assert committed.status_code == 201, committed.text
+
+            after = (await client.get("/api/v1/availability/grid", params=params)).json()
+            assert after["booking_version"] > before["booking_version"]
+            for ts in (start - timedelta(minutes=75), start, end - BUCKET):
+                assert slot(after, ts)["remaining_covers"] == slot(before, ts)["remaining_covers"] - 6
+            assert slot(after, end)["remaining_covers"] == slot(before, end)["remaining_covers"]
+
+        async with SessionLocal() as session:
+            await session.execute(text("DELETE FROM reservation WHERE id = :id"), {"id": committed.json()["id"]})
+            await session.commit()
+        await redis_module.redis_client.delete(make_hold_key(payload["restaurant_id"], start, end))
+    finally:
+        await close_redis()
@@ -0,0 +1,48 @@
+from datetime import datetime, time, timezone
+
+from backend.app.services.schedule import CompiledSchedule, HoursWindow
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def _schedule(hours: list[HoursWindow], blackouts=None) -> CompiledSchedule:
+    return CompiledSchedule("demo", "America/New_York", hours, blackouts or [])
+
+
+def test_hours_follow_local_time_across_dst():
+    schedule = _schedule([HoursWindow(dow, time(16), time(22)) for dow in range(7)])
+
+    # 16:00 EDT on 2025-11-01 is 20:00 UTC; a week later 16:00 EST is 21:00 UTC.
+    assert schedule.is_open(_utc(2025, 11, 1, 20, 0), _utc(2025, 11, 1, 21, 30))
+    assert not schedule.is_open(_utc(2025, 11, 8, 20, 0), _utc(2025, 11, 8, 21, 30))
+    assert schedule.is_open(_utc(2025, 11, 8, 21, 0), _utc(2025, 11, 8, 22, 30))
+    # Reservations must end by closing time.
+    assert not schedule.is_open(_utc(2025, 11, 9, 2, 0), _utc(2025, 11, 9, 3, 30))
+
+
+def test_windows_closing_after_midnight_and_blackouts():
+    friday_late = HoursWindow(5, time(18), time(2))
+    blackout = (_utc(2025, 11, 15, 0, 0), _utc(2025, 11, 15, 2, 0))
+    schedule = _schedule([friday_late], [blackout])
+
+    # Friday 2025-11-07 23:30 EST -> Saturday 01:00 EST.
+    assert schedule.is_open(_utc(2025, 11, 8, 4, 30), _utc(2025, 11, 8, 6, 0))
+    assert not schedule.is_open(_utc(2025, 11, 8, 6, 30), _utc(2025, 11, 8, 7, 30))
+    # Overlapping the following Friday's blackout is rejected.
+    assert not schedule.is_open(_utc(2025, 11, 15, 1, 30), _utc(2025, 11, 15, 2, 30))
+
+    intervals = schedule.open_intervals(_utc(2025, 11, 14, 0, 0), _utc(2025, 11, 16, 0, 0))
+    assert intervals == [
+        (_utc(2025, 11, 14, 23, 0), _utc(2025, 11, 15, 0, 0)),
+        (_utc(2025, 11, 15, 2, 0), _utc(2025, 11, 15, 7, 0)),
+    ]
+
+
+def test_restaurants_without_hours_only_respect_blackouts():
+    blackout = (_utc(2025, 12, 24, 5, 0), _utc(2025, 12, 26, 5, 0))
+    schedule = _schedule([], [blackout])
+
+    assert schedule.is_open(_utc(2025, 12, 23, 3, 0), _utc(2025, 12, 23, 4, 0))
+    assert not schedule.is_open(_utc(2025, 12, 25, 0, 0), _utc(2025, 12, 25, 1, 0))
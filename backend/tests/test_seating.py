@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from backend.app.services.seating import BUCKET, FloorPlan, SeatingPlan, Table
+
+ORIGIN = datetime(2025, 11, 6, 21, 0, tzinfo=timezone.utc)
+
+
+def _floor() -> FloorPlan:
+    return FloorPlan(
+        [
+            Table("t2a", "2A", 1, 2),
+            Table("t2b", "2B", 1, 2, join_group="window"),
+            Table("t2c", "2C", 1, 2, join_group="window"),
+            Table("t4a", "4A", 2, 4),
+            Table("t6a", "6A", 4, 6),
+        ]
+    )
+
+
+def test_best_fit_prefers_fewest_empty_seats_then_combines():
+    plan = SeatingPlan(_floor(), ORIGIN)
+    start, end = ORIGIN + timedelta(hours=1), ORIGIN + timedelta(hours=2, minutes=30)
+
+    assert plan.best_fit(3, start, end).labels == ("4A",)
+
+    plan.occupy("t4a", ORIGIN + timedelta(hours=2), ORIGIN + timedelta(hours=3))
+    # 4A is busy for part of the stay; joining the two window two-tops seats four
+    # exactly, ahead of the six-top.
+    assert plan.best_fit(4, start, end).labels == ("2B", "2C")
+
+    plan.occupy("t2b", start, end)
+    assert plan.best_fit(4, start, end).labels == ("6A",)
+    plan.occupy("t6a", start, end)
+    assert plan.best_fit(4, start, end) is None
+    # Combinations are never used for parties a single member could seat.
+    assert plan.best_fit(2, start, end).labels == ("2A",)
+
+
+def test_open_slots_matches_per_slot_best_fit():
+    rng = random.Random(7)
+    floor = FloorPlan(
+        [
+            Table(f"t{i}", f"{i:02d}", 1 if i % 3 else 3, (2, 4, 6)[i % 3], join_group=f"g{i % 6}")
+            for i in range(60)
+        ]
+    )
+    plan = SeatingPlan(floor, ORIGIN)
+    for table in floor.tables:
+        for _ in range(4):
+            begin = ORIGIN + rng.randrange(96) * BUCKET
+            plan.occupy(table.id, begin, begin + rng.choice((6, 8)) * BUCKET)
+
+    duration = timedelta(minutes=90)
+    first = ORIGIN + BUCKET
+    for party in (2, 5, 9, 14):
+        open_bits = plan.open_slots(party, first, duration, 96)
+        expected = [
+            plan.best_fit(party, first + k * BUCKET, first + k * BUCKET + duration) is not None
+            for k in range(96)
+        ]
+        assert [bool(open_bits >> k & 1) for k in range(96)] == expected
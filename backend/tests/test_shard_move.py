@@ -0,0 +1,125 @@
+"""Moves a restaurant between two Postgres instances with scripts/move_restaurant.py.
+
+Needs a second instance migrated to head (see README §5) and its URL in
+``SHARD_TEST_DATABASE_URL``; skipped otherwise.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import psycopg2
+import pytest
+from sqlalchemy.engine import make_url
+
+ROOT = Path(__file__).resolve().parents[2]
+SHARD_URL = os.getenv("SHARD_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not SHARD_URL, reason="set SHARD_TEST_DATABASE_URL to a second migrated Postgres"
+)
+
+
+def _connect(url_str: str):
+    url = make_url(url_str)
+    conn = psycopg2.connect(
+        host=url.host or "localhost",
+        port=url.port or 5432,
+        user=url.username,
+        password=url.password,
+        dbname=url.database,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def _move(restaurant_id: str, target: str, *extra: str) -> None:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "DATABASE_SHARDS": json.dumps({"east": SHARD_URL}),
+        "SHARD_MAP_CACHE_TTL_SECONDS": "0",
+    }
+    done = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "move_restaurant.py"), restaurant_id, target, *extra],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert done.returncode == 0, done.stderr
+
+
+def _counts(cur, restaurant_id: str) -> dict[str, int]:
+    counts = {}
+    for table, key in (
+        ("restaurant", "id"),
+        ("hours_rule", "restaurant_id"),
+        ("capacity_rule", "restaurant_id"),
+        ("restaurant_table", "restaurant_id"),
+        ("reservation", "restaurant_id"),
+        ("reservation_table", "restaurant_id"),
+    ):
+        cur.execute(f"SELECT count(*) FROM {table} WHERE {key} = %s", (restaurant_id,))
+        counts[table] = cur.fetchone()[0]
+    return counts
+
+
+def test_restaurant_moves_to_a_shard_and_back():
+    default = _connect(os.environ["ALEMBIC_DATABASE_URL"])
+    east = _connect(SHARD_URL)
+    home, away = default.cursor(), east.cursor()
+    restaurant_id = str(uuid4())
+    try:
+        home.execute(
+            """
+            INSERT INTO restaurant (id, name, phone, timezone) VALUES (%s, 'Shard Bistro', '+1-555-0142', 'America/New_York');
+            INSERT INTO hours_rule (restaurant_id, day_of_week, open_time, close_time) VALUES (%s, 3, '16:00', '22:00');
+            INSERT INTO capacity_rule (restaurant_id, start_ts, end_ts, max_covers, max_parties)
+              VALUES (%s, '2025-11-01 00:00-05', '2026-01-01 00:00-05', 40, 10);
+            INSERT INTO restaurant_table (restaurant_id, label, seats_min, seats_max) VALUES (%s, 'T1', 1, 4);
+            INSERT INTO reservation (restaurant_id, name, party_size, start_ts, end_ts, status, source)
+              VALUES (%s, 'Seated', 4, '2025-11-19 18:00-05', '2025-11-19 19:30-05', 'confirmed', 'staff'),
+                     (%s, 'Cancelled', 2, '2025-11-19 18:00-05', '2025-11-19 19:30-05', 'cancelled', 'web');
+            INSERT INTO reservation_table (reservation_id, table_id, restaurant_id, slot_range)
+              SELECT r.id, t.id, r.restaurant_id, r.slot_range
+              FROM reservation r JOIN restaurant_table t USING (restaurant_id)
+              WHERE r.restaurant_id = %s AND r.status = 'confirmed';
+            """,
+            (restaurant_id,) * 7,
+        )
+        expected = _counts(home, restaurant_id)
+        assert expected["reservation_table"] == 1
+
+        _move(restaurant_id, "east", "--passes", "2")
+
+        assert _counts(away, restaurant_id) == expected
+        home.execute("SELECT shard FROM restaurant_shard_map WHERE restaurant_id = %s", (restaurant_id,))
+        assert home.fetchone() == ("east",)
+        # Commits still routed to the old node bounce off the tombstone.
+        home.execute("SELECT restaurant_write_fence(%s)", (restaurant_id,))
+        assert home.fetchone() == ("east",)
+
+        away.execute(
+            "UPDATE reservation SET status = 'cancelled' WHERE restaurant_id = %s AND name = 'Seated'",
+            (restaurant_id,),
+        )
+        _move(restaurant_id, "default", "--drop-source")
+
+        moved_back = _counts(home, restaurant_id)
+        assert moved_back == {**expected, "reservation_table": 0}
+        assert sum(_counts(away, restaurant_id).values()) == 0
+        home.execute("SELECT restaurant_write_fence(%s)", (restaurant_id,))
+        assert home.fetchone() == (None,)
+        away.execute("SELECT moved_to FROM restaurant_moved WHERE restaurant_id = %s", (restaurant_id,))
+        assert away.fetchone() == ("default",)
+    finally:
+        for cur in (home, away):
+            cur.execute("DELETE FROM restaurant WHERE id = %s", (restaurant_id,))
+            cur.execute("DELETE FROM restaurant_moved WHERE restaurant_id = %s", (restaurant_id,))
+            cur.execute("DELETE FROM restaurant_shard_map WHERE restaurant_id = %s", (restaurant_id,))
+        default.close()
+        east.close()
@@ -0,0 +1,34 @@
+"""schedule enforcement
+
+Revision ID: 3b7d0c5e9a14
+Revises: 8ee43ee7e21f
+Create Date: 2025-11-12 09:14:02.418377
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d0c5e9a14'
+down_revision: Union[str, None] = '8ee43ee7e21f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    for filename in ("060_schedule.sql", "030_commit_reservation.sql"):
+        op.execute((sql_dir / filename).read_text())
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS restaurant_schedule_changed ON restaurant;")
+    op.execute("DROP TRIGGER IF EXISTS blackout_schedule_changed ON blackout;")
+    op.execute("DROP TRIGGER IF EXISTS hours_rule_schedule_changed ON hours_rule;")
+    op.execute("DROP FUNCTION IF EXISTS notify_schedule_changed();")
+    # restaurant_slot_open() stays: commit_reservation() is replayed from sql/ and calls it.
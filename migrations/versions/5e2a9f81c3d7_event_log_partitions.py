@@ -0,0 +1,44 @@
+"""event_log partitions
+
+Revision ID: 5e2a9f81c3d7
+Revises: 3b7d0c5e9a14
+Create Date: 2025-11-14 16:02:45.913204
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9f81c3d7'
+down_revision: Union[str, None] = '3b7d0c5e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    op.execute((sql_dir / "070_event_log_partitions.sql").read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE event_log_unpartitioned (
+          ts timestamptz NOT NULL DEFAULT now(),
+          restaurant_id uuid,
+          type text NOT NULL,
+          payload_json jsonb
+        );
+        INSERT INTO event_log_unpartitioned SELECT ts, restaurant_id, type, payload_json FROM event_log;
+        DROP TABLE event_log;
+        ALTER TABLE event_log_unpartitioned RENAME TO event_log;
+        """
+    )
+    op.execute("DROP FUNCTION IF EXISTS event_log_maintain(integer, interval, boolean);")
+    op.execute("DROP FUNCTION IF EXISTS event_log_apply_retention(interval, boolean);")
+    op.execute("DROP FUNCTION IF EXISTS event_log_ensure_partitions(date, date);")
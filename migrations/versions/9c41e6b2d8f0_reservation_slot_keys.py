@@ -0,0 +1,53 @@
+"""reservation slot keys
+
+Revision ID: 9c41e6b2d8f0
+Revises: 5e2a9f81c3d7
+Create Date: 2025-11-18 11:27:53.604118
+
+Adds the stored ``slot_range`` column with a composite GiST index on
+``(restaurant_id, slot_range)`` and replaces the text ``slot_id`` with the integer
+``slot_key``. Use ``sql/055_slot_index_explain.sql`` to confirm the plans on a
+1M-row dataset before promoting.
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41e6b2d8f0'
+down_revision: Union[str, None] = '5e2a9f81c3d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    for filename in ("080_reservation_slot_keys.sql", "030_commit_reservation.sql"):
+        op.execute((sql_dir / filename).read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE reservation ADD COLUMN slot_id text;
+        UPDATE reservation
+           SET slot_id = to_char(date_trunc('minute', start_ts), 'YYYYMMDDHH24MI') || '-' ||
+                         to_char(date_trunc('minute', end_ts), 'YYYYMMDDHH24MI');
+        ALTER TABLE reservation ALTER COLUMN slot_id SET NOT NULL;
+        ALTER TABLE reservation
+          ADD CONSTRAINT reservation_slot_unique UNIQUE (restaurant_id, slot_id, shard);
+        ALTER TABLE reservation DROP CONSTRAINT IF EXISTS reservation_slot_key_unique;
+        CREATE INDEX IF NOT EXISTS reservation_slot_gist_idx
+          ON reservation USING gist (tstzrange(start_ts, end_ts, '[)'));
+        DROP INDEX IF EXISTS reservation_restaurant_slot_range_idx;
+        DROP INDEX IF EXISTS capacity_rule_restaurant_range_idx;
+        ALTER TABLE reservation DROP COLUMN IF EXISTS slot_key;
+        ALTER TABLE reservation DROP COLUMN IF EXISTS slot_range;
+        DROP FUNCTION IF EXISTS reservation_slot_key(timestamptz, timestamptz);
+        """
+    )
@@ -0,0 +1,36 @@
+"""restaurant shards
+
+Revision ID: a8d5e1c0f6b4
+Revises: f4a1c9d7e3b2
+Create Date: 2025-12-02 10:41:27.903116
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d5e1c0f6b4'
+down_revision: Union[str, None] = 'f4a1c9d7e3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    op.execute((sql_dir / "110_restaurant_shards.sql").read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DROP FUNCTION IF EXISTS restaurant_move_lock(uuid);
+        DROP FUNCTION IF EXISTS restaurant_write_fence(uuid);
+        DROP TABLE IF EXISTS restaurant_moved;
+        DROP TABLE IF EXISTS restaurant_shard_map;
+        """
+    )
@@ -0,0 +1,63 @@
+"""event_log default partition retention
+
+Revision ID: b3e7f2a9c5d1
+Revises: a8d5e1c0f6b4
+Create Date: 2025-12-04 09:12:48.331907
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7f2a9c5d1'
+down_revision: Union[str, None] = 'a8d5e1c0f6b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    # Only refreshes the functions; the table was converted by 5e2a9f81c3d7.
+    op.execute((sql_dir / "070_event_log_partitions.sql").read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION event_log_apply_retention(
+          p_keep interval,
+          p_drop boolean DEFAULT true
+        ) RETURNS int
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+          v_child RECORD;
+          v_cutoff date := ((now() - p_keep) AT TIME ZONE 'UTC')::date;
+          v_removed int := 0;
+        BEGIN
+          FOR v_child IN
+            SELECT c.relname
+              FROM pg_inherits i
+              JOIN pg_class c ON c.oid = i.inhrelid
+             WHERE i.inhparent = 'event_log'::regclass
+               AND c.relname ~ '^event_log_p[0-9]{8}$'
+               AND to_date(substr(c.relname, 12), 'YYYYMMDD') < v_cutoff
+             ORDER BY c.relname
+          LOOP
+            EXECUTE format('ALTER TABLE event_log DETACH PARTITION %I', v_child.relname);
+            IF p_drop THEN
+              EXECUTE format('DROP TABLE %I', v_child.relname);
+            END IF;
+            v_removed := v_removed + 1;
+          END LOOP;
+
+          RETURN v_removed;
+        END;
+        $$;
+        """
+    )
@@ -0,0 +1,36 @@
+"""reservation keyset indexes
+
+Revision ID: c6f0d2a8e4b7
+Revises: b3e7f2a9c5d1
+Create Date: 2025-12-05 14:27:03.518460
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f0d2a8e4b7'
+down_revision: Union[str, None] = 'b3e7f2a9c5d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    op.execute((sql_dir / "120_reservation_keyset_indexes.sql").read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS reservation_restaurant_status_start_idx
+          ON reservation (restaurant_id, status, start_ts);
+        DROP INDEX IF EXISTS reservation_restaurant_start_id_idx;
+        DROP INDEX IF EXISTS reservation_restaurant_status_start_id_idx;
+        """
+    )
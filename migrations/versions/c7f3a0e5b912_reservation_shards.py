@@ -0,0 +1,42 @@
+"""reservation shards
+
+Revision ID: c7f3a0e5b912
+Revises: 9c41e6b2d8f0
+Create Date: 2025-11-20 14:48:19.337560
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f3a0e5b912'
+down_revision: Union[str, None] = '9c41e6b2d8f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    for filename in ("090_reservation_shards.sql", "030_commit_reservation.sql"):
+        op.execute((sql_dir / filename).read_text())
+
+
+def downgrade() -> None:
+    # Shards map back onto letters ('A', 'B', ...) so existing multi-party slots stay unique.
+    op.execute(
+        """
+        DROP INDEX IF EXISTS reservation_slot_shard_active_idx;
+        ALTER TABLE reservation DROP CONSTRAINT IF EXISTS reservation_shard_nonnegative;
+        ALTER TABLE reservation ALTER COLUMN shard DROP DEFAULT;
+        ALTER TABLE reservation
+          ALTER COLUMN shard TYPE text USING chr(ascii('A') + shard);
+        ALTER TABLE reservation ALTER COLUMN shard SET DEFAULT 'A';
+        ALTER TABLE reservation
+          ADD CONSTRAINT reservation_slot_key_unique UNIQUE (restaurant_id, slot_key, shard);
+        """
+    )
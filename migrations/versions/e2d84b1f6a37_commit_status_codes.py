@@ -0,0 +1,180 @@
+"""commit status codes
+
+Revision ID: e2d84b1f6a37
+Revises: c7f3a0e5b912
+Create Date: 2025-11-24 10:05:31.772046
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d84b1f6a37'
+down_revision: Union[str, None] = 'c7f3a0e5b912'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    op.execute((sql_dir / "030_commit_reservation.sql").read_text())
+
+
+def downgrade() -> None:
+    # Restore the c7f3a0e5b912 commit_reservation() (RAISE on rejection) before
+    # dropping try_commit_reservation(), which the status-code wrapper delegates to.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION commit_reservation(
+          p_restaurant uuid,
+          p_name text,
+          p_party int,
+          p_start timestamptz,
+          p_end   timestamptz,
+          p_source text,
+          p_phone text,
+          p_email text,
+          p_notes text
+        ) RETURNS uuid
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+          v_id uuid := gen_random_uuid();
+          v_slot_key bigint := reservation_slot_key(p_start, p_end);
+          v_bucket_start timestamptz;
+          v_iter timestamptz;
+          v_restaurant_hash int;
+          v_capacity RECORD;
+          v_proposed tstzrange := tstzrange(p_start, p_end, '[)');
+          v_confirmed_covers int;
+          v_confirmed_parties int;
+          v_shard smallint;
+        BEGIN
+          IF p_start >= p_end THEN
+            RAISE EXCEPTION 'start_ts must be before end_ts';
+          END IF;
+
+          IF p_party <= 0 THEN
+            RAISE EXCEPTION 'party size must be positive';
+          END IF;
+
+          IF NOT restaurant_slot_open(p_restaurant, p_start, p_end) THEN
+            RAISE EXCEPTION 'Restaurant closed for requested slot';
+          END IF;
+
+          v_restaurant_hash :=
+            ((hashtextextended(p_restaurant::text, 0) >> 32)::int);
+
+          v_bucket_start :=
+            date_trunc('minute', p_start)
+            - make_interval(mins => mod(extract(minute FROM p_start)::int, 15));
+
+          v_iter := v_bucket_start;
+          WHILE v_iter < p_end LOOP
+            PERFORM pg_advisory_xact_lock(
+              v_restaurant_hash,
+              floor(extract(epoch FROM v_iter) / 900)::int
+            );
+            v_iter := v_iter + interval '15 minutes';
+          END LOOP;
+
+          SELECT max_covers, max_parties
+            INTO v_capacity
+            FROM capacity_rule
+           WHERE restaurant_id = p_restaurant
+             AND tstzrange(start_ts, end_ts, '[)') && v_proposed
+           ORDER BY start_ts DESC
+           LIMIT 1;
+
+          IF v_capacity IS NULL THEN
+            RAISE EXCEPTION 'No capacity rule covers requested slot';
+          END IF;
+
+          -- Lowest shard not held by an active booking of this exact slot; the advisory
+          -- locks above serialise allocation so two commits cannot pick the same shard.
+          SELECT s
+            INTO v_shard
+            FROM generate_series(0, v_capacity.max_parties - 1) AS s
+           WHERE NOT EXISTS (
+             SELECT 1
+             FROM reservation r
+             WHERE r.restaurant_id = p_restaurant
+               AND r.slot_key = v_slot_key
+               AND r.shard = s
+               AND r.status <> 'cancelled'
+           )
+           ORDER BY s
+           LIMIT 1;
+
+          IF v_shard IS NULL THEN
+            RAISE EXCEPTION 'Slot already booked';
+          END IF;
+
+          SELECT COALESCE(SUM(party_size), 0), COUNT(*)
+            INTO v_confirmed_covers, v_confirmed_parties
+            FROM reservation
+           WHERE restaurant_id = p_restaurant
+             AND status = 'confirmed'
+             AND slot_range && v_proposed;
+
+          IF v_confirmed_covers + p_party > v_capacity.max_covers THEN
+            RAISE EXCEPTION 'Capacity exceeded: covers % + % > %',
+              v_confirmed_covers, p_party, v_capacity.max_covers;
+          END IF;
+
+          IF v_confirmed_parties + 1 > v_capacity.max_parties THEN
+            RAISE EXCEPTION 'Capacity exceeded: parties % + 1 > %',
+              v_confirmed_parties, v_capacity.max_parties;
+          END IF;
+
+          INSERT INTO reservation(
+            id,
+            restaurant_id,
+            name,
+            party_size,
+            start_ts,
+            end_ts,
+            status,
+            source,
+            contact_phone,
+            contact_email,
+            notes,
+            shard
+          )
+          VALUES (
+            v_id,
+            p_restaurant,
+            p_name,
+            p_party,
+            p_start,
+            p_end,
+            'confirmed',
+            p_source,
+            p_phone,
+            p_email,
+            p_notes,
+            v_shard
+          );
+
+          RETURN v_id;
+        EXCEPTION
+          WHEN unique_violation THEN
+            RAISE EXCEPTION 'Slot already booked';
+        END;
+        $$;
+        """
+    )
+    op.execute(
+        """
+        DROP FUNCTION IF EXISTS try_commit_reservation(
+          uuid, text, integer, timestamptz, timestamptz,
+          text, text, text, text
+        );
+        DROP TYPE IF EXISTS commit_reservation_result;
+        """
+    )
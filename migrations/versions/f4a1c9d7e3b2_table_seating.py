@@ -0,0 +1,37 @@
+"""table seating
+
+Revision ID: f4a1c9d7e3b2
+Revises: e2d84b1f6a37
+Create Date: 2025-11-25 09:12:44.518203
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a1c9d7e3b2'
+down_revision: Union[str, None] = 'e2d84b1f6a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    project_root = Path(__file__).resolve().parents[2]
+    sql_dir = project_root / "sql"
+
+    op.execute((sql_dir / "100_table_seating.sql").read_text())
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DROP TRIGGER IF EXISTS reservation_cancel_release_tables ON reservation;
+        DROP FUNCTION IF EXISTS reservation_release_tables();
+        DROP FUNCTION IF EXISTS lock_reservation_slot(uuid, timestamptz, timestamptz);
+        DROP TABLE IF EXISTS reservation_table;
+        DROP TABLE IF EXISTS restaurant_table;
+        """
+    )
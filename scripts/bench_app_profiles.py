@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Measure cold-start import time and RSS of the app for each deployment profile.
+
+Each profile is built in a fresh interpreter (``APP_PROFILE=<profile>``, then
+``import backend.app.main``), so module caches from one run never help another.
+No database or Redis connection is opened; engines are created in the lifespan.
+
+    python scripts/bench_app_profiles.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, sys, time
+began = time.perf_counter()
+import backend.app.main as main
+elapsed = time.perf_counter() - began
+with open("/proc/self/status") as status:
+    rss_kb = next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "modules": len(sys.modules),
+    "routes": len(main.app.routes),
+}))
+"""
+
+
+def _run(profile: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "APP_PROFILE": profile}
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for profile in ("api", "voice", "all"):
+        samples = [_run(profile) for _ in range(args.runs)]
+        seconds = statistics.median(sample["seconds"] for sample in samples)
+        rss = statistics.median(sample["rss_mb"] for sample in samples)
+        print(
+            f"{profile:>6}: {seconds * 1000:7.1f} ms import  {rss:6.1f} MB RSS  "
+            f"{samples[0]['modules']:5d} modules  {samples[0]['routes']:3d} routes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Benchmark commit paths under heavy conflict.
+
+Compares the pre-status-code commit path with ``try_commit_reservation()`` status
+codes. The baseline body (RAISE on every rejection plus an ``EXCEPTION WHEN
+unique_violation`` block, so each call opens a subtransaction) is installed for the
+run as ``commit_reservation_legacy()`` and classified by message substring the way
+commit_endpoint used to; today's ``commit_reservation()`` is only a wrapper around
+the status-code function and would not measure that cost. A throwaway restaurant
+with a tiny ``max_parties`` is created so nearly every attempt is rejected, then
+removed again along with the legacy function.
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_commit_conflicts.py \
+        --attempts 5000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import DBAPIError  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine  # noqa: E402
+
+from backend.app.core.config import settings  # noqa: E402
+
+BASE_START = datetime(2030, 6, 1, 18, 0, tzinfo=timezone.utc)
+PARAMS = "(:restaurant_id, 'Bench', 2, :start_ts, :end_ts, 'web', NULL, NULL, NULL)"
+
+# commit_reservation() as of revision c7f3a0e5b912, before status codes.
+LEGACY_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION commit_reservation_legacy(
+  p_restaurant uuid,
+  p_name text,
+  p_party int,
+  p_start timestamptz,
+  p_end   timestamptz,
+  p_source text,
+  p_phone text,
+  p_email text,
+  p_notes text
+) RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_id uuid := gen_random_uuid();
+  v_slot_key bigint := reservation_slot_key(p_start, p_end);
+  v_bucket_start timestamptz;
+  v_iter timestamptz;
+  v_restaurant_hash int;
+  v_capacity RECORD;
+  v_proposed tstzrange := tstzrange(p_start, p_end, '[)');
+  v_confirmed_covers int;
+  v_confirmed_parties int;
+  v_shard smallint;
+BEGIN
+  IF p_start >= p_end THEN
+    RAISE EXCEPTION 'start_ts must be before end_ts';
+  END IF;
+
+  IF p_party <= 0 THEN
+    RAISE EXCEPTION 'party size must be positive';
+  END IF;
+
+  IF NOT restaurant_slot_open(p_restaurant, p_start, p_end) THEN
+    RAISE EXCEPTION 'Restaurant closed for requested slot';
+  END IF;
+
+  v_restaurant_hash :=
+    ((hashtextextended(p_restaurant::text, 0) >> 32)::int);
+
+  v_bucket_start :=
+    date_trunc('minute', p_start)
+    - make_interval(mins => mod(extract(minute FROM p_start)::int, 15));
+
+  v_iter := v_bucket_start;
+  WHILE v_iter < p_end LOOP
+    PERFORM pg_advisory_xact_lock(
+      v_restaurant_hash,
+      floor(extract(epoch FROM v_iter) / 900)::int
+    );
+    v_iter := v_iter + interval '15 minutes';
+  END LOOP;
+
+  SELECT max_covers, max_parties
+    INTO v_capacity
+    FROM capacity_rule
+   WHERE restaurant_id = p_restaurant
+     AND tstzrange(start_ts, end_ts, '[)') && v_proposed
+   ORDER BY start_ts DESC
+   LIMIT 1;
+
+  IF v_capacity IS NULL THEN
+    RAISE EXCEPTION 'No capacity rule covers requested slot';
+  END IF;
+
+  -- Lowest shard not held by an active booking of this exact slot; the advisory
+  -- locks above serialise allocation so two commits cannot pick the same shard.
+  SELECT s
+    INTO v_shard
+    FROM generate_series(0, v_capacity.max_parties - 1) AS s
+   WHERE NOT EXISTS (
+     SELECT 1
+     FROM reservation r
+     WHERE r.restaurant_id = p_restaurant
+       AND r.slot_key = v_slot_key
+       AND r.shard = s
+       AND r.status <> 'cancelled'
+   )
+   ORDER BY s
+   LIMIT 1;
+
+  IF v_shard IS NULL THEN
+    RAISE EXCEPTION 'Slot already booked';
+  END IF;
+
+  SELECT COALESCE(SUM(party_size), 0), COUNT(*)
+    INTO v_confirmed_covers, v_confirmed_parties
+    FROM reservation
+   WHERE restaurant_id = p_restaurant
+     AND status = 'confirmed'
+     AND slot_range && v_proposed;
+
+  IF v_confirmed_covers + p_party > v_capacity.max_covers THEN
+    RAISE EXCEPTION 'Capacity exceeded: covers % + % > %',
+      v_confirmed_covers, p_party, v_capacity.max_covers;
+  END IF;
+
+  IF v_confirmed_parties + 1 > v_capacity.max_parties THEN
+    RAISE EXCEPTION 'Capacity exceeded: parties % + 1 > %',
+      v_confirmed_parties, v_capacity.max_parties;
+  END IF;
+
+  INSERT INTO reservation(
+    id,
+    restaurant_id,
+    name,
+    party_size,
+    start_ts,
+    end_ts,
+    status,
+    source,
+    contact_phone,
+    contact_email,
+    notes,
+    shard
+  )
+  VALUES (
+    v_id,
+    p_restaurant,
+    p_name,
+    p_party,
+    p_start,
+    p_end,
+    'confirmed',
+    p_source,
+    p_phone,
+    p_email,
+    p_notes,
+    v_shard
+  );
+
+  RETURN v_id;
+EXCEPTION
+  WHEN unique_violation THEN
+    RAISE EXCEPTION 'Slot already booked';
+END;
+$$;
+"""
+DROP_LEGACY_SQL = """
+DROP FUNCTION IF EXISTS commit_reservation_legacy(
+  uuid, text, integer, timestamptz, timestamptz, text, text, text, text
+)
+"""
+
+
+def _classify(message: str) -> str:
+    # Mirrors the substring matching commit_endpoint used before status codes.
+    for needle, label in (
+        ("Slot already booked", "slot_booked"),
+        ("Capacity exceeded", "capacity"),
+        ("Restaurant closed", "closed"),
+        ("No capacity rule", "no_capacity_rule"),
+    ):
+        if needle in message:
+            return label
+    return "error"
+
+
+async def _attempt(engine: AsyncEngine, mode: str, restaurant_id: str, slot: int) -> str:
+    start = BASE_START + timedelta(minutes=15 * slot)
+    params = {"restaurant_id": restaurant_id, "start_ts": start, "end_ts": start + timedelta(minutes=90)}
+    async with engine.connect() as conn:
+        if mode == "status":
+            async with conn.begin():
+                row = (
+                    await conn.execute(text(f"SELECT r.status FROM try_commit_reservation{PARAMS} AS r"), params)
+                ).one()
+            return row.status
+        try:
+            async with conn.begin():
+                await conn.execute(text(f"SELECT commit_reservation_legacy{PARAMS}"), params)
+        except DBAPIError as exc:
+            return _classify(str(getattr(exc, "orig", exc)))
+        return "ok"
+
+
+async def _run_mode(engine: AsyncEngine, mode: str, restaurant_id: str, attempts: int, concurrency: int, slots: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outcomes: Counter[str] = Counter()
+
+    async def one(n: int) -> None:
+        async with semaphore:
+            began = time.perf_counter()
+            outcome = await _attempt(engine, mode, restaurant_id, n % slots)
+            latencies.append((time.perf_counter() - began) * 1000)
+            outcomes[outcome] += 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(attempts)))
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+    rejected = attempts - outcomes.get("ok", 0)
+    print(
+        f"{mode:>7}: {attempts / elapsed:8.1f} commits/s  "
+        f"p50 {statistics.median(latencies):6.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.2f} ms  "
+        f"conflict rate {rejected / attempts:.1%}  {dict(outcomes)}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slots", type=int, default=4, help="distinct start times competing for capacity")
+    parser.add_argument("--max-parties", type=int, default=2)
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    restaurant_id = str(uuid4())
+    async with engine.begin() as conn:
+        await conn.execute(text(LEGACY_FUNCTION_SQL))
+        await conn.execute(
+            text("INSERT INTO restaurant (id, name, phone, timezone) VALUES (:id, 'Bench', '+1-555-0000', 'UTC')"),
+            {"id": restaurant_id},
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO capacity_rule (restaurant_id, start_ts, end_ts, max_covers, max_parties)
+                VALUES (:id, :start_ts, :end_ts, 1000, :max_parties)
+                """
+            ),
+            {
+                "id": restaurant_id,
+                "start_ts": BASE_START - timedelta(days=1),
+                "end_ts": BASE_START + timedelta(days=1),
+                "max_parties": args.max_parties,
+            },
+        )
+
+    try:
+        for mode in ("legacy", "status"):
+            await _run_mode(engine, mode, restaurant_id, args.attempts, args.concurrency, args.slots)
+            async with engine.begin() as conn:
+                await conn.execute(text("DELETE FROM reservation WHERE restaurant_id = :id"), {"id": restaurant_id})
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM restaurant WHERE id = :id"), {"id": restaurant_id})
+            await conn.execute(text(DROP_LEGACY_SQL))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare request throughput and latency under asyncio/h11 and uvloop/httptools.
+
+Starts the API once per runtime via ``python -m backend.app.serve`` and drives it
+with concurrent keep-alive clients. ``/api/v1/healthz`` (no I/O) isolates loop and
+HTTP parser cost; pass ``--path`` to exercise other GET endpoints. Loop lag samples
+are read back from ``/metrics`` after each run.
+
+    python scripts/bench_loop_runtime.py --requests 20000 --concurrency 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, path: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(path)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def _lag_summary(metrics_text: str) -> str:
+    values = {}
+    for line in metrics_text.splitlines():
+        for suffix in ("_sum", "_count"):
+            if line.startswith(f"frontdesk_event_loop_lag_seconds{suffix} "):
+                values[suffix] = float(line.split()[-1])
+    if not values.get("_count"):
+        return "loop lag n/a"
+    return f"mean loop lag {values['_sum'] / values['_count'] * 1000:.2f} ms"
+
+
+async def _drive(base_url: str, path: str, requests: int, concurrency: int) -> str:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10) as client:
+        await _wait_ready(client, path)
+        latencies: list[float] = []
+        errors = 0
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                began = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - began) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        began = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - began
+        lag = _lag_summary((await client.get("/metrics")).text)
+
+    latencies.sort()
+    return (
+        f"{requests / elapsed:9.1f} req/s  p50 {statistics.median(latencies):6.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.2f} ms  errors {errors}  {lag}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--path", default="/api/v1/healthz")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    for runtime in ("asyncio", "uvloop"):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "backend.app.serve", "--runtime", runtime, "--port", str(args.port)],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            result = asyncio.run(_drive(f"http://127.0.0.1:{args.port}", args.path, args.requests, args.concurrency))
+            print(f"{runtime:>8}: {result}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
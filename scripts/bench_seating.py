@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Time table assignment for a synthetic room with the bitset seating engine.
+
+Builds a floor plan of ``--tables`` tables (2/4/6-tops in join groups of
+``--group-size``), books each table at random for ``--bookings-per-table`` stays
+over a day, then times, per party size:
+
+* ``open_slots``: every alternate start in the 24-hour horizon (96 candidates),
+  the work the availability check does before any capacity query;
+* ``best_fit``: one slot, the work a commit does under its advisory locks.
+
+No database is needed.
+
+    python scripts/bench_seating.py --tables 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from timeit import Timer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.services.seating import BUCKET, FloorPlan, SeatingPlan, Table  # noqa: E402
+
+
+def build_plan(tables: int, group_size: int, bookings: int, seed: int) -> SeatingPlan:
+    rng = random.Random(seed)
+    origin = datetime(2025, 11, 6, 16, 0, tzinfo=timezone.utc)
+    floor = FloorPlan(
+        [
+            Table(f"t{i}", f"{i:02d}", 1, (2, 4, 6)[i % 3], join_group=f"g{i // group_size}")
+            for i in range(tables)
+        ]
+    )
+    plan = SeatingPlan(floor, origin)
+    for table in floor.tables:
+        for _ in range(bookings):
+            begin = origin + rng.randrange(96) * BUCKET
+            plan.occupy(table.id, begin, begin + rng.choice((6, 8)) * BUCKET)
+    return plan
+
+
+def _per_call_us(func, repeat: int = 5) -> float:
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=60)
+    parser.add_argument("--group-size", type=int, default=6)
+    parser.add_argument("--bookings-per-table", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    plan = build_plan(args.tables, args.group_size, args.bookings_per_table, args.seed)
+    origin = datetime(2025, 11, 6, 16, 0, tzinfo=timezone.utc)
+    duration = timedelta(minutes=90)
+    first = origin + BUCKET
+    slot = origin + timedelta(hours=3)
+    print(f"{args.tables} tables, join groups of {args.group_size}, {args.bookings_per_table} bookings per table")
+
+    for party in (2, 4, 8, 12):
+        options = len(plan.floor.options_for(party))
+        open_bits = plan.open_slots(party, first, duration, 96)
+        all_alternates = _per_call_us(lambda: plan.open_slots(party, first, duration, 96))
+        one_slot = _per_call_us(lambda: plan.best_fit(party, slot, slot + duration))
+        print(
+            f"party {party:2d}: {options:4d} options  {bin(open_bits).count('1'):2d}/96 open  "
+            f"open_slots {all_alternates:7.1f} us  best_fit {one_slot:6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
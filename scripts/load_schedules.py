@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Bulk-load hours, blackouts and capacity windows from CSV or Parquet files.
+
+Every file is validated before anything touches the database; rows are then
+COPYed into staging tables and merged in a single transaction (see
+backend/app/services/bulk_load.py for the column layout and merge rules).
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/load_schedules.py \
+        --hours hours.csv --blackouts blackouts.csv --capacity capacity.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.db import session as db_session  # noqa: E402
+from backend.app.services.bulk_load import (  # noqa: E402
+    BulkLoadError,
+    LoadReport,
+    load_frames,
+    read_frame,
+    validate_frames,
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=Path, help="hours_rule rows: restaurant_id, day_of_week, open_time, close_time")
+    parser.add_argument("--blackouts", type=Path, help="blackout rows: restaurant_id, start_ts, end_ts[, reason]")
+    parser.add_argument(
+        "--capacity",
+        type=Path,
+        help="capacity_rule rows: restaurant_id, start_ts, end_ts, max_covers, max_parties[, party_min, party_max]",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="validate only; do not connect to the database")
+    parser.add_argument("--max-issues", type=int, default=50, help="validation issues to print before truncating")
+    args = parser.parse_args()
+    if not (args.hours or args.blackouts or args.capacity):
+        parser.error("pass at least one of --hours, --blackouts, --capacity")
+    return args
+
+
+async def main() -> int:
+    args = _parse_args()
+    report = LoadReport()
+
+    began = perf_counter()
+    try:
+        frames = {
+            table: read_frame(path)
+            for table, path in (
+                ("hours_rule", args.hours),
+                ("blackout", args.blackouts),
+                ("capacity_rule", args.capacity),
+            )
+            if path is not None
+        }
+    except BulkLoadError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    cleaned, issues = validate_frames(frames)
+    report.validate_seconds = perf_counter() - began
+    report.rows = {table: len(frame) for table, frame in cleaned.items()}
+
+    if issues:
+        for issue in issues[: args.max_issues]:
+            print(issue, file=sys.stderr)
+        if len(issues) > args.max_issues:
+            print(f"... {len(issues) - args.max_issues} more issues", file=sys.stderr)
+        print(f"Validation failed with {len(issues)} issue(s); nothing was loaded.", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        print(f"Validated {report.total_rows} rows in {report.validate_seconds:.3f}s; dry run, nothing loaded.")
+        return 0
+
+    try:
+        await load_frames(cleaned, report)
+    except BulkLoadError as exc:
+        print(f"{exc}; transaction rolled back.", file=sys.stderr)
+        return 1
+    finally:
+        await db_session.close_engine()
+
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
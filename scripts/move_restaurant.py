@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Move one restaurant to another database shard while it keeps taking bookings.
+
+Copies the restaurant's rows to the target, catches up on changes, fences commits
+for one short final pass, and repoints ``restaurant_shard_map`` (see
+backend/app/services/shard_move.py). Every shard must be migrated first
+(``ALEMBIC_DATABASE_URL=<shard url> alembic upgrade head``), and the API workers
+need the same ``DATABASE_SHARDS`` as this script.
+
+    DATABASE_URL=postgresql+asyncpg://...@127.0.0.1:5432/frontdesk \
+    DATABASE_SHARDS='{"east": "postgresql+asyncpg://...@127.0.0.1:5434/frontdesk"}' \
+        python scripts/move_restaurant.py <restaurant_id> east --drop-source
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.db import session as db_session  # noqa: E402
+from backend.app.services.shard_move import ShardMoveError, move_restaurant  # noqa: E402
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("restaurant_id")
+    parser.add_argument("target", help='shard name from DATABASE_SHARDS, or "default"')
+    parser.add_argument("--passes", type=int, default=2, help="copy passes before the fenced cutover pass")
+    parser.add_argument(
+        "--drop-source",
+        action="store_true",
+        help="after SHARD_MAP_CACHE_TTL_SECONDS, delete the restaurant from the source shard",
+    )
+    args = parser.parse_args()
+    if args.passes < 1:
+        parser.error("--passes must be at least 1")
+    return args
+
+
+async def main() -> int:
+    args = _parse_args()
+    try:
+        report = await move_restaurant(
+            args.restaurant_id, args.target, passes=args.passes, drop_source=args.drop_source
+        )
+    except (ShardMoveError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    finally:
+        await db_session.close_engine()
+
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
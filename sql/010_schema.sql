@@ -67,7 +67,16 @@ CREATE INDEX IF NOT EXISTS reservation_slot_gist_idx
 
 DO $$
 BEGIN
-  IF NOT EXISTS (
+  -- Only for the original slot_id schema: 080_reservation_slot_keys.sql drops
+  -- slot_id along with this constraint, and 090_reservation_shards.sql replaces
+  -- its successor with reservation_slot_shard_active_idx, so reruns on a migrated
+  -- database skip it.
+  IF EXISTS (
+    SELECT 1 FROM pg_attribute
+     WHERE attrelid = 'reservation'::regclass
+       AND attname = 'slot_id'
+       AND NOT attisdropped
+  ) AND NOT EXISTS (
     SELECT 1 FROM pg_constraint
      WHERE conrelid = 'reservation'::regclass
        AND conname = 'reservation_slot_unique'
@@ -1,6 +1,31 @@
 -- Function that enforces capacity rules with advisory locks at commit time.
+--
+-- try_commit_reservation() reports expected business outcomes through a status
+-- code instead of RAISE, and has no EXCEPTION block, so a commit costs no
+-- subtransaction. Exceptions are reserved for invalid input and real errors.
+--
+-- Status codes:
+--   ok               reservation inserted; reservation_id is set
+--   closed           outside opening hours or inside a blackout
+--   no_capacity_rule no capacity_rule covers the slot
+--   slot_booked      every shard for this exact start/end is taken
+--   capacity_covers  max_covers would be exceeded
+--   capacity_parties max_parties would be exceeded
+-- covers/parties carry the confirmed totals overlapping the slot when known.
 
-CREATE OR REPLACE FUNCTION commit_reservation(
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'commit_reservation_result') THEN
+    CREATE TYPE commit_reservation_result AS (
+      status text,
+      reservation_id uuid,
+      covers int,
+      parties int
+    );
+  END IF;
+END$$;
+
+CREATE OR REPLACE FUNCTION try_commit_reservation(
   p_restaurant uuid,
   p_name text,
   p_party int,
@@ -10,19 +35,19 @@ CREATE OR REPLACE FUNCTION commit_reservation(
   p_phone text,
   p_email text,
   p_notes text
-) RETURNS uuid
+) RETURNS commit_reservation_result
 LANGUAGE plpgsql
 AS $$
 DECLARE
+  v_result commit_reservation_result;
   v_id uuid := gen_random_uuid();
-  v_slot_id text;
+  v_slot_key bigint := reservation_slot_key(p_start, p_end);
   v_bucket_start timestamptz;
   v_iter timestamptz;
   v_restaurant_hash int;
   v_capacity RECORD;
   v_proposed tstzrange := tstzrange(p_start, p_end, '[)');
-  v_confirmed_covers int;
-  v_confirmed_parties int;
+  v_shard smallint;
 BEGIN
   IF p_start >= p_end THEN
     RAISE EXCEPTION 'start_ts must be before end_ts';
@@ -32,9 +57,10 @@ BEGIN
     RAISE EXCEPTION 'party size must be positive';
   END IF;
 
-  v_slot_id :=
-    to_char(date_trunc('minute', p_start), 'YYYYMMDDHH24MI') || '-' ||
-    to_char(date_trunc('minute', p_end), 'YYYYMMDDHH24MI');
+  IF NOT restaurant_slot_open(p_restaurant, p_start, p_end) THEN
+    v_result.status := 'closed';
+    RETURN v_result;
+  END IF;
 
   v_restaurant_hash :=
     ((hashtextextended(p_restaurant::text, 0) >> 32)::int);
@@ -52,16 +78,6 @@ BEGIN
     v_iter := v_iter + interval '15 minutes';
   END LOOP;
 
-  IF EXISTS (
-    SELECT 1
-    FROM reservation r
-    WHERE r.restaurant_id = p_restaurant
-      AND r.slot_id = v_slot_id
-      AND r.shard = 'A'
-  ) THEN
-    RAISE EXCEPTION 'Slot already booked';
-  END IF;
-
   SELECT max_covers, max_parties
     INTO v_capacity
     FROM capacity_rule
@@ -71,24 +87,46 @@ BEGIN
    LIMIT 1;
 
   IF v_capacity IS NULL THEN
-    RAISE EXCEPTION 'No capacity rule covers requested slot';
+    v_result.status := 'no_capacity_rule';
+    RETURN v_result;
   END IF;
 
   SELECT COALESCE(SUM(party_size), 0), COUNT(*)
-    INTO v_confirmed_covers, v_confirmed_parties
+    INTO v_result.covers, v_result.parties
     FROM reservation
    WHERE restaurant_id = p_restaurant
      AND status = 'confirmed'
-     AND tstzrange(start_ts, end_ts, '[)') && v_proposed;
+     AND slot_range && v_proposed;
 
-  IF v_confirmed_covers + p_party > v_capacity.max_covers THEN
-    RAISE EXCEPTION 'Capacity exceeded: covers % + % > %',
-      v_confirmed_covers, p_party, v_capacity.max_covers;
+  -- Lowest shard not held by an active booking of this exact slot; the advisory
+  -- locks above serialise allocation so two commits cannot pick the same shard.
+  SELECT s
+    INTO v_shard
+    FROM generate_series(0, v_capacity.max_parties - 1) AS s
+   WHERE NOT EXISTS (
+     SELECT 1
+     FROM reservation r
+     WHERE r.restaurant_id = p_restaurant
+       AND r.slot_key = v_slot_key
+       AND r.shard = s
+       AND r.status <> 'cancelled'
+   )
+   ORDER BY s
+   LIMIT 1;
+
+  IF v_shard IS NULL THEN
+    v_result.status := 'slot_booked';
+    RETURN v_result;
+  END IF;
+
+  IF v_result.covers + p_party > v_capacity.max_covers THEN
+    v_result.status := 'capacity_covers';
+    RETURN v_result;
   END IF;
 
-  IF v_confirmed_parties + 1 > v_capacity.max_parties THEN
-    RAISE EXCEPTION 'Capacity exceeded: parties % + 1 > %',
-      v_confirmed_parties, v_capacity.max_parties;
+  IF v_result.parties + 1 > v_capacity.max_parties THEN
+    v_result.status := 'capacity_parties';
+    RETURN v_result;
   END IF;
 
   INSERT INTO reservation(
@@ -103,7 +141,6 @@ BEGIN
     contact_phone,
     contact_email,
     notes,
-    slot_id,
     shard
   )
   VALUES (
@@ -118,13 +155,51 @@ BEGIN
     p_phone,
     p_email,
     p_notes,
-    v_slot_id,
-    'A'
+    v_shard
+  );
+
+  v_result.status := 'ok';
+  v_result.reservation_id := v_id;
+  v_result.covers := v_result.covers + p_party;
+  v_result.parties := v_result.parties + 1;
+  RETURN v_result;
+END;
+$$;
+
+-- Original raising interface, kept for psql users and older callers.
+CREATE OR REPLACE FUNCTION commit_reservation(
+  p_restaurant uuid,
+  p_name text,
+  p_party int,
+  p_start timestamptz,
+  p_end   timestamptz,
+  p_source text,
+  p_phone text,
+  p_email text,
+  p_notes text
+) RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_result commit_reservation_result;
+BEGIN
+  v_result := try_commit_reservation(
+    p_restaurant, p_name, p_party, p_start, p_end,
+    p_source, p_phone, p_email, p_notes
   );
 
-  RETURN v_id;
-EXCEPTION
-  WHEN unique_violation THEN
-    RAISE EXCEPTION 'Slot already booked';
+  CASE v_result.status
+    WHEN 'ok' THEN
+      RETURN v_result.reservation_id;
+    WHEN 'closed' THEN
+      RAISE EXCEPTION 'Restaurant closed for requested slot';
+    WHEN 'no_capacity_rule' THEN
+      RAISE EXCEPTION 'No capacity rule covers requested slot';
+    WHEN 'slot_booked' THEN
+      RAISE EXCEPTION 'Slot already booked';
+    ELSE
+      RAISE EXCEPTION 'Capacity exceeded: % (covers %, parties %)',
+        v_result.status, v_result.covers, v_result.parties;
+  END CASE;
 END;
 $$;
@@ -68,5 +68,22 @@ BEGIN
       AND start_ts = '2025-01-01 16:00:00-05'::timestamptz
       AND end_ts   = '2026-01-01 23:00:00-05'::timestamptz
   );
+
+  INSERT INTO blackout (
+    restaurant_id,
+    start_ts,
+    end_ts,
+    reason
+  )
+  SELECT
+    v_restaurant,
+    '2025-12-24 00:00:00-05'::timestamptz,
+    '2025-12-26 00:00:00-05'::timestamptz,
+    'Christmas closure'
+  WHERE NOT EXISTS (
+    SELECT 1 FROM blackout
+    WHERE restaurant_id = v_restaurant
+      AND start_ts = '2025-12-24 00:00:00-05'::timestamptz
+  );
 END;
 $$;
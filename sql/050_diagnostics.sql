@@ -5,7 +5,7 @@
 SELECT id, name
 FROM reservation
 WHERE restaurant_id = :restaurant_id
-  AND slot && tstzrange('2025-11-01 19:00:00-04'::timestamptz,
+  AND slot_range && tstzrange('2025-11-01 19:00:00-04'::timestamptz,
                         '2025-11-01 20:30:00-04'::timestamptz,
                         '[)');
 
@@ -21,7 +21,7 @@ SELECT candidate_start
 FROM wanted w
 LEFT JOIN reservation r
   ON r.restaurant_id = :restaurant_id
- AND r.slot && tstzrange(
+ AND r.slot_range && tstzrange(
        w.candidate_start,
        w.candidate_start + interval '90 minutes',
        '[)'
@@ -0,0 +1,80 @@
+-- Plan check for the restaurant-scoped slot index at 1M reservations across 1k restaurants.
+-- Everything runs inside a transaction that is rolled back, so it is safe on a dev database:
+--   psql "$DATABASE_URL" -f sql/055_slot_index_explain.sql
+--
+-- Captured on PostgreSQL 16.2, before 080_reservation_slot_keys.sql (same data,
+-- tstzrange(start_ts, end_ts) predicates and the text slot_id) and at head:
+--   * overlap summary  before: BitmapAnd of reservation_slot_gist_idx (1,247 rows from
+--                              every restaurant) and reservation_restaurant_status_start_idx
+--                              (1,000 rows), 21 buffers, 0.72 ms
+--                      after:  Index Scan on reservation_restaurant_slot_range_idx,
+--                              Index Cond on restaurant_id and slot_range, 4-8 buffers, 0.20 ms
+--   * free-shard count before: Index Only Scan on reservation_slot_unique (slot_id), 0.09 ms
+--                      after:  Index Only Scan on reservation_slot_shard_active_idx,
+--                              Heap Fetches: 0, 3 buffers, 0.10 ms
+--   * capacity lookup  before: Seq Scan on capacity_rule, 999 rows removed, 0.16 ms
+--                      after:  Index Scan on capacity_rule_restaurant_range_idx, 0.16 ms
+--                              (1k rules fit in 12 pages; the gap grows with the table)
+
+BEGIN;
+
+CREATE TEMP TABLE bench_restaurant ON COMMIT DROP AS
+SELECT gen_random_uuid() AS id, n
+FROM generate_series(1, 1000) AS n;
+
+INSERT INTO restaurant (id, name, phone, timezone)
+SELECT id, 'Bench ' || n, '+1-555-' || lpad(n::text, 4, '0'), 'America/New_York'
+FROM bench_restaurant;
+
+INSERT INTO capacity_rule (restaurant_id, start_ts, end_ts, max_covers, max_parties)
+SELECT id, '2025-01-01 00:00:00+00', '2026-01-01 00:00:00+00', 40, 10
+FROM bench_restaurant;
+
+-- 1,000 confirmed reservations per restaurant spread over 2025 on 15-minute starts.
+INSERT INTO reservation (restaurant_id, name, party_size, start_ts, end_ts, status, source)
+SELECT r.id,
+       'Bench guest',
+       2 + (s % 4),
+       ts,
+       ts + interval '90 minutes',
+       'confirmed',
+       'web'
+FROM bench_restaurant r
+CROSS JOIN LATERAL (
+  SELECT s,
+         timestamptz '2025-01-01 16:00:00+00'
+           + make_interval(days => (s * 7 + r.n) % 365)
+           + make_interval(mins => 15 * ((s + r.n) % 24)) AS ts
+  FROM generate_series(1, 1000) AS s
+) slots;
+
+ANALYZE restaurant;
+ANALYZE capacity_rule;
+ANALYZE reservation;
+
+\set bench_restaurant '(SELECT id FROM bench_restaurant WHERE n = 500)'
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT COALESCE(SUM(party_size), 0) AS covers, COUNT(*) AS parties
+FROM reservation
+WHERE restaurant_id = :bench_restaurant
+  AND status = 'confirmed'
+  AND slot_range && tstzrange('2025-06-01 19:00:00+00', '2025-06-01 20:30:00+00', '[)');
+
+-- Free-shard count, as in services/reservations.py::capacity_summary.
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT COUNT(*)
+FROM reservation
+WHERE restaurant_id = :bench_restaurant
+  AND slot_key = reservation_slot_key('2025-06-01 19:00:00+00', '2025-06-01 20:30:00+00')
+  AND status <> 'cancelled';
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT max_covers, max_parties
+FROM capacity_rule
+WHERE restaurant_id = :bench_restaurant
+  AND tstzrange(start_ts, end_ts, '[)') && tstzrange('2025-06-01 19:00:00+00', '2025-06-01 20:30:00+00', '[)')
+ORDER BY start_ts DESC
+LIMIT 1;
+
+ROLLBACK;
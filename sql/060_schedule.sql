@@ -0,0 +1,103 @@
+-- Opening-hours / blackout enforcement shared by commit_reservation() and the API schedule cache.
+
+-- A slot is bookable when it sits entirely inside the restaurant's opening hours
+-- (evaluated in the restaurant's local timezone, so DST shifts are honoured) and
+-- does not touch any blackout window. Restaurants without hours rules are treated
+-- as open around the clock so only blackouts apply.
+CREATE OR REPLACE FUNCTION restaurant_slot_open(
+  p_restaurant uuid,
+  p_start timestamptz,
+  p_end   timestamptz
+) RETURNS boolean
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_tz text;
+  v_local_day date;
+  v_open tstzmultirange;
+  v_has_hours boolean;
+BEGIN
+  SELECT timezone INTO v_tz FROM restaurant WHERE id = p_restaurant;
+  IF v_tz IS NULL THEN
+    RETURN false;
+  END IF;
+
+  IF EXISTS (
+    SELECT 1
+    FROM blackout b
+    WHERE b.restaurant_id = p_restaurant
+      AND tstzrange(b.start_ts, b.end_ts, '[)') && tstzrange(p_start, p_end, '[)')
+  ) THEN
+    RETURN false;
+  END IF;
+
+  SELECT EXISTS (SELECT 1 FROM hours_rule WHERE restaurant_id = p_restaurant)
+    INTO v_has_hours;
+  IF NOT v_has_hours THEN
+    RETURN true;
+  END IF;
+
+  -- Start one local day early so windows that close after midnight are included.
+  v_local_day := (p_start AT TIME ZONE v_tz)::date - 1;
+
+  SELECT range_agg(
+           tstzrange(
+             (d.day + h.open_time) AT TIME ZONE v_tz,
+             (d.day + h.close_time
+                + CASE WHEN h.close_time <= h.open_time THEN interval '1 day' ELSE interval '0' END
+             ) AT TIME ZONE v_tz,
+             '[)'
+           )
+         )
+    INTO v_open
+    FROM (
+      SELECT generate_series(
+               v_local_day,
+               (p_end AT TIME ZONE v_tz)::date,
+               interval '1 day'
+             )::date AS day
+    ) AS d
+    JOIN hours_rule h
+      ON h.restaurant_id = p_restaurant
+     AND h.day_of_week = extract(dow FROM d.day)::int;
+
+  RETURN v_open IS NOT NULL AND v_open @> tstzrange(p_start, p_end, '[)');
+END;
+$$;
+
+-- Notify API workers so their compiled schedules are dropped as soon as hours,
+-- blackouts or the restaurant timezone change.
+CREATE OR REPLACE FUNCTION notify_schedule_changed() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_restaurant uuid;
+BEGIN
+  IF TG_TABLE_NAME = 'restaurant' THEN
+    v_restaurant := COALESCE(NEW.id, OLD.id);
+  ELSIF TG_OP = 'DELETE' THEN
+    v_restaurant := OLD.restaurant_id;
+  ELSE
+    v_restaurant := NEW.restaurant_id;
+  END IF;
+
+  PERFORM pg_notify('schedule_changed', v_restaurant::text);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS hours_rule_schedule_changed ON hours_rule;
+CREATE TRIGGER hours_rule_schedule_changed
+  AFTER INSERT OR UPDATE OR DELETE ON hours_rule
+  FOR EACH ROW EXECUTE FUNCTION notify_schedule_changed();
+
+DROP TRIGGER IF EXISTS blackout_schedule_changed ON blackout;
+CREATE TRIGGER blackout_schedule_changed
+  AFTER INSERT OR UPDATE OR DELETE ON blackout
+  FOR EACH ROW EXECUTE FUNCTION notify_schedule_changed();
+
+DROP TRIGGER IF EXISTS restaurant_schedule_changed ON restaurant;
+CREATE TRIGGER restaurant_schedule_changed
+  AFTER UPDATE OF timezone OR DELETE ON restaurant
+  FOR EACH ROW EXECUTE FUNCTION notify_schedule_changed();
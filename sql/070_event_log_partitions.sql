@@ -0,0 +1,160 @@
+-- Daily range partitioning, indexing and retention for event_log.
+-- Safe to rerun: an existing plain event_log is converted once, later runs only refresh functions.
+
+-- Partition bounds are UTC calendar days; children are named event_log_pYYYYMMDD.
+CREATE OR REPLACE FUNCTION event_log_ensure_partitions(
+  p_from date,
+  p_to   date
+) RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_day date;
+  v_name text;
+  v_lower timestamptz;
+  v_upper timestamptz;
+  v_created int := 0;
+  v_has_default boolean;
+BEGIN
+  SELECT to_regclass('event_log_default') IS NOT NULL INTO v_has_default;
+
+  v_day := p_from;
+  WHILE v_day <= p_to LOOP
+    v_name := 'event_log_p' || to_char(v_day, 'YYYYMMDD');
+    IF to_regclass(v_name) IS NULL THEN
+      v_lower := v_day::timestamp AT TIME ZONE 'UTC';
+      v_upper := (v_day + 1)::timestamp AT TIME ZONE 'UTC';
+
+      EXECUTE format('CREATE TABLE %I (LIKE event_log INCLUDING DEFAULTS)', v_name);
+
+      -- Rows that landed in the default partition must move before the range can attach.
+      IF v_has_default THEN
+        EXECUTE format(
+          'WITH moved AS (
+             DELETE FROM event_log_default WHERE ts >= $1 AND ts < $2 RETURNING *
+           )
+           INSERT INTO %I SELECT * FROM moved',
+          v_name
+        ) USING v_lower, v_upper;
+      END IF;
+
+      EXECUTE format(
+        'ALTER TABLE event_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_lower, v_upper
+      );
+      v_created := v_created + 1;
+    END IF;
+    v_day := v_day + 1;
+  END LOOP;
+
+  RETURN v_created;
+END;
+$$;
+
+-- Detach (and by default drop) daily partitions that ended before now() - p_keep.
+-- Expired rows in the default partition are first moved into their own daily
+-- partitions so they age out the same way.
+CREATE OR REPLACE FUNCTION event_log_apply_retention(
+  p_keep interval,
+  p_drop boolean DEFAULT true
+) RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_child RECORD;
+  v_day date;
+  v_cutoff date := ((now() - p_keep) AT TIME ZONE 'UTC')::date;
+  v_removed int := 0;
+BEGIN
+  IF to_regclass('event_log_default') IS NOT NULL THEN
+    FOR v_day IN
+      SELECT DISTINCT (ts AT TIME ZONE 'UTC')::date
+        FROM event_log_default
+       WHERE ts < v_cutoff::timestamp AT TIME ZONE 'UTC'
+    LOOP
+      PERFORM event_log_ensure_partitions(v_day, v_day);
+    END LOOP;
+  END IF;
+
+  FOR v_child IN
+    SELECT c.relname
+      FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+     WHERE i.inhparent = 'event_log'::regclass
+       AND c.relname ~ '^event_log_p[0-9]{8}$'
+       AND to_date(substr(c.relname, 12), 'YYYYMMDD') < v_cutoff
+     ORDER BY c.relname
+  LOOP
+    EXECUTE format('ALTER TABLE event_log DETACH PARTITION %I', v_child.relname);
+    IF p_drop THEN
+      EXECUTE format('DROP TABLE %I', v_child.relname);
+    END IF;
+    v_removed := v_removed + 1;
+  END LOOP;
+
+  RETURN v_removed;
+END;
+$$;
+
+-- Entry point for the periodic job: one worker at a time, others skip.
+CREATE OR REPLACE FUNCTION event_log_maintain(
+  p_days_ahead int,
+  p_keep interval,
+  p_drop boolean DEFAULT true
+) RETURNS TABLE (created int, removed int)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NOT pg_try_advisory_xact_lock(hashtext('event_log_maintain')) THEN
+    created := 0;
+    removed := 0;
+    RETURN NEXT;
+    RETURN;
+  END IF;
+
+  created := event_log_ensure_partitions(
+    (now() AT TIME ZONE 'UTC')::date,
+    (now() AT TIME ZONE 'UTC')::date + p_days_ahead
+  );
+  removed := event_log_apply_retention(p_keep, p_drop);
+  RETURN NEXT;
+END;
+$$;
+
+DO $$
+DECLARE
+  v_first date;
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_class
+     WHERE oid = to_regclass('event_log')
+       AND relkind = 'r'
+  ) THEN
+    ALTER TABLE event_log RENAME TO event_log_unpartitioned;
+
+    CREATE TABLE event_log (
+      ts timestamptz NOT NULL DEFAULT now(),
+      restaurant_id uuid,
+      type text NOT NULL,
+      payload_json jsonb
+    ) PARTITION BY RANGE (ts);
+
+    CREATE TABLE event_log_default PARTITION OF event_log DEFAULT;
+
+    CREATE INDEX event_log_ts_brin_idx
+      ON event_log USING brin (ts);
+    CREATE INDEX event_log_restaurant_type_idx
+      ON event_log (restaurant_id, type);
+
+    SELECT (min(ts) AT TIME ZONE 'UTC')::date INTO v_first FROM event_log_unpartitioned;
+    PERFORM event_log_ensure_partitions(
+      LEAST(COALESCE(v_first, CURRENT_DATE), (now() AT TIME ZONE 'UTC')::date),
+      (now() AT TIME ZONE 'UTC')::date + 7
+    );
+
+    INSERT INTO event_log (ts, restaurant_id, type, payload_json)
+    SELECT ts, restaurant_id, type, payload_json FROM event_log_unpartitioned;
+
+    DROP TABLE event_log_unpartitioned;
+  END IF;
+END$$;
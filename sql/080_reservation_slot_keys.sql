@@ -0,0 +1,55 @@
+-- Restaurant-scoped range index and integer slot keys for reservation.
+-- Replaces the text slot_id ('YYYYMMDDHH24MI-YYYYMMDDHH24MI') and the
+-- restaurant-agnostic GiST index on tstzrange(start_ts, end_ts). Safe to rerun.
+
+-- Minute-resolution key: start minute since the epoch in the high bits, duration
+-- in minutes in the low 16 bits. Mirrors backend/app/services/slots.py::slot_key.
+-- Epoch extraction does not depend on the session TimeZone, so IMMUTABLE holds.
+CREATE OR REPLACE FUNCTION reservation_slot_key(
+  p_start timestamptz,
+  p_end   timestamptz
+) RETURNS bigint
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT (floor(extract(epoch FROM p_start) / 60)::bigint << 16)
+       | (floor(extract(epoch FROM p_end) / 60)::bigint
+          - floor(extract(epoch FROM p_start) / 60)::bigint);
+$$;
+
+ALTER TABLE reservation
+  ADD COLUMN IF NOT EXISTS slot_range tstzrange
+    GENERATED ALWAYS AS (tstzrange(start_ts, end_ts, '[)')) STORED;
+
+ALTER TABLE reservation
+  ADD COLUMN IF NOT EXISTS slot_key bigint
+    GENERATED ALWAYS AS (reservation_slot_key(start_ts, end_ts)) STORED;
+
+-- btree_gist supplies the uuid opclass so restaurant_id leads the GiST index and
+-- overlap probes never visit other restaurants' ranges.
+CREATE INDEX IF NOT EXISTS reservation_restaurant_slot_range_idx
+  ON reservation
+  USING gist (restaurant_id, slot_range);
+
+DROP INDEX IF EXISTS reservation_slot_gist_idx;
+
+CREATE INDEX IF NOT EXISTS capacity_rule_restaurant_range_idx
+  ON capacity_rule
+  USING gist (restaurant_id, tstzrange(start_ts, end_ts, '[)'));
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint
+     WHERE conrelid = 'reservation'::regclass
+       AND conname = 'reservation_slot_key_unique'
+  ) THEN
+    ALTER TABLE reservation
+      ADD CONSTRAINT reservation_slot_key_unique
+        UNIQUE (restaurant_id, slot_key, shard);
+  END IF;
+END$$;
+
+ALTER TABLE reservation DROP CONSTRAINT IF EXISTS reservation_slot_unique;
+ALTER TABLE reservation DROP COLUMN IF EXISTS slot_id;
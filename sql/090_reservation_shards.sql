@@ -0,0 +1,27 @@
+-- Multi-party slot sharding: each booking of an identical start/end takes its own
+-- shard number (0 .. max_parties - 1) so the uniqueness guard no longer limits a
+-- slot to one party. Cancelled rows release their shard. Safe to rerun.
+
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM information_schema.columns
+     WHERE table_name = 'reservation'
+       AND column_name = 'shard'
+       AND data_type = 'text'
+  ) THEN
+    ALTER TABLE reservation ALTER COLUMN shard DROP DEFAULT;
+    ALTER TABLE reservation
+      ALTER COLUMN shard TYPE smallint USING (ascii(shard) - ascii('A'));
+    ALTER TABLE reservation ALTER COLUMN shard SET DEFAULT 0;
+    ALTER TABLE reservation
+      ADD CONSTRAINT reservation_shard_nonnegative CHECK (shard >= 0);
+  END IF;
+END$$;
+
+-- Partial so cancellations free the shard; also serves the free-shard count probe.
+CREATE UNIQUE INDEX IF NOT EXISTS reservation_slot_shard_active_idx
+  ON reservation (restaurant_id, slot_key, shard)
+  WHERE status <> 'cancelled';
+
+ALTER TABLE reservation DROP CONSTRAINT IF EXISTS reservation_slot_key_unique;
@@ -0,0 +1,76 @@
+-- Table-level seating: physical tables per restaurant and the tables each
+-- reservation occupies. Table choice happens in the API (services/seating.py)
+-- while it holds the slot's advisory locks; the exclusion constraint below is the
+-- backstop against any writer that skips them. Safe to rerun.
+
+CREATE TABLE IF NOT EXISTS restaurant_table (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  restaurant_id uuid NOT NULL REFERENCES restaurant(id) ON DELETE CASCADE,
+  label      text NOT NULL,
+  seats_min  smallint NOT NULL DEFAULT 1 CHECK (seats_min > 0),
+  seats_max  smallint NOT NULL,
+  -- Tables sharing a join_group can be pushed together for larger parties.
+  join_group text,
+  active     boolean NOT NULL DEFAULT true,
+  UNIQUE (restaurant_id, label),
+  CHECK (seats_min <= seats_max)
+);
+
+CREATE TABLE IF NOT EXISTS reservation_table (
+  reservation_id uuid NOT NULL REFERENCES reservation(id) ON DELETE CASCADE,
+  table_id       uuid NOT NULL REFERENCES restaurant_table(id) ON DELETE CASCADE,
+  restaurant_id  uuid NOT NULL,
+  slot_range     tstzrange NOT NULL,
+  PRIMARY KEY (reservation_id, table_id),
+  CONSTRAINT reservation_table_no_overlap
+    EXCLUDE USING gist (table_id WITH =, slot_range WITH &&)
+);
+
+-- Serves the floor-plan load: every assignment of a restaurant overlapping a window.
+CREATE INDEX IF NOT EXISTS reservation_table_restaurant_range_idx
+  ON reservation_table USING gist (restaurant_id, slot_range);
+
+-- Takes the same per-15-minute advisory locks as try_commit_reservation() (which
+-- re-acquires them; transaction-level advisory locks stack), so the API can read
+-- table occupancy and choose tables before the commit without racing other
+-- bookings that overlap the slot.
+CREATE OR REPLACE FUNCTION lock_reservation_slot(
+  p_restaurant uuid,
+  p_start timestamptz,
+  p_end   timestamptz
+) RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_restaurant_hash int := ((hashtextextended(p_restaurant::text, 0) >> 32)::int);
+  v_iter timestamptz;
+BEGIN
+  v_iter :=
+    date_trunc('minute', p_start)
+    - make_interval(mins => mod(extract(minute FROM p_start)::int, 15));
+  WHILE v_iter < p_end LOOP
+    PERFORM pg_advisory_xact_lock(
+      v_restaurant_hash,
+      floor(extract(epoch FROM v_iter) / 900)::int
+    );
+    v_iter := v_iter + interval '15 minutes';
+  END LOOP;
+END;
+$$;
+
+-- Cancelling a reservation frees its tables.
+CREATE OR REPLACE FUNCTION reservation_release_tables() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  DELETE FROM reservation_table WHERE reservation_id = NEW.id;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS reservation_cancel_release_tables ON reservation;
+CREATE TRIGGER reservation_cancel_release_tables
+  AFTER UPDATE OF status ON reservation
+  FOR EACH ROW
+  WHEN (NEW.status = 'cancelled' AND OLD.status IS DISTINCT FROM 'cancelled')
+  EXECUTE FUNCTION reservation_release_tables();
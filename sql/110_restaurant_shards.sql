@@ -0,0 +1,48 @@
+-- Tenant sharding: each restaurant's rows live on one Postgres node (a "database
+-- shard", not to be confused with reservation.shard, the per-slot party number).
+-- Applied to every node; the directory is only read on the default node
+-- (DATABASE_URL). Safe to rerun.
+
+-- restaurant -> shard name (a key of DATABASE_SHARDS). Restaurants without a row
+-- live on the default node.
+CREATE TABLE IF NOT EXISTS restaurant_shard_map (
+  restaurant_id uuid PRIMARY KEY,
+  shard         text NOT NULL,
+  updated_at    timestamptz NOT NULL DEFAULT now()
+);
+
+-- Written on the source node when a restaurant moves away. Writers routed here by
+-- a stale directory cache find it under the fence below and retry elsewhere.
+CREATE TABLE IF NOT EXISTS restaurant_moved (
+  restaurant_id uuid PRIMARY KEY,
+  moved_to      text NOT NULL,
+  moved_at      timestamptz NOT NULL DEFAULT now()
+);
+
+-- Every booking write takes this lock in shared mode at the start of its
+-- transaction. The mover takes it exclusively for the final copy and the
+-- tombstone, so no write lands on the source after the last copy. Returns the
+-- shard the restaurant moved to, or NULL when it still lives on this node.
+CREATE OR REPLACE FUNCTION restaurant_write_fence(p_restaurant uuid) RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_moved_to text;
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    hashtext('restaurant_move'),
+    (hashtextextended(p_restaurant::text, 0) >> 32)::int
+  );
+  SELECT moved_to INTO v_moved_to FROM restaurant_moved WHERE restaurant_id = p_restaurant;
+  RETURN v_moved_to;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION restaurant_move_lock(p_restaurant uuid) RETURNS void
+LANGUAGE sql
+AS $$
+  SELECT pg_advisory_xact_lock(
+    hashtext('restaurant_move'),
+    (hashtextextended(p_restaurant::text, 0) >> 32)::int
+  );
+$$;
@@ -0,0 +1,15 @@
+-- Keyset indexes for reservation listing and day-book export. Safe to rerun.
+--
+-- GET /reservations filters on status and pages by (start_ts, id); with id in
+-- the key the index yields rows already in cursor order, so a page stops after
+-- LIMIT rows with no sort. It covers every query the old
+-- (restaurant_id, status, start_ts) index served, which it replaces.
+CREATE INDEX IF NOT EXISTS reservation_restaurant_status_start_id_idx
+  ON reservation (restaurant_id, status, start_ts, id);
+
+DROP INDEX IF EXISTS reservation_restaurant_status_start_idx;
+
+-- The day-book export and its ETag read every status of one restaurant's day in
+-- (start_ts, id) order.
+CREATE INDEX IF NOT EXISTS reservation_restaurant_start_id_idx
+  ON reservation (restaurant_id, start_ts, id);